@@ -1,10 +1,67 @@
 from django.contrib import admin
+from django.contrib.admin import helpers
 from django.contrib.auth.admin import UserAdmin
-from kitchen.models import Cook, Dish, DishType, Ingredient
+from django.template.response import TemplateResponse
+
+from kitchen.forms import (
+    DishBulkCookForm,
+    DishBulkIngredientForm,
+    DishBulkPriceForm,
+)
+from kitchen.models import (
+    Cook,
+    Dish,
+    DishType,
+    Ingredient,
+    Order,
+    OrderItem,
+)
+from kitchen.pagination import EstimatedCountPaginator
+
+
+class PerformanceAdminMixin:
+    """
+    Changelists that stay cheap on big tables: no second ``COUNT(*)`` of
+    the whole table next to a filtered one, and estimated counts of big
+    unfiltered PostgreSQL tables.
+    """
+    show_full_result_count = False
+    paginator = EstimatedCountPaginator
+
+
+class DishTypeListFilter(admin.SimpleListFilter):
+    """
+    Offers the ``limit`` dish types with the most dishes, read off the
+    ``dishtype_dish_count_idx`` index, instead of every type.
+    """
+    title = "type"
+    parameter_name = "type"
+    limit = 20
+
+    def lookups(self, request, model_admin):
+        types = list(
+            DishType.objects.order_by("-dish_count", "name", "id")
+            .values_list("pk", "name")[:self.limit]
+        )
+        selected = self.value()
+        if selected and selected.isdigit() and all(
+            str(pk) != selected for pk, _ in types
+        ):
+            types += DishType.objects.filter(pk=selected).values_list(
+                "pk",
+                "name",
+            )
+        return [(str(pk), name) for pk, name in types]
+
+    def queryset(self, request, queryset):
+        value = self.value()
+        if value and value.isdigit():
+            return queryset.filter(type_id=value)
+        return queryset
 
 
 @admin.register(Cook)
-class CookAdmin(UserAdmin):
+class CookAdmin(PerformanceAdminMixin, UserAdmin):
     list_display = UserAdmin.list_display + ("years_of_experience", )
     fieldsets = UserAdmin.fieldsets + (
         (("Additional info", {"fields": ("years_of_experience", )}), )
@@ -26,11 +83,116 @@ class CookAdmin(UserAdmin):
 
 
 @admin.register(Dish)
-class DishAdmin(admin.ModelAdmin):
+class DishAdmin(PerformanceAdminMixin, admin.ModelAdmin):
     list_display = ("name", "price", "type", )
+    list_select_related = ("type", )
+    search_fields = ("name", )
+    list_filter = (DishTypeListFilter, )
+    # Searched through CookAdmin and IngredientAdmin; only the linked rows
+    # are rendered.
+    autocomplete_fields = ("cooks", "ingredients")
+
+    actions = ("reprice_dishes", "change_ingredients", "change_cooks")
+
+    def get_queryset(self, request):
+        # Neither the changelist nor the autocomplete widgets use the
+        # prefetched cooks and ingredients.
+        return super().get_queryset(request).with_related(m2m=False)
+
+    def bulk_edit(self, request, queryset, form_class, title):
+        """
+        Shows ``form_class`` for the selected dishes, then applies it to
+        all of them in one set-based write. A selection across every page
+        is carried to the second step by ``select_across`` and the
+        changelist filters in the URL, not as one hidden input per dish.
+        """
+        dishes = Dish.objects.filter(pk__in=queryset.values("pk"))
+        if "apply" in request.POST:
+            form = form_class(request.POST)
+            if form.is_valid():
+                form.apply(dishes)
+                self.message_user(
+                    request,
+                    f"{title} of {dishes.count()} dishes.",
+                )
+                return None
+        else:
+            form = form_class()
+        context = {
+            **self.admin_site.each_context(request),
+            "title": title,
+            "opts": self.model._meta,
+            "form": form,
+            "media": self.media + form.media,
+            "dish_count": dishes.count(),
+            "select_across": request.POST.get("select_across") == "1",
+            "selected": request.POST.getlist(helpers.ACTION_CHECKBOX_NAME),
+            "action": request.POST["action"],
+            "action_checkbox_name": helpers.ACTION_CHECKBOX_NAME,
+        }
+        return TemplateResponse(
+            request,
+            "admin/kitchen/dish/bulk_edit.html",
+            context,
+        )
+
+    @admin.action(description="Change prices of selected dishes")
+    def reprice_dishes(self, request, queryset):
+        return self.bulk_edit(
+            request,
+            queryset,
+            DishBulkPriceForm,
+            "Changed prices",
+        )
+
+    @admin.action(description="Change ingredients of selected dishes")
+    def change_ingredients(self, request, queryset):
+        return self.bulk_edit(
+            request,
+            queryset,
+            DishBulkIngredientForm,
+            "Changed ingredients",
+        )
+
+    @admin.action(description="Change cooks of selected dishes")
+    def change_cooks(self, request, queryset):
+        return self.bulk_edit(
+            request,
+            queryset,
+            DishBulkCookForm,
+            "Changed cooks",
+        )
+
+
+@admin.register(DishType)
+class DishTypeAdmin(PerformanceAdminMixin, admin.ModelAdmin):
+    list_display = ("name", "dish_count", )
     search_fields = ("name", )
-    list_filter = ("type", )
 
 
-admin.site.register(DishType)
-admin.site.register(Ingredient)
+@admin.register(Ingredient)
+class IngredientAdmin(PerformanceAdminMixin, admin.ModelAdmin):
+    list_display = ("name", "dish_count", )
+    search_fields = ("name", )
+
+
+class OrderItemInline(admin.TabularInline):
+    model = OrderItem
+    fields = ("dish", "quantity", "status", "cook")
+    readonly_fields = ("status", "cook")
+    raw_id_fields = ("dish", )
+    extra = 1
+
+
+@admin.register(Order)
+class OrderAdmin(PerformanceAdminMixin, admin.ModelAdmin):
+    list_display = ("__str__", "table", "created_at", )
+    inlines = (OrderItemInline, )
+
+
+@admin.register(OrderItem)
+class OrderItemAdmin(PerformanceAdminMixin, admin.ModelAdmin):
+    list_display = ("id", "order", "dish", "quantity", "status", "cook", )
+    list_filter = ("status", )
+    list_select_related = ("order", "dish__type", "cook")
+    raw_id_fields = ("order", "dish", "cook")
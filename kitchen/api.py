@@ -0,0 +1,192 @@
+"""
+Read-only JSON API over the kitchen catalog.
+
+``?fields=`` selects a sparse fieldset (only those columns are loaded),
+``?cursor=`` pages through the model ordering with ``KeysetPaginator``, and
+every response carries an ``ETag`` derived from the cached per-model
+version stamps, so polling clients mostly get a ``304`` without touching
+the catalog tables. There is no ``Last-Modified``: whole seconds cannot
+tell apart two writes within the same second.
+"""
+import hashlib
+from functools import wraps
+
+from django.db.models import Prefetch
+from django.http import JsonResponse
+from django.views.decorators.http import condition, require_safe
+
+from kitchen import versions
+from kitchen.models import Cook, Dish, DishType, Ingredient
+from kitchen.pagination import InvalidCursor, KeysetPaginator
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+class ApiError(Exception):
+    def __init__(self, detail, status=400):
+        super().__init__(detail)
+        self.detail = detail
+        self.status = status
+
+
+class ApiResource:
+    """
+    A model exposed by the API. ``relations`` are many-to-many fields
+    serialized as lists of primary keys; ``depends_on`` lists the models
+    whose writes can change this resource without touching its own rows
+    (e.g. cascading deletes of through rows).
+    """
+
+    def __init__(self, model, fields, relations=(), depends_on=()):
+        self.model = model
+        self.fields = fields
+        self.relations = relations
+        self.depends_on = depends_on
+
+    @property
+    def available_fields(self):
+        return self.fields + self.relations
+
+    def parse_fields(self, value):
+        if not value:
+            return self.available_fields
+        fields = tuple(dict.fromkeys(
+            name.strip() for name in value.split(",") if name.strip()
+        ))
+        unknown = [
+            name for name in fields if name not in self.available_fields
+        ]
+        if unknown:
+            raise ApiError(f"Unknown fields: {', '.join(unknown)}")
+        return fields
+
+    def queryset(self, fields):
+        # The ordering columns are needed for the pagination cursors.
+        ordering = [name.lstrip("-") for name in self.model._meta.ordering]
+        columns = [name for name in fields if name in self.fields]
+        queryset = self.model.objects.only(*dict.fromkeys(
+            ["pk", *ordering, *columns]
+        ))
+        for name in fields:
+            if name in self.relations:
+                related = self.model._meta.get_field(name).related_model
+                queryset = queryset.prefetch_related(
+                    Prefetch(name, queryset=related.objects.only("pk"))
+                )
+        return queryset
+
+    def serialize(self, obj, fields):
+        data = {}
+        for name in fields:
+            if name in self.relations:
+                data[name] = [
+                    related.pk for related in getattr(obj, name).all()
+                ]
+            else:
+                attname = self.model._meta.get_field(name).attname
+                data[name] = getattr(obj, attname)
+        return data
+
+    def versions(self):
+        return versions.get_versions((self.model, *self.depends_on))
+
+
+RESOURCES = {
+    "dish-types": ApiResource(DishType, fields=("id", "name")),
+    "ingredients": ApiResource(Ingredient, fields=("id", "name")),
+    "cooks": ApiResource(
+        Cook,
+        fields=(
+            "id",
+            "username",
+            "first_name",
+            "last_name",
+            "years_of_experience",
+        ),
+    ),
+    "dishes": ApiResource(
+        Dish,
+        fields=("id", "name", "description", "price", "type"),
+        relations=("ingredients", "cooks"),
+        depends_on=(DishType, Ingredient, Cook),
+    ),
+}
+
+
+def error_response(detail, status):
+    return JsonResponse({"detail": detail}, status=status)
+
+
+def get_resource_versions(request, resource):
+    if not hasattr(request, "_kitchen_api_versions"):
+        stamps = RESOURCES[resource].versions()
+        request._kitchen_api_versions = sorted(
+            (model._meta.label_lower, stamp) for model, stamp in stamps.items()
+        )
+    return request._kitchen_api_versions
+
+
+def resource_etag(request, resource, **kwargs):
+    stamps = get_resource_versions(request, resource)
+    digest = hashlib.md5(repr(stamps).encode(), usedforsecurity=False)
+    return digest.hexdigest()
+
+
+def api_view(view):
+    """Authentication, resource lookup, conditional GET and JSON errors."""
+    conditional = condition(etag_func=resource_etag)(view)
+
+    @wraps(view)
+    @require_safe
+    def wrapper(request, resource, **kwargs):
+        if not request.user.is_authenticated:
+            return error_response(
+                "Authentication credentials were not provided.",
+                status=403,
+            )
+        if resource not in RESOURCES:
+            return error_response(f"Unknown resource: {resource}", 404)
+        try:
+            return conditional(request, resource, **kwargs)
+        except ApiError as e:
+            return error_response(e.detail, e.status)
+
+    return wrapper
+
+
+def get_page_size(request):
+    try:
+        size = int(request.GET.get("limit", DEFAULT_PAGE_SIZE))
+    except ValueError:
+        raise ApiError("limit must be an integer")
+    return min(max(size, 1), MAX_PAGE_SIZE)
+
+
+@api_view
+def resource_list(request, resource):
+    api_resource = RESOURCES[resource]
+    fields = api_resource.parse_fields(request.GET.get("fields"))
+    paginator = KeysetPaginator(
+        api_resource.queryset(fields),
+        get_page_size(request),
+    )
+    try:
+        page = paginator.page(request.GET.get("cursor"))
+    except InvalidCursor as e:
+        raise ApiError(str(e))
+    return JsonResponse({
+        "results": [api_resource.serialize(obj, fields) for obj in page],
+        "next": page.next_cursor,
+        "previous": page.previous_cursor,
+    })
+
+
+@api_view
+def resource_detail(request, resource, pk):
+    api_resource = RESOURCES[resource]
+    fields = api_resource.parse_fields(request.GET.get("fields"))
+    obj = api_resource.queryset(fields).filter(pk=pk).first()
+    if obj is None:
+        raise ApiError(f"No {resource} object with id {pk}", status=404)
+    return JsonResponse(api_resource.serialize(obj, fields))
@@ -1,6 +1,25 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
+from django.utils.autoreload import file_changed
 
 
 class KitchenConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "kitchen"
+
+    def ready(self):
+        from kitchen import checks, signals  # noqa: F401
+        from kitchen.search_schema import install_sqlite_triggers
+
+        post_migrate.connect(install_sqlite_triggers, sender=self)
+        file_changed.connect(
+            clear_fragment_version,
+            dispatch_uid="kitchen-clear-fragment-version",
+        )
+
+
+def clear_fragment_version(sender, file_path, **kwargs):
+    from kitchen.context_processors import fragment_version
+
+    if file_path.suffix == ".html":
+        fragment_version.cache_clear()
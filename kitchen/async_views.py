@@ -0,0 +1,165 @@
+"""
+Async variants of the read-heavy views, served by the ASGI deployment.
+
+They subclass the sync views for their querysets, templates and context
+and replace only the parts that query: the user, validators, page cache
+and the page itself are loaded with the async ORM and cache API.
+Templates are still rendered by the handler in a worker thread, so lazy
+relations in them keep working.
+"""
+import asyncio
+from inspect import isawaitable
+
+from django.contrib.auth.decorators import login_required
+from django.contrib.auth.mixins import LoginRequiredMixin
+from django.http import Http404
+from django.template.response import TemplateResponse
+from django.urls import URLPattern
+
+from kitchen import counters, events, views
+from kitchen.conditional import AsyncConditionalViewMixin
+from kitchen.page_cache import AsyncPageCacheMixin
+from kitchen.pagination import AsyncKeysetPaginationMixin
+
+
+async def load_user(request):
+    """Replaces the lazy ``request.user`` so sync code never queries."""
+    request.user = await request.auser()
+    return request.user
+
+
+async def index(request):
+    """View function for the home page of site."""
+    _, counts = await asyncio.gather(
+        load_user(request),
+        counters.aget_counts(),
+    )
+    context = {
+        "num_cooks": counts["cooks"],
+        "num_dishes": counts["dishes"],
+        "num_dish_types": counts["dish_types"],
+        "num_ingredients": counts["ingredients"]
+    }
+    return TemplateResponse(request, "kitchen/index.html", context=context)
+
+
+@login_required
+async def live_events(request):
+    """Streams dish and cook changes live, replaying missed ones first."""
+    topics, last_id = views.event_stream_options(request)
+    return views.event_stream_response(
+        events.broker.stream(topics, last_id)
+    )
+
+
+class AsyncLoginRequiredMixin(LoginRequiredMixin):
+    async def dispatch(self, request, *args, **kwargs):
+        await load_user(request)
+        response = super().dispatch(request, *args, **kwargs)
+        if isawaitable(response):
+            response = await response
+        return response
+
+
+class AsyncDetailMixin:
+    async def aget_object(self):
+        queryset = self.get_queryset().filter(
+            pk=self.kwargs[self.pk_url_kwarg]
+        )
+        try:
+            return await queryset.aget()
+        except queryset.model.DoesNotExist:
+            raise Http404(
+                f"No {queryset.model._meta.verbose_name} found matching "
+                f"the query"
+            )
+
+    async def get(self, request, *args, **kwargs):
+        self.object = await self.aget_object()
+        context = self.get_context_data(object=self.object)
+        return self.render_to_response(context)
+
+
+class DishTypeListView(
+    AsyncLoginRequiredMixin,
+    AsyncConditionalViewMixin,
+    AsyncPageCacheMixin,
+    AsyncKeysetPaginationMixin,
+    views.DishTypeListView
+):
+    pass
+
+
+class DishListView(
+    AsyncLoginRequiredMixin,
+    AsyncConditionalViewMixin,
+    AsyncPageCacheMixin,
+    AsyncKeysetPaginationMixin,
+    views.DishListView
+):
+    pass
+
+
+class DishDetailView(
+    AsyncLoginRequiredMixin,
+    AsyncConditionalViewMixin,
+    AsyncPageCacheMixin,
+    AsyncDetailMixin,
+    views.DishDetailView
+):
+    pass
+
+
+class CookListView(
+    AsyncLoginRequiredMixin,
+    AsyncConditionalViewMixin,
+    AsyncKeysetPaginationMixin,
+    views.CookListView
+):
+    pass
+
+
+class CookDetailView(
+    AsyncLoginRequiredMixin,
+    AsyncConditionalViewMixin,
+    AsyncPageCacheMixin,
+    AsyncDetailMixin,
+    views.CookDetailView
+):
+    pass
+
+
+class IngredientListView(
+    AsyncLoginRequiredMixin,
+    AsyncConditionalViewMixin,
+    AsyncPageCacheMixin,
+    AsyncKeysetPaginationMixin,
+    views.IngredientListView
+):
+    pass
+
+
+ASYNC_VIEWS = {
+    "index": index,
+    "live-events": live_events,
+    "dish-type-list": DishTypeListView.as_view(),
+    "dish-list": DishListView.as_view(),
+    "dish-detail": DishDetailView.as_view(),
+    "cook-list": CookListView.as_view(),
+    "cook-detail": CookDetailView.as_view(),
+    "ingredient-list": IngredientListView.as_view(),
+}
+
+
+def use_async_views(urlpatterns):
+    """``urlpatterns`` with the views in ``ASYNC_VIEWS`` swapped in."""
+    return [
+        URLPattern(
+            pattern.pattern,
+            ASYNC_VIEWS[pattern.name],
+            pattern.default_args,
+            pattern.name,
+        )
+        if pattern.name in ASYNC_VIEWS else pattern
+        for pattern in urlpatterns
+    ]
@@ -0,0 +1,349 @@
+"""
+Load-test harness driving the kitchen URLs through the Django test client.
+
+Results are plain JSON so runs from different commits can be diffed with
+``compare``.
+"""
+import copy
+import http.client
+import statistics
+import subprocess
+import threading
+import tracemalloc
+from contextlib import ExitStack
+from datetime import datetime, timezone
+from itertools import cycle
+from time import perf_counter
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.db import close_old_connections, connection, connections
+from django.db.backends.signals import connection_created
+from django.urls import URLPattern, reverse
+
+from kitchen import urls as kitchen_urls
+from kitchen.instrumentation import RequestMetrics
+from kitchen.models import Cook, Dish, DishType, Ingredient
+
+# Arguments for URL parameters that cannot be derived from the view model.
+URL_ARGUMENTS = {
+    "autocomplete": {"kind": "ingredients"},
+    "api-list": {"resource": "dishes"},
+    "api-detail": {"resource": "dishes"},
+}
+
+# Models to sample ``pk`` from for function views.
+URL_MODELS = {
+    "api-detail": Dish,
+}
+
+
+def sample_kwargs(pattern):
+    kwargs = dict(URL_ARGUMENTS.get(pattern.name, {}))
+    converters = getattr(pattern.pattern, "converters", {})
+    for name in converters:
+        if name in kwargs:
+            continue
+        if name != "pk":
+            return None
+        view = getattr(pattern.callback, "view_class", None)
+        model = URL_MODELS.get(pattern.name) or getattr(view, "model", None)
+        if model is None:
+            return None
+        pk = model._default_manager.order_by("pk").values_list(
+            "pk", flat=True
+        ).first()
+        if pk is None:
+            return None
+        kwargs["pk"] = pk
+    return kwargs
+
+
+def discover_urls(namespace="kitchen"):
+    """Yields ``(url_name, path)``; ``path`` is None when no sample exists."""
+    for pattern in kitchen_urls.urlpatterns:
+        if not isinstance(pattern, URLPattern) or not pattern.name:
+            continue
+        name = f"{namespace}:{pattern.name}"
+        kwargs = sample_kwargs(pattern)
+        yield name, None if kwargs is None else reverse(name, kwargs=kwargs)
+
+
+def percentile(values, percent):
+    if len(values) == 1:
+        return values[0]
+    return statistics.quantiles(values, n=100, method="inclusive")[
+        percent - 1
+    ]
+
+
+def fetch(client, path):
+    response = client.get(path)
+    if response.streaming:
+        for _ in response.streaming_content:
+            pass
+    return response
+
+
+def measure(client, path, iterations=20, warmup=2):
+    for _ in range(warmup):
+        fetch(client, path)
+
+    timings = []
+    queries = []
+    status = None
+    for _ in range(iterations):
+        metrics = RequestMetrics()
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(
+                    connections[alias].execute_wrapper(metrics)
+                )
+            start = perf_counter()
+            response = fetch(client, path)
+            timings.append((perf_counter() - start) * 1000)
+        queries.append(metrics.queries)
+        status = response.status_code
+
+    # Allocation tracing slows everything down, so it gets its own request.
+    tracemalloc.start()
+    try:
+        baseline = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        fetch(client, path)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "path": path,
+        "status": status,
+        "iterations": iterations,
+        "p50_ms": round(percentile(timings, 50), 3),
+        "p95_ms": round(percentile(timings, 95), 3),
+        "mean_ms": round(statistics.fmean(timings), 3),
+        "queries": max(queries),
+        "alloc_peak_kb": round((peak - baseline) / 1024, 1),
+    }
+
+
+def template_settings(cached):
+    """
+    Settings for rendering pages without (``cached=False``) or with the
+    cached template loader and fragment cache. The page cache is switched
+    off in both, so every request renders its template.
+    """
+    templates = copy.deepcopy(settings.TEMPLATES)
+    loaders = [
+        "django.template.loaders.filesystem.Loader",
+        "django.template.loaders.app_directories.Loader",
+    ]
+    for engine in templates:
+        engine["APP_DIRS"] = False
+        engine.setdefault("OPTIONS", {})["loaders"] = (
+            [("django.template.loaders.cached.Loader", loaders)]
+            if cached else loaders
+        )
+    caches = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.dummy.DummyCache",
+        },
+    }
+    if cached:
+        caches["template_fragments"] = {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "kitchen-benchmark-fragments",
+        }
+    return {"TEMPLATES": templates, "CACHES": caches}
+
+
+def render_times(client, path, iterations=20, warmup=2):
+    """Template render time per request in ms, from ``response.metrics``."""
+    for _ in range(warmup):
+        fetch(client, path)
+    timings = []
+    for _ in range(iterations):
+        response = fetch(client, path)
+        metrics = getattr(response, "metrics", None)
+        if metrics is None or not metrics.template_time:
+            return None
+        timings.append(metrics.template_time * 1000)
+    return timings
+
+
+def load_test(base_url, paths, concurrency, duration=10.0, headers=None):
+    """
+    Requests ``paths`` round-robin from ``concurrency`` keep-alive clients
+    for ``duration`` seconds against a running server. Client threads share
+    the GIL, so compare runs made from the same machine only.
+    """
+    url = urlsplit(base_url)
+    connection_class = (
+        http.client.HTTPSConnection if url.scheme == "https"
+        else http.client.HTTPConnection
+    )
+    prefix = url.path.rstrip("/")
+    headers = headers or {}
+    timings = []
+    errors = []
+    lock = threading.Lock()
+    start = threading.Barrier(concurrency + 1)
+    deadline = None
+
+    def client(targets):
+        conn = connection_class(url.hostname, url.port, timeout=30)
+        local_timings = []
+        local_errors = 0
+        start.wait()
+        while perf_counter() < deadline:
+            began = perf_counter()
+            try:
+                conn.request("GET", prefix + next(targets), headers=headers)
+                response = conn.getresponse()
+                response.read()
+                ok = response.status < 400
+            except (OSError, http.client.HTTPException):
+                conn.close()
+                ok = False
+            local_timings.append((perf_counter() - began) * 1000)
+            local_errors += not ok
+        conn.close()
+        with lock:
+            timings.extend(local_timings)
+            errors.append(local_errors)
+
+    # Clients start at different paths so each one is hit concurrently.
+    threads = [
+        threading.Thread(
+            target=client,
+            args=(cycle(paths[offset:] + paths[:offset]), ),
+            daemon=True,
+        )
+        for offset in (index % len(paths) for index in range(concurrency))
+    ]
+    for thread in threads:
+        thread.start()
+    deadline = perf_counter() + duration
+    start.wait()
+    began = perf_counter()
+    for thread in threads:
+        thread.join()
+    elapsed = perf_counter() - began
+
+    return {
+        "concurrency": concurrency,
+        "requests": len(timings),
+        "errors": sum(errors),
+        "rps": round(len(timings) / elapsed, 1),
+        "p50_ms": round(percentile(timings, 50), 3) if timings else None,
+        "p95_ms": round(percentile(timings, 95), 3) if timings else None,
+    }
+
+
+def timing_summary(timings):
+    return {
+        "p50_ms": round(percentile(timings, 50), 3),
+        "p95_ms": round(percentile(timings, 95), 3),
+        "mean_ms": round(statistics.fmean(timings), 3),
+    }
+
+
+def connect_cost(alias="default", iterations=20):
+    """Time to open and authenticate a raw database connection."""
+    conn = connections[alias]
+    params = conn.get_connection_params()
+    timings = []
+    for _ in range(iterations):
+        start = perf_counter()
+        raw = conn.get_new_connection(params)
+        raw.cursor().execute("SELECT 1")
+        timings.append((perf_counter() - start) * 1000)
+        raw.close()
+    return timing_summary(timings)
+
+
+def request_cycle_cost(alias="default", iterations=100, **overrides):
+    """
+    Replays the connection handling of ``iterations`` requests running one
+    query each, with ``overrides`` (e.g. ``CONN_MAX_AGE``) applied to the
+    connection settings, and counts the connections Django opened.
+    """
+    conn = connections[alias]
+    saved = dict(conn.settings_dict)
+    conn.settings_dict.update(overrides)
+    connects = []
+
+    def count(sender, connection, **kwargs):
+        if connection.alias == alias:
+            connects.append(connection)
+
+    connection_created.connect(count)
+    conn.close()
+    timings = []
+    try:
+        for _ in range(iterations):
+            start = perf_counter()
+            # What the request_started/request_finished handlers do.
+            close_old_connections()
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            close_old_connections()
+            timings.append((perf_counter() - start) * 1000)
+    finally:
+        connection_created.disconnect(count)
+        conn.close()
+        conn.settings_dict.clear()
+        conn.settings_dict.update(saved)
+    return {**timing_summary(timings), "connects": len(connects)}
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(client, iterations=20, warmup=2, only=None):
+    results = {}
+    skipped = []
+    for name, path in discover_urls():
+        if only and name not in only:
+            continue
+        if path is None:
+            skipped.append(name)
+            continue
+        results[name] = measure(client, path, iterations, warmup)
+    return {
+        "meta": {
+            "revision": git_revision(),
+            "created": datetime.now(timezone.utc).isoformat(),
+            "database": connection.vendor,
+            "rows": {
+                model._meta.model_name: model.objects.count()
+                for model in (Cook, Dish, DishType, Ingredient)
+            },
+            "skipped": skipped,
+        },
+        "results": results,
+    }
+
+
+def compare(current, baseline,
+            metrics=("p50_ms", "p95_ms", "queries", "alloc_peak_kb")):
+    """Rows of ``(url_name, metric, baseline, current, change %)``."""
+    rows = []
+    for name, result in current["results"].items():
+        before = baseline.get("results", {}).get(name)
+        if before is None:
+            continue
+        for metric in metrics:
+            old, new = before[metric], result[metric]
+            change = (new - old) / old * 100 if old else None
+            rows.append((name, metric, old, new, change))
+    return rows
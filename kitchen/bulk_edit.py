@@ -0,0 +1,140 @@
+"""
+Set-based edits of many dishes at once: repricing a filtered set, or
+adding, removing or replacing ingredients or cooks across it.
+
+Prices change with a single ``UPDATE`` of ``F()`` expressions followed by
+one ``catalog_bulk_changed`` naming the column, so only the handlers that
+depend on prices react. Relations change by writing the through table
+directly: one read of the links the dishes already have, one ``DELETE``
+of the links to drop and chunked ``INSERT``s of the links to add. A single
+``catalog_bulk_changed`` then names the relation and the cooks or
+ingredients whose links changed, so the handlers in ``kitchen.signals``
+recount only those rows and every cache is invalidated when the
+transaction commits.
+"""
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import DecimalField, ExpressionWrapper, F, Value
+from django.db.models.functions import Greatest, Least, Round
+from django.utils import timezone
+
+from kitchen.models import Cook, Dish, Ingredient
+from kitchen.signals import catalog_bulk_changed
+
+RELATIONS = {"cooks": Cook, "ingredients": Ingredient}
+
+ACTIONS = ("add", "remove", "replace")
+
+# Links per through-table insert, within every backend's limit on
+# query parameters.
+CHUNK_SIZE = 2000
+
+
+def max_price():
+    """The largest price the ``Dish.price`` column can hold."""
+    field = Dish._meta.get_field("price")
+    return (
+        Decimal(10) ** (field.max_digits - field.decimal_places)
+        - Decimal(10) ** -field.decimal_places
+    )
+
+
+def new_price(percent=None, amount=None):
+    """
+    ``price`` changed by ``percent`` or by ``amount``, never below 0 nor
+    past what the column holds, so the ``UPDATE`` cannot overflow.
+    """
+    if (percent is None) == (amount is None):
+        raise ValueError("Give either a percentage or an amount.")
+    if percent is not None:
+        price = F("price") * Value(1 + Decimal(percent) / 100)
+    else:
+        price = F("price") + Value(Decimal(amount))
+    output_field = Dish._meta.get_field("price")
+    return Least(
+        Greatest(
+            Round(
+                ExpressionWrapper(price, output_field=output_field),
+                2,
+                output_field=output_field,
+            ),
+            Value(Decimal("0"), output_field=DecimalField()),
+            output_field=output_field,
+        ),
+        Value(max_price(), output_field=DecimalField()),
+        output_field=output_field,
+    )
+
+
+def reprice(dishes, percent=None, amount=None):
+    """Changes the price of ``dishes``; returns how many were changed."""
+    price = new_price(percent, amount)
+    with transaction.atomic():
+        pks = list(dishes.values_list("pk", flat=True))
+        updated = Dish.objects.filter(pk__in=pks).update(
+            price=price,
+            updated_at=timezone.now(),
+        )
+        catalog_bulk_changed.send(sender=Dish, pks=pks, fields=("price", ))
+    return updated
+
+
+def change_relation(dishes, relation, action, targets, replacement=None):
+    """
+    Adds the ``targets`` cooks or ingredients to ``dishes``, removes them,
+    or replaces them with ``replacement`` in the dishes having them.
+    Returns the number of dish links added, or removed when removing or
+    replacing.
+    """
+    if relation not in RELATIONS or action not in ACTIONS:
+        raise ValueError(f"Cannot {action} {relation}.")
+    if (action == "replace") != (replacement is not None):
+        raise ValueError("Only replacing takes a replacement.")
+    field = Dish._meta.get_field(relation)
+    through = field.remote_field.through
+    source, target = field.m2m_column_name(), field.m2m_reverse_name()
+    target_pks = {obj.pk for obj in targets}
+    with transaction.atomic():
+        dish_pks = list(dishes.values_list("pk", flat=True))
+        links = through.objects.filter(**{
+            f"{source}__in": dish_pks,
+            f"{target}__in": target_pks,
+        })
+        existing = set(links.values_list(source, target))
+        if action == "add":
+            removed = set()
+            added = {
+                (dish_pk, target_pk)
+                for dish_pk in dish_pks
+                for target_pk in target_pks
+            } - existing
+        else:
+            removed = existing
+            links.delete()
+            added = set()
+            if action == "replace":
+                having = {dish_pk for dish_pk, _ in removed}
+                added = {(dish_pk, replacement.pk) for dish_pk in having}
+                added -= set(through.objects.filter(**{
+                    f"{source}__in": having,
+                    target: replacement.pk,
+                }).values_list(source, target))
+        # Conflicts are links a concurrent write added since the read.
+        through.objects.bulk_create(
+            [
+                through(**{source: dish_pk, target: target_pk})
+                for dish_pk, target_pk in sorted(added)
+            ],
+            batch_size=CHUNK_SIZE,
+            ignore_conflicts=True,
+        )
+        changed = added | removed
+        if changed:
+            catalog_bulk_changed.send(
+                sender=Dish,
+                pks=sorted({dish_pk for dish_pk, _ in changed}),
+                fields=(relation, ),
+                related_pks=sorted({target_pk for _, target_pk in changed}),
+            )
+    return len(added) if action == "add" else len(removed)
@@ -0,0 +1,345 @@
+"""
+Streaming catalog import/export.
+
+Rows are plain dicts keyed by natural keys (names, usernames) and are read
+and written one at a time; imports work through fixed-size batches with
+set-based queries, so memory stays flat regardless of the file size.
+"""
+import csv
+import json
+from decimal import Decimal, InvalidOperation
+from itertools import islice
+
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.db.models import Prefetch
+from django.utils import timezone
+
+from kitchen.models import Cook, Dish, DishType, Ingredient
+from kitchen.signals import catalog_bulk_changed
+
+FORMATS = ("csv", "jsonl")
+
+CONTENT_TYPES = {
+    "csv": "text/csv",
+    "jsonl": "application/x-ndjson",
+}
+
+LIST_SEPARATOR = "|"
+
+
+class CatalogError(Exception):
+    pass
+
+
+def batched(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+class NamedCatalog:
+    """Catalog of a model identified by a unique-in-practice ``name``."""
+    model = None
+    key = "name"
+    fields = ("name", )
+    list_fields = ()
+    update_fields = ()
+
+    def queryset(self):
+        return self.model.objects.only(*self.fields).order_by("pk")
+
+    def serialize(self, obj):
+        return {field: getattr(obj, field) for field in self.fields}
+
+    def export_rows(self, queryset=None, chunk_size=2000):
+        queryset = self.queryset() if queryset is None else queryset
+        for obj in queryset.iterator(chunk_size=chunk_size):
+            yield self.serialize(obj)
+
+    def existing(self, keys):
+        found = {}
+        queryset = self.model.objects.filter(**{f"{self.key}__in": keys})
+        for obj in queryset.order_by("pk"):
+            found.setdefault(getattr(obj, self.key), obj)
+        return found
+
+    def build(self, row):
+        return self.model(**{field: row[field] for field in self.fields})
+
+    def apply(self, obj, row):
+        for field in self.update_fields:
+            setattr(obj, field, row[field])
+
+    def clean(self, row):
+        missing = [field for field in self.fields if field not in row]
+        if missing:
+            raise CatalogError(f"Missing columns: {', '.join(missing)}")
+        return row
+
+    def prepare(self, rows):
+        pass
+
+    def import_batch(self, rows):
+        rows = {row[self.key]: row for row in map(self.clean, rows)}
+        self.prepare(rows)
+        found = self.existing(list(rows))
+        new = [
+            self.build(row) for key, row in rows.items() if key not in found
+        ]
+        self.model.objects.bulk_create(new)
+        if self.update_fields and found:
+            # bulk_update() skips auto_now, so stamp the rows here.
+            now = timezone.now()
+            for key, obj in found.items():
+                self.apply(obj, rows[key])
+                obj.updated_at = now
+            self.model.objects.bulk_update(
+                list(found.values()),
+                (*self.update_fields, "updated_at"),
+            )
+        objects = {**found, **{getattr(obj, self.key): obj for obj in new}}
+        self.after_batch(objects, rows)
+        return len(new), len(found)
+
+    def after_batch(self, objects, rows):
+        pass
+
+
+class DishTypeCatalog(NamedCatalog):
+    model = DishType
+
+
+class IngredientCatalog(NamedCatalog):
+    model = Ingredient
+
+
+class CookCatalog(NamedCatalog):
+    model = Cook
+    key = "username"
+    fields = (
+        "username",
+        "first_name",
+        "last_name",
+        "email",
+        "years_of_experience",
+    )
+    update_fields = fields[1:]
+
+    def clean(self, row):
+        row = super().clean(row)
+        try:
+            row["years_of_experience"] = int(row["years_of_experience"] or 0)
+        except (TypeError, ValueError):
+            raise CatalogError(
+                f"Invalid years_of_experience for {row['username']}"
+            )
+        return row
+
+    def build(self, row):
+        cook = super().build(row)
+        # Imported cooks cannot log in until a password is set.
+        cook.password = make_password(None)
+        return cook
+
+
+class DishCatalog(NamedCatalog):
+    model = Dish
+    fields = ("name", "description", "price", "type", "cooks", "ingredients")
+    list_fields = ("cooks", "ingredients")
+    update_fields = ("description", "price", "type")
+
+    def queryset(self):
+        return Dish.objects.select_related("type").only(
+            "name",
+            "description",
+            "price",
+            "type__name",
+        ).prefetch_related(
+            Prefetch("cooks", queryset=Cook.objects.only("username")),
+            Prefetch("ingredients", queryset=Ingredient.objects.only("name")),
+        ).order_by("pk")
+
+    def serialize(self, obj):
+        return {
+            "name": obj.name,
+            "description": obj.description,
+            "price": obj.price,
+            "type": obj.type.name,
+            "cooks": [cook.username for cook in obj.cooks.all()],
+            "ingredients": [
+                ingredient.name for ingredient in obj.ingredients.all()
+            ],
+        }
+
+    def clean(self, row):
+        row = super().clean(row)
+        try:
+            row["price"] = Decimal(str(row["price"]))
+        except InvalidOperation:
+            raise CatalogError(f"Invalid price for {row['name']}")
+        return row
+
+    @staticmethod
+    def resolve(catalog, names):
+        found = catalog.existing(list(names))
+        missing = set(names) - set(found)
+        if missing:
+            raise CatalogError(
+                f"Unknown {catalog.model._meta.verbose_name_plural}: "
+                f"{', '.join(sorted(missing))}"
+            )
+        return {name: obj.pk for name, obj in found.items()}
+
+    def prepare(self, rows):
+        types = self.resolve(
+            DishTypeCatalog(),
+            {row["type"] for row in rows.values()},
+        )
+        for row in rows.values():
+            row["type"] = DishType(pk=types[row["type"]])
+
+    def build(self, row):
+        return Dish(
+            name=row["name"],
+            description=row["description"],
+            price=row["price"],
+            type=row["type"],
+        )
+
+    def after_batch(self, objects, rows):
+        """Replaces the M2M links of the batch with one delete and one
+        insert per through table."""
+        relations = (
+            ("cooks", CookCatalog()),
+            ("ingredients", IngredientCatalog()),
+        )
+        dish_ids = [obj.pk for obj in objects.values()]
+        for relation, catalog in relations:
+            names = {name for row in rows.values() for name in row[relation]}
+            targets = self.resolve(catalog, names)
+            field = Dish._meta.get_field(relation)
+            through = field.remote_field.through
+            source = field.m2m_field_name()
+            target = field.m2m_reverse_field_name()
+            through.objects.filter(**{f"{source}_id__in": dish_ids}).delete()
+            through.objects.bulk_create(
+                through(**{
+                    f"{source}_id": objects[key].pk,
+                    f"{target}_id": targets[name],
+                })
+                for key, row in rows.items()
+                for name in dict.fromkeys(row[relation])
+            )
+
+
+CATALOGS = {
+    "dishtype": DishTypeCatalog,
+    "ingredient": IngredientCatalog,
+    "cook": CookCatalog,
+    "dish": DishCatalog,
+}
+
+
+def get_catalog(name):
+    try:
+        return CATALOGS[name]()
+    except KeyError:
+        raise CatalogError(
+            f"Unknown catalog {name!r}, choose from {', '.join(CATALOGS)}"
+        )
+
+
+def read_rows(stream, fmt, list_fields=()):
+    if fmt == "csv":
+        for row in csv.DictReader(stream):
+            for field in list_fields:
+                value = row.get(field) or ""
+                row[field] = [
+                    item for item in value.split(LIST_SEPARATOR) if item
+                ]
+            yield row
+    elif fmt == "jsonl":
+        for number, line in enumerate(stream, 1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError as e:
+                raise CatalogError(f"Line {number}: invalid JSON ({e.msg})")
+            if not isinstance(row, dict):
+                raise CatalogError(f"Line {number}: expected a JSON object")
+            yield row
+    else:
+        raise CatalogError(f"Unknown format {fmt!r}")
+
+
+class CSVRowWriter:
+    def __init__(self, stream, fields, list_fields=()):
+        self.writer = csv.writer(stream)
+        self.fields = fields
+        self.list_fields = list_fields
+
+    def header(self):
+        return self.writer.writerow(self.fields)
+
+    def write(self, row):
+        return self.writer.writerow([
+            LIST_SEPARATOR.join(row[field])
+            if field in self.list_fields else row[field]
+            for field in self.fields
+        ])
+
+
+class JSONLinesRowWriter:
+    def __init__(self, stream, fields, list_fields=()):
+        self.stream = stream
+
+    def header(self):
+        return None
+
+    def write(self, row):
+        return self.stream.write(json.dumps(row, default=str) + "\n")
+
+
+def get_writer(stream, fmt, catalog):
+    writers = {"csv": CSVRowWriter, "jsonl": JSONLinesRowWriter}
+    if fmt not in writers:
+        raise CatalogError(f"Unknown format {fmt!r}")
+    return writers[fmt](stream, catalog.fields, catalog.list_fields)
+
+
+class EchoStream:
+    """Write target that hands every value back, for streaming responses."""
+
+    def write(self, value):
+        return value
+
+
+def stream_rows(catalog, fmt, queryset=None, chunk_size=2000, rows=200):
+    """Yields the serialized export ``rows`` lines at a time."""
+    writer = get_writer(EchoStream(), fmt, catalog)
+    header = writer.header()
+    if header is not None:
+        yield header
+    for batch in batched(catalog.export_rows(queryset, chunk_size), rows):
+        yield "".join(writer.write(row) for row in batch)
+
+
+def import_rows(catalog, rows, batch_size=1000):
+    """
+    Imports ``rows`` in batches, each committed on its own. The derived
+    state is refreshed once at the end, also when a later batch fails, so
+    the batches already committed are never left out of it.
+    """
+    created = updated = 0
+    try:
+        for batch in batched(rows, batch_size):
+            with transaction.atomic():
+                batch_created, batch_updated = catalog.import_batch(batch)
+            created += batch_created
+            updated += batch_updated
+    finally:
+        if created or updated:
+            catalog_bulk_changed.send(sender=catalog.model, pks=None)
+    return created, updated
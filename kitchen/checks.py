@@ -0,0 +1,38 @@
+"""
+System checks for the caches the kitchen keeps its derived state in.
+
+The page cache tags, version counters, ingredient index and similarity
+generations, live event log and catalog counters all live in the default
+cache, and every worker must see the same values. A per-process backend
+gives each worker its own copy, so a write invalidates only the worker
+that made it and the others keep serving stale pages. ``manage.py check
+--deploy`` fails on such a backend; a deploy that really runs a single
+process can silence ``kitchen.E001``.
+"""
+from django.conf import settings
+from django.core.checks import Error, Tags, register
+
+# Backends whose entries are not seen by the other processes.
+PROCESS_LOCAL_CACHES = {
+    "django.core.cache.backends.dummy.DummyCache",
+    "django.core.cache.backends.locmem.LocMemCache",
+}
+
+
+@register(Tags.caches, deploy=True)
+def check_shared_cache(app_configs, **kwargs):
+    backend = settings.CACHES.get("default", {}).get("BACKEND")
+    if backend not in PROCESS_LOCAL_CACHES:
+        return []
+    return [
+        Error(
+            f"The default cache ({backend}) is not shared between worker "
+            "processes, so each one keeps its own cached pages and "
+            "derived state and misses the others' invalidations.",
+            hint=(
+                "Set CACHE_BACKEND and CACHE_LOCATION to a Redis or "
+                "Memcached server."
+            ),
+            id="kitchen.E001",
+        )
+    ]
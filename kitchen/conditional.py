@@ -0,0 +1,83 @@
+import hashlib
+
+from django.middleware.csrf import get_token
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import quote_etag
+
+from kitchen import versions
+
+
+class ConditionalViewMixin:
+    """
+    Answers ``If-None-Match`` with a 304 before the view queries or renders
+    anything, like ``django.views.decorators.http.condition``.
+
+    The ETag comes from the version stamps of the view's model and of
+    ``validator_models``, the other models its pages render, which every
+    committed write bumps. Reading them is a cache lookup, so no request
+    pays for a query over the table, cached or not. The ETag also covers
+    the URL, the user and the CSRF token, which the page header renders.
+    There is no ``Last-Modified``: its whole seconds cannot tell apart two
+    writes within the same second, so ``If-Modified-Since`` would keep a
+    page that the second write changed.
+    """
+    validator_models = ()
+
+    def get_versioned_models(self):
+        return (self.model, *self.validator_models)
+
+    def etag_from_stamps(self, stamps):
+        # Settle the CSRF secret now so the first response already carries
+        # the ETag the follow-up requests will compute.
+        get_token(self.request)
+        fingerprint = repr((
+            sorted(
+                (model._meta.label_lower, stamp)
+                for model, stamp in stamps.items()
+            ),
+            self.request.get_full_path(),
+            self.request.user.pk,
+            self.request.META.get("CSRF_COOKIE"),
+        ))
+        etag = hashlib.md5(
+            fingerprint.encode(),
+            usedforsecurity=False
+        ).hexdigest()
+        return quote_etag(etag)
+
+    def get_etag(self):
+        stamps = versions.get_versions(self.get_versioned_models())
+        return self.etag_from_stamps(stamps)
+
+    def conditional_response(self, request, etag):
+        return get_conditional_response(request, etag=etag)
+
+    @staticmethod
+    def set_validator_headers(response, etag):
+        response.headers.setdefault("ETag", etag)
+        # Pages are per user: keep them out of shared caches and make
+        # browsers revalidate every time.
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+    def get(self, request, *args, **kwargs):
+        etag = self.get_etag()
+        response = self.conditional_response(request, etag)
+        if response is None:
+            response = super().get(request, *args, **kwargs)
+        return self.set_validator_headers(response, etag)
+
+
+class AsyncConditionalViewMixin(ConditionalViewMixin):
+    """``ConditionalViewMixin`` for async views, on the async cache API."""
+
+    async def aget_etag(self):
+        stamps = await versions.aget_versions(self.get_versioned_models())
+        return self.etag_from_stamps(stamps)
+
+    async def get(self, request, *args, **kwargs):
+        etag = await self.aget_etag()
+        response = self.conditional_response(request, etag)
+        if response is None:
+            response = await super().get(request, *args, **kwargs)
+        return self.set_validator_headers(response, etag)
@@ -1,6 +1,38 @@
+import hashlib
+from functools import lru_cache
+
 from django.conf import settings
+from django.template.loader import get_template
+
+# Templates whose {% cache %} fragments are keyed on FRAGMENT_VERSION.
+FRAGMENT_TEMPLATES = (
+    "includes/navigation.html",
+)
 
 
 def cfg_assets_root(request):
 
     return {'ASSETS_ROOT': settings.ASSETS_ROOT}
+
+
+@lru_cache(maxsize=None)
+def fragment_version():
+    """
+    Digest of the cached fragment sources, so a deploy that edits them
+    starts from fresh cache keys. Cleared by the autoreloader in development.
+    """
+    digest = hashlib.md5(usedforsecurity=False)
+    for name in FRAGMENT_TEMPLATES:
+        digest.update(get_template(name).template.source.encode())
+    return digest.hexdigest()[:12]
+
+
+def template_fragments(request):
+    return {
+        "FRAGMENT_VERSION": fragment_version(),
+        "FRAGMENT_CACHE_TIMEOUT": getattr(
+            settings,
+            "KITCHEN_FRAGMENT_CACHE_TIMEOUT",
+            60 * 60 * 24
+        ),
+    }
@@ -0,0 +1,72 @@
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections, router
+
+from kitchen.models import Cook, Dish, DishType, Ingredient
+
+COUNTED_MODELS = {
+    "cooks": Cook,
+    "dishes": Dish,
+    "dish_types": DishType,
+    "ingredients": Ingredient,
+}
+
+CACHE_KEY_PREFIX = "kitchen:counter:"
+
+
+def cache_key(name):
+    return f"{CACHE_KEY_PREFIX}{name}"
+
+
+def cache_timeout():
+    return getattr(settings, "KITCHEN_COUNTER_TIMEOUT", 60 * 60 * 24)
+
+
+def count_all():
+    """Counts every table with one round trip of scalar subqueries."""
+    connection = connections[router.db_for_read(Dish)]
+    quote = connection.ops.quote_name
+    columns = ", ".join(
+        f"(SELECT COUNT(*) FROM {quote(model._meta.db_table)})"
+        for model in COUNTED_MODELS.values()
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(f"SELECT {columns}")
+        row = cursor.fetchone()
+    return dict(zip(COUNTED_MODELS, row))
+
+
+def rebuild():
+    counts = count_all()
+    cache.set_many(
+        {cache_key(name): value for name, value in counts.items()},
+        timeout=cache_timeout(),
+    )
+    return counts
+
+
+def get_counts():
+    keys = {cache_key(name): name for name in COUNTED_MODELS}
+    cached = cache.get_many(keys)
+    if len(cached) == len(keys):
+        return {keys[key]: value for key, value in cached.items()}
+    return rebuild()
+
+
+async def aget_counts():
+    keys = {cache_key(name): name for name in COUNTED_MODELS}
+    cached = await cache.aget_many(keys)
+    if len(cached) == len(keys):
+        return {keys[key]: value for key, value in cached.items()}
+    # count_all() already answers all four counts in one round trip, which
+    # beats four concurrent COUNT queries on the same connection.
+    return await sync_to_async(rebuild)()
+
+
+def adjust(name, delta):
+    try:
+        cache.incr(cache_key(name), delta)
+    except ValueError:
+        # Not cached: the next read recounts from the database.
+        pass
@@ -0,0 +1,248 @@
+"""
+Change events for the live kitchen screens, streamed as Server-Sent Events.
+
+Committed writes to dishes and cooks are appended to a log in the shared
+cache: a ``Generation`` counter hands out the event ids and each event is
+kept under its id for ``EVENT_TIMEOUT`` seconds. Every worker reads the
+same log, so a screen reconnecting with the ``Last-Event-ID`` it saw is
+replayed what it missed whichever worker it reaches, and gets a
+``reset`` event, telling it to reload, only when more than
+``BUFFER_SIZE`` events passed or some of them are gone. A counter lost to
+eviction restarts past any id a screen has seen, which resets it too.
+
+Open streams read the log every ``POLL`` seconds, and at once when their
+own worker publishes, so screens see the writes committed through any
+worker.
+"""
+import asyncio
+import json
+import threading
+from dataclasses import dataclass, field
+
+from django.core.cache import cache
+
+from kitchen.generations import Generation
+from kitchen.models import Cook, Dish
+
+# Events a reconnecting screen can be replayed.
+BUFFER_SIZE = 1000
+
+EVENT_TIMEOUT = 60 * 60
+
+# Seconds between reads of the log by an open stream.
+POLL = 1
+
+# Seconds between comments that keep idle connections open through
+# proxies.
+KEEPALIVE = 15
+
+# Milliseconds a screen waits before reconnecting.
+RETRY = 3000
+
+MODEL_TOPICS = {Dish: "dish", Cook: "cook"}
+TOPICS = tuple(MODEL_TOPICS.values())
+
+
+@dataclass
+class Event:
+    id: str
+    topic: str
+    data: dict
+
+    def encode(self):
+        return (
+            f"id: {self.id}\nevent: {self.topic}\n"
+            f"data: {json.dumps(self.data, separators=(',', ':'))}\n\n"
+        )
+
+
+@dataclass(eq=False)
+class Subscription:
+    loop: asyncio.AbstractEventLoop
+    topics: frozenset
+    woken: asyncio.Event = field(default_factory=asyncio.Event)
+
+    def wake(self):
+        """Runs on the subscriber's loop."""
+        self.woken.set()
+
+    async def wait(self, timeout):
+        """Until this worker publishes one of the topics or ``timeout``."""
+        try:
+            await asyncio.wait_for(self.woken.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        self.woken.clear()
+
+
+class Broker:
+    def __init__(self, size=BUFFER_SIZE, key_prefix="kitchen:events"):
+        self.size = size
+        self.key_prefix = key_prefix
+        self.counter = Generation(f"{key_prefix}:last")
+        self.lock = threading.Lock()
+        self.subscriptions = set()
+
+    def event_key(self, number):
+        return f"{self.key_prefix}:{number}"
+
+    def publish(self, topic, data):
+        """Appends an event to the log and wakes the open streams."""
+        number = self.counter.next()
+        cache.set(self.event_key(number), (topic, data), EVENT_TIMEOUT)
+        with self.lock:
+            subscriptions = [
+                subscription for subscription in self.subscriptions
+                if topic in subscription.topics
+            ]
+        for subscription in subscriptions:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.wake)
+            except RuntimeError:
+                # The loop has closed under a stream that never ended.
+                self.unsubscribe(subscription)
+        return Event(str(number), topic, data)
+
+    def missed_keys(self, after, last):
+        """
+        Log keys of the events after ``after`` up to ``last``, or ``None``
+        when more than the buffer passed.
+        """
+        if after is None or after > last or last - after > self.size:
+            return None
+        return [self.event_key(n) for n in range(after + 1, last + 1)]
+
+    def missed_events(self, keys, found, topics):
+        """The events of ``keys``, or ``None`` when some are gone."""
+        if len(found) < len(keys):
+            return None
+        return [
+            Event(key.rpartition(":")[2], *found[key]) for key in keys
+            if found[key][0] in topics
+        ]
+
+    def catch_up(self, topics, last_id, last):
+        """
+        Events to send a screen before the live ones: what it missed after
+        ``last_id``, a ``reset`` when that is gone, or a ``hello`` carrying
+        the id to resume from when it has none.
+        """
+        if not last_id:
+            return [Event(str(last), "hello", {})]
+        after = int(last_id) if last_id.isdigit() else None
+        keys = self.missed_keys(after, last)
+        missed = None
+        if keys is not None:
+            missed = self.missed_events(keys, cache.get_many(keys), topics)
+        if missed is None:
+            return [Event(str(last), "reset", {})]
+        return missed
+
+    async def acatch_up(self, topics, last_id, last):
+        if not last_id:
+            return [Event(str(last), "hello", {})]
+        after = int(last_id) if last_id.isdigit() else None
+        keys = self.missed_keys(after, last)
+        missed = None
+        if keys is not None:
+            found = await cache.aget_many(keys)
+            missed = self.missed_events(keys, found, topics)
+        if missed is None:
+            return [Event(str(last), "reset", {})]
+        return missed
+
+    def subscribe(self, topics=TOPICS, loop=None):
+        """
+        Opens a stream of ``topics`` on ``loop`` (the running one by
+        default).
+        """
+        subscription = Subscription(
+            loop or asyncio.get_running_loop(),
+            frozenset(topics),
+        )
+        with self.lock:
+            self.subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self.lock:
+            self.subscriptions.discard(subscription)
+
+    async def stream(self, topics=TOPICS, last_id=None, keepalive=None):
+        """SSE lines of the replayed and then the live events."""
+        keepalive = keepalive or KEEPALIVE
+        subscription = self.subscribe(topics)
+        loop = asyncio.get_running_loop()
+        try:
+            yield f"retry: {RETRY}\n\n"
+            last = await self.counter.acurrent()
+            for event in await self.acatch_up(
+                subscription.topics, last_id, last
+            ):
+                yield event.encode()
+            quiet_since = loop.time()
+            while True:
+                await subscription.wait(min(
+                    POLL,
+                    max(quiet_since + keepalive - loop.time(), 0),
+                ))
+                current = await self.counter.acurrent()
+                if current != last:
+                    replay = await self.acatch_up(
+                        subscription.topics, str(last), current
+                    )
+                    last = current
+                    for event in replay:
+                        yield event.encode()
+                    if replay:
+                        quiet_since = loop.time()
+                        continue
+                if loop.time() - quiet_since >= keepalive:
+                    yield ": keepalive\n\n"
+                    quiet_since = loop.time()
+        finally:
+            self.unsubscribe(subscription)
+
+    def replay(self, topics=TOPICS, last_id=None):
+        """SSE text of the events a screen missed, for sync servers."""
+        replay = self.catch_up(
+            frozenset(topics), last_id, self.counter.current()
+        )
+        return f"retry: {RETRY}\n\n" + "".join(
+            event.encode() for event in replay
+        )
+
+
+broker = Broker()
+
+
+def publish(topic, data):
+    return broker.publish(topic, data)
+
+
+def saved_data(instance):
+    """The fields the screens show, read off the saved instance."""
+    if isinstance(instance, Dish):
+        return dish_data(instance)
+    return cook_data(instance)
+
+
+def dish_data(dish):
+    return {
+        "action": "saved",
+        "pk": dish.pk,
+        "name": dish.name,
+        "price": str(dish.price),
+        "type_id": dish.type_id,
+    }
+
+
+def cook_data(cook):
+    return {
+        "action": "saved",
+        "pk": cook.pk,
+        "username": cook.username,
+        "first_name": cook.first_name,
+        "last_name": cook.last_name,
+        "years_of_experience": cook.years_of_experience,
+    }
@@ -1,26 +1,63 @@
 from django import forms
 from django.contrib.auth import get_user_model
 from django.contrib.auth.forms import UserCreationForm
+from django.urls import reverse_lazy
 
+from kitchen import bulk_edit, ingredient_index, relations
 from kitchen.models import Dish, Cook, Ingredient
+from kitchen.search import get_search_backend
+from kitchen.widgets import AutocompleteSelectMultiple
+
+
+class SearchFormMixin:
+    """Filters a queryset through the configured search backend."""
+    search_field = "name"
+
+    def search(self, queryset):
+        if not self.is_valid():
+            return queryset
+        return get_search_backend().search(
+            queryset,
+            self.cleaned_data[self.search_field]
+        )
 
 
 class DishForm(forms.ModelForm):
     cooks = forms.ModelMultipleChoiceField(
         queryset=get_user_model().objects.all(),
-        widget=forms.CheckboxSelectMultiple,
+        widget=AutocompleteSelectMultiple(
+            url=reverse_lazy("kitchen:autocomplete", args=["cooks"]),
+            placeholder="Search cooks",
+        ),
     )
     ingredients = forms.ModelMultipleChoiceField(
         queryset=Ingredient.objects.all(),
-        widget=forms.CheckboxSelectMultiple,
+        widget=AutocompleteSelectMultiple(
+            url=reverse_lazy("kitchen:autocomplete", args=["ingredients"]),
+            placeholder="Search ingredients",
+        ),
     )
 
     class Meta:
         model = Dish
         fields = "__all__"
 
+    def save(self, commit=True):
+        self._created = self.instance._state.adding
+        return super().save(commit)
+
+    def _save_m2m(self):
+        # Writes only the links that changed, instead of set().
+        for name in ("cooks", "ingredients"):
+            relations.set_related(
+                self.instance,
+                name,
+                self.cleaned_data[name],
+                created=self._created,
+            )
 
-class DishSearchForm(forms.Form):
+
+class DishSearchForm(SearchFormMixin, forms.Form):
     name = forms.CharField(
         max_length=255,
         required=False,
@@ -33,6 +70,131 @@ class DishSearchForm(forms.Form):
     )
 
 
+def autocomplete_picker(kind, queryset, label, placeholder):
+    return forms.ModelMultipleChoiceField(
+        queryset=queryset,
+        required=False,
+        label=label,
+        widget=AutocompleteSelectMultiple(
+            url=reverse_lazy("kitchen:autocomplete", args=[kind]),
+            placeholder=placeholder,
+        ),
+    )
+
+
+def ingredient_picker(label):
+    return autocomplete_picker(
+        "ingredients",
+        Ingredient.objects.all(),
+        label,
+        "Search ingredients",
+    )
+
+
+def cook_picker(label):
+    return autocomplete_picker(
+        "cooks",
+        get_user_model().objects.all(),
+        label,
+        "Search cooks",
+    )
+
+
+class DishIngredientQueryForm(forms.Form):
+    """Dishes by ingredients, answered by ``kitchen.ingredient_index``."""
+    include = ingredient_picker("With all of")
+    any_of = ingredient_picker("With any of")
+    exclude = ingredient_picker("Without")
+
+    def search(self):
+        if not self.is_valid():
+            return []
+        return ingredient_index.search(**{
+            name: [ingredient.pk for ingredient in self.cleaned_data[name]]
+            for name in ("include", "any_of", "exclude")
+        })
+
+
+class DishBulkPriceForm(forms.Form):
+    """Reprices the dishes of the bulk edit page."""
+    change = forms.ChoiceField(
+        choices=(("percent", "By percent"), ("amount", "By amount")),
+    )
+    value = forms.DecimalField(
+        max_digits=10,
+        decimal_places=2,
+        help_text="Negative values lower the prices, never below zero.",
+    )
+
+    def clean(self):
+        cleaned_data = super().clean()
+        if (
+            cleaned_data.get("change") == "percent"
+            and cleaned_data.get("value") is not None
+            and not -100 <= cleaned_data["value"] <= 1000
+        ):
+            self.add_error("value", "Give a percentage from -100 to 1000.")
+        return cleaned_data
+
+    def apply(self, dishes):
+        return bulk_edit.reprice(
+            dishes,
+            **{self.cleaned_data["change"]: self.cleaned_data["value"]}
+        )
+
+
+class DishBulkRelationForm(forms.Form):
+    """Adds, removes or replaces cooks or ingredients of many dishes."""
+    relation = None
+
+    action = forms.ChoiceField(
+        choices=(
+            ("add", "Add to the dishes"),
+            ("remove", "Remove from the dishes"),
+            ("replace", "Replace in the dishes"),
+        ),
+    )
+
+    def clean(self):
+        cleaned_data = super().clean()
+        targets = cleaned_data.get("targets")
+        replacement = cleaned_data.get("replacement")
+        if targets is not None and not targets:
+            self.add_error("targets", "Choose at least one.")
+        if cleaned_data.get("action") == "replace":
+            if replacement is not None and len(replacement) != 1:
+                self.add_error("replacement", "Choose exactly one.")
+            elif targets and replacement and replacement[0] in targets:
+                self.add_error("replacement", "Cannot replace with itself.")
+        elif replacement:
+            self.add_error("replacement", "Only used when replacing.")
+        return cleaned_data
+
+    def apply(self, dishes):
+        replacement = self.cleaned_data["replacement"]
+        return bulk_edit.change_relation(
+            dishes,
+            self.relation,
+            self.cleaned_data["action"],
+            self.cleaned_data["targets"],
+            replacement[0] if replacement else None,
+        )
+
+
+class DishBulkIngredientForm(DishBulkRelationForm):
+    relation = "ingredients"
+
+    targets = ingredient_picker("Ingredients")
+    replacement = ingredient_picker("Replace with")
+
+
+class DishBulkCookForm(DishBulkRelationForm):
+    relation = "cooks"
+
+    targets = cook_picker("Cooks")
+    replacement = cook_picker("Replace with")
+
+
 class CookCreationForm(UserCreationForm):
     class Meta(UserCreationForm.Meta):
         model = Cook
@@ -43,7 +205,9 @@ class CookCreationForm(UserCreationForm):
         )
 
 
-class CookSearchForm(forms.Form):
+class CookSearchForm(SearchFormMixin, forms.Form):
+    search_field = "username"
+
     username = forms.CharField(
         max_length=255,
         required=False,
@@ -62,7 +226,7 @@ class CookExperienceUpdateForm(forms.ModelForm):
         fields = ["years_of_experience", ]
 
 
-class DishTypeSearchForm(forms.Form):
+class DishTypeSearchForm(SearchFormMixin, forms.Form):
     name = forms.CharField(
         max_length=255,
         required=False,
@@ -75,7 +239,7 @@ class DishTypeSearchForm(forms.Form):
     )
 
 
-class IngredientSearchForm(forms.Form):
+class IngredientSearchForm(SearchFormMixin, forms.Form):
     name = forms.CharField(
         max_length=255,
         required=False,
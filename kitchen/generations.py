@@ -0,0 +1,46 @@
+"""
+Generation counters shared by the workers through the cache.
+
+In-process structures built from the catalog (``kitchen.ingredient_index``,
+``kitchen.similarity``) remember the generation they were built at. A
+committed write advances the counter, so every other worker can tell its
+copy is stale with one cache read.
+"""
+import time
+
+from django.core.cache import cache
+
+
+class Generation:
+    def __init__(self, key):
+        self.key = key
+
+    def start(self, initial=None):
+        # A counter lost to eviction restarts at an unrelated value, so it
+        # can never match a generation some worker built before the loss.
+        cache.add(self.key, initial or time.time_ns(), timeout=None)
+
+    def current(self, initial=None):
+        """
+        The current generation. An unset counter starts at what the
+        ``initial`` callable returns, if given.
+        """
+        generation = cache.get(self.key)
+        if generation is None:
+            self.start(initial and initial())
+            generation = cache.get(self.key)
+        return generation
+
+    async def acurrent(self):
+        generation = await cache.aget(self.key)
+        if generation is None:
+            await cache.aadd(self.key, time.time_ns(), timeout=None)
+            generation = await cache.aget(self.key)
+        return generation
+
+    def next(self):
+        try:
+            return cache.incr(self.key)
+        except ValueError:
+            self.start()
+            return cache.incr(self.key)
@@ -0,0 +1,178 @@
+"""
+In-process inverted index from ingredients to the dishes using them.
+
+Each ingredient maps to a sorted NumPy array of the ids of the dishes
+using it, so the index takes memory in proportion to the links rather
+than to the largest dish id. "All of", "any of" and "none of" queries are
+then a few sorted-array intersections, unions and differences instead of
+one join on the through table per ingredient.
+
+Every worker builds its own copy on first use. A committed write bumps a
+generation counter in the shared cache and stores the change under its
+generation for ``DELTA_TIMEOUT`` seconds. A worker whose copy is behind
+applies the changes it missed in order and rebuilds only when one of
+them is gone, is more than ``MAX_DELTAS`` behind, or was a set-based
+write that recorded none.
+"""
+import threading
+from itertools import chain
+
+import numpy as np
+from django.core.cache import cache
+
+from kitchen.generations import Generation
+from kitchen.models import Dish
+
+counter = Generation("kitchen:ingredient-index:generation")
+
+DELTA_KEY = "kitchen:ingredient-index:delta:{}"
+DELTA_TIMEOUT = 60 * 60
+MAX_DELTAS = 500
+
+EMPTY = np.zeros(0, np.int64)
+
+
+def ids_array(ids):
+    """``ids`` as a sorted array without duplicates."""
+    return np.unique(np.fromiter(ids, np.int64))
+
+
+class IngredientIndex:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.generation = None
+        self.dishes = EMPTY
+        self.arrays = {}
+
+    def build(self, generation):
+        # The generation is read before the rows, so a write racing the
+        # build leaves it stale rather than lost.
+        links = Dish.ingredients.through.objects.order_by(
+            "ingredient_id", "dish_id"
+        ).values_list("ingredient_id", "dish_id")
+        pairs = np.fromiter(
+            chain.from_iterable(links.iterator(chunk_size=10000)),
+            np.int64,
+        ).reshape(-1, 2)
+        starts = np.flatnonzero(np.diff(pairs[:, 0])) + 1
+        self.arrays = {
+            int(group[0, 0]): group[:, 1].copy()
+            for group in np.split(pairs, starts)
+            if len(group)
+        }
+        self.dishes = ids_array(
+            Dish.objects.values_list("pk", flat=True).iterator()
+        )
+        self.generation = generation
+
+    def catch_up(self, generation, known=None):
+        """
+        Applies the changes recorded since this copy's generation. Returns
+        whether the copy is now at ``generation``.
+        """
+        behind = range(self.generation + 1, generation + 1)
+        if not 0 < len(behind) <= MAX_DELTAS:
+            return generation == self.generation
+        deltas = dict(known or {})
+        missing = [n for n in behind if n not in deltas]
+        if missing:
+            found = cache.get_many([DELTA_KEY.format(n) for n in missing])
+            for n in missing:
+                if DELTA_KEY.format(n) not in found:
+                    return False
+                deltas[n] = found[DELTA_KEY.format(n)]
+        for n in behind:
+            change, args = deltas[n]
+            getattr(self, change)(*args)
+        self.generation = generation
+        return True
+
+    def ensure_current(self):
+        generation = counter.current()
+        if self.generation is None or not self.catch_up(generation):
+            self.build(generation)
+
+    def search(self, include=(), exclude=(), any_of=()):
+        """
+        Ids of the dishes using every ingredient of ``include``, at least
+        one of ``any_of`` (when given) and none of ``exclude``.
+        """
+        with self.lock:
+            self.ensure_current()
+            arrays = self.arrays
+            matches = self.dishes
+            # Smallest first, so each intersection is no bigger than it.
+            for array in sorted(
+                (arrays.get(pk, EMPTY) for pk in include), key=len
+            ):
+                matches = np.intersect1d(matches, array, assume_unique=True)
+            if any_of:
+                found = np.unique(np.concatenate([
+                    arrays.get(pk, EMPTY) for pk in any_of
+                ]))
+                matches = np.intersect1d(matches, found, assume_unique=True)
+            for pk in exclude:
+                matches = np.setdiff1d(
+                    matches, arrays.get(pk, EMPTY), assume_unique=True
+                )
+        return matches.tolist()
+
+    def apply(self, change, *args):
+        """
+        Records a committed write for every worker and runs the ``change``
+        method on this copy.
+        """
+        generation = counter.next()
+        cache.set(DELTA_KEY.format(generation), (change, args), DELTA_TIMEOUT)
+        with self.lock:
+            if self.generation is not None and not self.catch_up(
+                generation, {generation: (change, args)}
+            ):
+                self.generation = None
+
+    def link(self, ingredient_pks, dish_pks):
+        added = ids_array(dish_pks)
+        for pk in ingredient_pks:
+            self.arrays[pk] = np.union1d(self.arrays.get(pk, EMPTY), added)
+
+    def unlink(self, ingredient_pks, dish_pks):
+        removed = ids_array(dish_pks)
+        for pk in ingredient_pks:
+            if pk in self.arrays:
+                self.arrays[pk] = np.setdiff1d(
+                    self.arrays[pk], removed, assume_unique=True
+                )
+
+    def unlink_dishes(self, dish_pks):
+        self.unlink(list(self.arrays), dish_pks)
+
+    def add_dishes(self, dish_pks):
+        self.dishes = np.union1d(self.dishes, ids_array(dish_pks))
+
+    def remove_dishes(self, dish_pks):
+        self.unlink_dishes(dish_pks)
+        self.dishes = np.setdiff1d(
+            self.dishes, ids_array(dish_pks), assume_unique=True
+        )
+
+    def remove_ingredients(self, ingredient_pks):
+        for pk in ingredient_pks:
+            self.arrays.pop(pk, None)
+
+
+index = IngredientIndex()
+
+
+def search(include=(), exclude=(), any_of=()):
+    """See ``IngredientIndex.search``; answered by this worker's index."""
+    return index.search(include, exclude, any_of)
+
+
+def invalidate():
+    """
+    Makes every worker rebuild, e.g. after set-based writes: the
+    generation they are missing has no recorded change.
+    """
+    counter.next()
+    with index.lock:
+        index.generation = None
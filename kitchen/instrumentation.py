@@ -0,0 +1,183 @@
+import logging
+import threading
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from time import perf_counter
+
+from django.conf import settings
+from django.template.backends.django import DjangoTemplates, Template
+
+logger = logging.getLogger("kitchen.instrumentation")
+
+UNRESOLVED = "<unresolved>"
+
+# Metrics of the request being handled, set by the middleware; copied into
+# the threads that sync_to_async runs views and rendering in.
+current_metrics = ContextVar("kitchen_request_metrics", default=None)
+
+
+@dataclass
+class RequestMetrics:
+    view_name: str = UNRESOLVED
+    queries: int = 0
+    db_time: float = 0.0
+    template_time: float = 0.0
+    total_time: float = 0.0
+    query_budget: int = None
+    started: float = field(default_factory=perf_counter)
+    rendering: bool = field(default=False, repr=False)
+
+    def __call__(self, execute, sql, params, many, context):
+        """``connection.execute_wrapper`` hook counting and timing queries."""
+        start = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += perf_counter() - start
+            self.queries += 1
+
+    @property
+    def over_budget(self):
+        return (
+            self.query_budget is not None
+            and self.queries > self.query_budget
+        )
+
+    def server_timing(self):
+        return ", ".join((
+            f'db;dur={self.db_time * 1000:.1f};desc="{self.queries} queries"',
+            f"tpl;dur={self.template_time * 1000:.1f}",
+            f"total;dur={self.total_time * 1000:.1f}",
+        ))
+
+
+class TimedTemplate(Template):
+    """
+    Backend template adding its render time to the current request's
+    metrics. Templates rendered while another one renders, e.g. from a
+    template tag, are part of the outer time.
+    """
+
+    def render(self, context=None, request=None):
+        metrics = current_metrics.get()
+        if metrics is None or metrics.rendering:
+            return super().render(context, request)
+        metrics.rendering = True
+        start = perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            metrics.rendering = False
+            metrics.template_time += perf_counter() - start
+
+
+class InstrumentedDjangoTemplates(DjangoTemplates):
+    """
+    Django template backend whose templates are timed however they are
+    rendered: ``TemplateResponse``, ``render()`` or ``render_to_string()``.
+    """
+
+    def from_string(self, template_code):
+        template = super().from_string(template_code)
+        return TimedTemplate(template.template, self)
+
+    def get_template(self, template_name):
+        template = super().get_template(template_name)
+        return TimedTemplate(template.template, self)
+
+
+@dataclass
+class ViewStats:
+    view_name: str
+    requests: int = 0
+    queries: int = 0
+    max_queries: int = 0
+    db_time: float = 0.0
+    template_time: float = 0.0
+    total_time: float = 0.0
+    max_time: float = 0.0
+    over_budget: int = 0
+
+    def add(self, metrics):
+        self.requests += 1
+        self.queries += metrics.queries
+        self.max_queries = max(self.max_queries, metrics.queries)
+        self.db_time += metrics.db_time
+        self.template_time += metrics.template_time
+        self.total_time += metrics.total_time
+        self.max_time = max(self.max_time, metrics.total_time)
+        self.over_budget += metrics.over_budget
+
+    @property
+    def avg_queries(self):
+        return self.queries / self.requests
+
+    @property
+    def avg_db_ms(self):
+        return self.db_time * 1000 / self.requests
+
+    @property
+    def avg_template_ms(self):
+        return self.template_time * 1000 / self.requests
+
+    @property
+    def avg_total_ms(self):
+        return self.total_time * 1000 / self.requests
+
+    @property
+    def max_total_ms(self):
+        return self.max_time * 1000
+
+
+class StatsRegistry:
+    """Per-process aggregate of ``RequestMetrics`` keyed by URL name."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    def record(self, metrics):
+        with self._lock:
+            stats = self._stats.get(metrics.view_name)
+            if stats is None:
+                stats = self._stats[metrics.view_name] = ViewStats(
+                    metrics.view_name
+                )
+            stats.add(metrics)
+
+    def snapshot(self):
+        with self._lock:
+            return sorted(
+                (ViewStats(**vars(stats)) for stats in self._stats.values()),
+                key=lambda stats: stats.view_name,
+            )
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+
+
+registry = StatsRegistry()
+
+
+def get_query_budget(resolver_match):
+    """
+    Budget for a resolved view: ``KITCHEN_QUERY_BUDGETS[url_name]`` wins over
+    the view's own ``query_budget`` attribute.
+    """
+    if resolver_match is None:
+        return None
+    budgets = getattr(settings, "KITCHEN_QUERY_BUDGETS", {})
+    if resolver_match.view_name in budgets:
+        return budgets[resolver_match.view_name]
+    view = getattr(resolver_match.func, "view_class", resolver_match.func)
+    return getattr(view, "query_budget", None)
+
+
+def report_over_budget(metrics):
+    logger.warning(
+        "%s ran %d queries, over its budget of %d",
+        metrics.view_name,
+        metrics.queries,
+        metrics.query_budget,
+    )
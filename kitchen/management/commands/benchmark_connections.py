@@ -0,0 +1,96 @@
+import json
+
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from kitchen import benchmark
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure what opening a database connection costs and how much of "
+        "it each connection mode saves per request."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=100)
+        parser.add_argument("--database", default=DEFAULT_DB_ALIAS)
+        parser.add_argument(
+            "--max-age",
+            type=int,
+            default=60,
+            help="CONN_MAX_AGE of the persistent modes.",
+        )
+        parser.add_argument(
+            "--output",
+            help="Write the JSON results to this file.",
+        )
+
+    def get_modes(self, alias, max_age):
+        # Pooling rejects CONN_MAX_AGE, so the other modes run without it.
+        plain_options = {
+            key: value
+            for key, value in connections[alias].settings_dict[
+                "OPTIONS"
+            ].items()
+            if key != "pool"
+        }
+        plain = {"OPTIONS": plain_options}
+        return {
+            "per-request": {
+                **plain,
+                "CONN_MAX_AGE": 0,
+                "CONN_HEALTH_CHECKS": False,
+            },
+            "persistent": {
+                **plain,
+                "CONN_MAX_AGE": max_age,
+                "CONN_HEALTH_CHECKS": False,
+            },
+            "persistent+checks": {
+                **plain,
+                "CONN_MAX_AGE": max_age,
+                "CONN_HEALTH_CHECKS": True,
+            },
+            "configured": {},
+        }
+
+    def handle(self, *args, **options):
+        alias = options["database"]
+        iterations = options["iterations"]
+
+        connect = benchmark.connect_cost(alias, min(iterations, 20))
+        self.stdout.write(
+            f"{'connect':18} p50 {connect['p50_ms']:8.3f}ms "
+            f"p95 {connect['p95_ms']:8.3f}ms"
+        )
+
+        results = {"connect": connect}
+        modes = self.get_modes(alias, options["max_age"])
+        for name, overrides in modes.items():
+            result = benchmark.request_cycle_cost(
+                alias,
+                iterations,
+                **overrides
+            )
+            results[name] = result
+            self.stdout.write(
+                f"{name:18} p50 {result['p50_ms']:8.3f}ms "
+                f"p95 {result['p95_ms']:8.3f}ms "
+                f"{result['connects']:5d} connects / {iterations} requests"
+            )
+
+        if options["output"]:
+            report = {
+                "meta": {
+                    "revision": benchmark.git_revision(),
+                    "database": connections[alias].vendor,
+                    "iterations": iterations,
+                },
+                "results": results,
+            }
+            with open(options["output"], "w", encoding="utf-8") as stream:
+                json.dump(report, stream, indent=2)
+            self.stdout.write(self.style.SUCCESS(
+                f"Results written to {options['output']}"
+            ))
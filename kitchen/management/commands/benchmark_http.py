@@ -0,0 +1,139 @@
+import json
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.contrib.auth import (
+    BACKEND_SESSION_KEY,
+    HASH_SESSION_KEY,
+    SESSION_KEY,
+    get_user_model,
+)
+from django.contrib.auth.hashers import make_password
+from django.contrib.sessions.backends.db import SessionStore
+from django.core.management.base import BaseCommand, CommandError
+
+from kitchen import benchmark
+
+DEFAULT_URLS = (
+    "kitchen:index",
+    "kitchen:dish-list",
+    "kitchen:dish-detail",
+    "kitchen:cook-list",
+    "kitchen:cook-detail",
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Load-test a running server (gunicorn WSGI, or the ASGI deployment) "
+        "with increasing numbers of concurrent clients and report "
+        "throughput and latency per concurrency level."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "base_url",
+            help="Server to benchmark, e.g. http://127.0.0.1:8000",
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            nargs="+",
+            default=[1, 8, 32],
+        )
+        parser.add_argument(
+            "--duration",
+            type=float,
+            default=10.0,
+            help="Seconds per concurrency level.",
+        )
+        parser.add_argument(
+            "--url",
+            action="append",
+            dest="urls",
+            help="URL name to request (repeatable); read pages by default.",
+        )
+        parser.add_argument(
+            "--username",
+            default="benchmark",
+            help="Staff user to log in as; created if it does not exist.",
+        )
+        parser.add_argument("--label", help="Name of the setup under test.")
+        parser.add_argument(
+            "--output",
+            help="Write the JSON results to this file.",
+        )
+        parser.add_argument(
+            "--compare",
+            help="Results JSON of another setup or commit to diff against.",
+        )
+
+    def login(self, username):
+        """Session cookie for ``username``, stored in the shared database."""
+        user, _ = get_user_model().objects.get_or_create(
+            username=username,
+            defaults={"is_staff": True, "password": make_password(None)},
+        )
+        session = SessionStore()
+        session[SESSION_KEY] = str(user.pk)
+        session[BACKEND_SESSION_KEY] = settings.AUTHENTICATION_BACKENDS[0]
+        session[HASH_SESSION_KEY] = user.get_session_auth_hash()
+        session.create()
+        return f"{settings.SESSION_COOKIE_NAME}={session.session_key}"
+
+    def handle(self, *args, **options):
+        names = options["urls"] or DEFAULT_URLS
+        paths = dict(benchmark.discover_urls())
+        unknown = [name for name in names if paths.get(name) is None]
+        if unknown:
+            raise CommandError(
+                f"No sample path for: {', '.join(unknown)}"
+            )
+        headers = {"Cookie": self.login(options["username"])}
+
+        results = {}
+        for concurrency in options["concurrency"]:
+            result = benchmark.load_test(
+                options["base_url"],
+                [paths[name] for name in names],
+                concurrency,
+                duration=options["duration"],
+                headers=headers,
+            )
+            results[f"c{concurrency}"] = result
+            self.stdout.write(
+                f"{concurrency:4d} clients "
+                f"{result['rps']:9.1f} req/s "
+                f"p50 {result['p50_ms'] or 0:8.2f}ms "
+                f"p95 {result['p95_ms'] or 0:8.2f}ms "
+                f"{result['errors']:5d} errors"
+            )
+        report = {
+            "meta": {
+                "label": options["label"],
+                "base_url": options["base_url"],
+                "revision": benchmark.git_revision(),
+                "created": datetime.now(timezone.utc).isoformat(),
+                "urls": list(names),
+            },
+            "results": results,
+        }
+
+        if options["compare"]:
+            with open(options["compare"], encoding="utf-8") as stream:
+                baseline = json.load(stream)
+            self.stdout.write("")
+            for name, metric, old, new, change in benchmark.compare(
+                report, baseline, metrics=("rps", "p50_ms", "p95_ms")
+            ):
+                delta = "n/a" if change is None else f"{change:+.1f}%"
+                self.stdout.write(
+                    f"{name:6} {metric:8} {old:>10} -> {new:<10} {delta}"
+                )
+
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as stream:
+                json.dump(report, stream, indent=2)
+            self.stdout.write(self.style.SUCCESS(
+                f"Results written to {options['output']}"
+            ))
@@ -0,0 +1,84 @@
+import json
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.test import Client
+
+from kitchen import benchmark
+
+
+class Command(BaseCommand):
+    help = (
+        "Drive every kitchen URL through the test client and report p50/p95 "
+        "latency, queries per request and peak allocations as JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=20)
+        parser.add_argument("--warmup", type=int, default=2)
+        parser.add_argument(
+            "--output",
+            help="Write the JSON results to this file.",
+        )
+        parser.add_argument(
+            "--compare",
+            help="Baseline JSON file from an earlier run to diff against.",
+        )
+        parser.add_argument(
+            "--username",
+            default="benchmark",
+            help="Staff user to log in as; created if it does not exist.",
+        )
+        parser.add_argument("--host", default="localhost")
+        parser.add_argument(
+            "--url",
+            action="append",
+            dest="urls",
+            help="Only benchmark this URL name (repeatable).",
+        )
+
+    def handle(self, *args, **options):
+        user, _ = get_user_model().objects.get_or_create(
+            username=options["username"],
+            defaults={"is_staff": True, "password": make_password(None)},
+        )
+        client = Client(HTTP_HOST=options["host"])
+        client.force_login(user)
+
+        report = benchmark.run(
+            client,
+            iterations=options["iterations"],
+            warmup=options["warmup"],
+            only=options["urls"],
+        )
+
+        for name, result in report["results"].items():
+            self.stdout.write(
+                f"{name:32} {result['status']:>3} "
+                f"p50 {result['p50_ms']:8.2f}ms "
+                f"p95 {result['p95_ms']:8.2f}ms "
+                f"{result['queries']:4d} queries "
+                f"{result['alloc_peak_kb']:9.1f}KB"
+            )
+        for name in report["meta"]["skipped"]:
+            self.stdout.write(f"{name:32} skipped (no sample object)")
+
+        if options["compare"]:
+            with open(options["compare"], encoding="utf-8") as stream:
+                baseline = json.load(stream)
+            self.stdout.write("")
+            for name, metric, old, new, change in benchmark.compare(
+                report, baseline
+            ):
+                delta = "n/a" if change is None else f"{change:+.1f}%"
+                self.stdout.write(
+                    f"{name:32} {metric:14} {old:>10} -> {new:<10} {delta}"
+                )
+
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as stream:
+                json.dump(report, stream, indent=2)
+            self.stdout.write(self.style.SUCCESS(
+                f"Results written to {options['output']}"
+            ))
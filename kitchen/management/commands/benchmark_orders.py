@@ -0,0 +1,203 @@
+import json
+import random
+import threading
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Count, Q
+
+from kitchen import benchmark, scheduler
+from kitchen.catalog import batched
+from kitchen.instrumentation import RequestMetrics
+from kitchen.models import Dish, Order, OrderItem
+
+TABLE = "benchmark"
+
+# Orders per statement when reading or deleting the run's own orders.
+ORDER_BATCH_SIZE = 500
+
+
+class Command(BaseCommand):
+    help = (
+        "Queue a dinner rush of synthetic orders, assign them with the "
+        "scheduler and report tickets per second."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--orders", type=int, default=2000)
+        parser.add_argument(
+            "--items-per-order",
+            type=int,
+            nargs=2,
+            default=(1, 5),
+            metavar=("MIN", "MAX"),
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=scheduler.BATCH_SIZE,
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=1,
+            help="Scheduler threads draining the queue at once; more than "
+                 "one needs SKIP LOCKED (PostgreSQL).",
+        )
+        parser.add_argument(
+            "--keep",
+            action="store_true",
+            help="Keep the benchmark orders instead of deleting them.",
+        )
+        parser.add_argument(
+            "--output",
+            help="Write the JSON results to this file.",
+        )
+
+    def handle(self, *args, **options):
+        workers = options["workers"]
+        if (
+            workers > 1
+            and not connection.features.has_select_for_update_skip_locked
+        ):
+            raise CommandError(
+                f"{connection.vendor} cannot skip locked rows; "
+                "run with --workers 1."
+            )
+        dish_pks = list(
+            Dish.objects.filter(cook_count__gt=0).values_list("pk", flat=True)
+        )
+        if not dish_pks:
+            raise CommandError(
+                "No dish has a cook; run generate_kitchen_data first."
+            )
+        if OrderItem.objects.filter(status=OrderItem.Status.QUEUED).exists():
+            raise CommandError(
+                "The queue is not empty; drain it with schedule_orders."
+            )
+
+        order_pks, tickets = self.queue_orders(
+            random.Random(options["seed"]),
+            dish_pks,
+            options["orders"],
+            options["items_per_order"],
+        )
+        try:
+            result = self.run(workers, options["batch_size"], order_pks)
+        finally:
+            if not options["keep"]:
+                # Only the orders queued above: real ones may share the
+                # table name.
+                for batch in batched(order_pks, ORDER_BATCH_SIZE):
+                    Order.objects.filter(pk__in=batch).delete()
+
+        result = {"tickets": tickets, **result}
+        result["tickets_per_s"] = round(tickets / result["seconds"], 1)
+        self.stdout.write(
+            f"{tickets} tickets in {result['seconds']:.3f}s "
+            f"({result['tickets_per_s']:.1f}/s) with {workers} worker(s), "
+            f"{result['batches']} batches, "
+            f"{result['queries_per_batch']:.1f} queries per batch"
+        )
+        self.stdout.write(
+            f"{result['assigned']} assigned to {result['cooks']} cooks, "
+            f"{result['max_queue']} tickets on the longest queue, "
+            f"{result['no_cook']} without a cook"
+        )
+
+        if options["output"]:
+            report = {
+                "meta": {
+                    "revision": benchmark.git_revision(),
+                    "database": connection.vendor,
+                    "workers": workers,
+                    "batch_size": options["batch_size"],
+                    "seed": options["seed"],
+                },
+                "results": result,
+            }
+            with open(options["output"], "w", encoding="utf-8") as stream:
+                json.dump(report, stream, indent=2)
+            self.stdout.write(self.style.SUCCESS(
+                f"Results written to {options['output']}"
+            ))
+
+    def queue_orders(self, rng, dish_pks, count, items_per_order):
+        with transaction.atomic():
+            orders = Order.objects.bulk_create(
+                Order(table=TABLE) for _ in range(count)
+            )
+            items = (
+                OrderItem(
+                    order=order,
+                    dish_id=rng.choice(dish_pks),
+                    quantity=rng.randint(1, 3),
+                )
+                for order in orders
+                for _ in range(rng.randint(*items_per_order))
+            )
+            tickets = 0
+            for batch in batched(items, 2000):
+                tickets += len(OrderItem.objects.bulk_create(batch))
+        return [order.pk for order in orders], tickets
+
+    def run(self, workers, batch_size, order_pks):
+        batches = []
+        queries = []
+
+        def work():
+            metrics = RequestMetrics()
+            try:
+                with connection.execute_wrapper(metrics):
+                    count = 0
+                    while scheduler.assign_batch(batch_size)[0]:
+                        count += 1
+                batches.append(count)
+                queries.append(metrics.queries)
+            finally:
+                if workers > 1:
+                    connection.close()
+
+        threads = [threading.Thread(target=work) for _ in range(workers)]
+        started = time.perf_counter()
+        if workers == 1:
+            work()
+        else:
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        seconds = time.perf_counter() - started
+
+        totals = {"assigned": 0, "no_cook": 0}
+        depths = {}
+        for batch in batched(order_pks, ORDER_BATCH_SIZE):
+            items = OrderItem.objects.filter(order_id__in=batch)
+            counts = items.aggregate(
+                assigned=Count(
+                    "pk",
+                    filter=Q(status=OrderItem.Status.ASSIGNED),
+                ),
+                no_cook=Count(
+                    "pk",
+                    filter=Q(status=OrderItem.Status.NO_COOK),
+                ),
+            )
+            for key in totals:
+                totals[key] += counts[key]
+            rows = items.filter(cook__isnull=False).values(
+                "cook_id"
+            ).annotate(depth=Count("pk")).values_list("cook_id", "depth")
+            for cook_pk, depth in rows:
+                depths[cook_pk] = depths.get(cook_pk, 0) + depth
+        queues = list(depths.values())
+        return {
+            "seconds": seconds,
+            "batches": sum(batches),
+            "queries_per_batch": sum(queries) / max(sum(batches), 1),
+            **totals,
+            "cooks": len(queues),
+            "max_queue": max(queues, default=0),
+        }
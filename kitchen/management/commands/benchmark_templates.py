@@ -0,0 +1,88 @@
+import json
+import statistics
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.test import Client
+from django.test.utils import override_settings
+
+from kitchen import benchmark
+
+
+class Command(BaseCommand):
+    help = (
+        "Report the template render time of every kitchen page with the "
+        "plain loaders and no fragment cache (before) and with the cached "
+        "loader and fragment cache (after)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=20)
+        parser.add_argument("--warmup", type=int, default=2)
+        parser.add_argument(
+            "--output",
+            help="Write the JSON results to this file.",
+        )
+        parser.add_argument(
+            "--username",
+            default="benchmark",
+            help="Staff user to log in as; created if it does not exist.",
+        )
+        parser.add_argument("--host", default="localhost")
+        parser.add_argument(
+            "--url",
+            action="append",
+            dest="urls",
+            help="Only benchmark this URL name (repeatable).",
+        )
+
+    def handle(self, *args, **options):
+        user, _ = get_user_model().objects.get_or_create(
+            username=options["username"],
+            defaults={"is_staff": True, "password": make_password(None)},
+        )
+        paths = [
+            (name, path) for name, path in benchmark.discover_urls()
+            if path is not None
+            and (not options["urls"] or name in options["urls"])
+        ]
+
+        results = {}
+        for label, cached in (("before", False), ("after", True)):
+            with override_settings(**benchmark.template_settings(cached)):
+                client = Client(HTTP_HOST=options["host"])
+                client.force_login(user)
+                for name, path in paths:
+                    timings = benchmark.render_times(
+                        client,
+                        path,
+                        iterations=options["iterations"],
+                        warmup=options["warmup"],
+                    )
+                    if timings is None:
+                        continue
+                    results.setdefault(name, {"path": path})[label] = round(
+                        statistics.median(timings), 3
+                    )
+
+        for name, result in results.items():
+            before, after = result.get("before"), result.get("after")
+            if before is None or after is None:
+                continue
+            change = (after - before) / before * 100
+            self.stdout.write(
+                f"{name:32} {before:8.2f}ms -> {after:8.2f}ms "
+                f"{change:+6.1f}%"
+            )
+
+        if options["output"]:
+            report = {
+                "meta": {"revision": benchmark.git_revision()},
+                "results": results,
+            }
+            with open(options["output"], "w", encoding="utf-8") as stream:
+                json.dump(report, stream, indent=2)
+            self.stdout.write(self.style.SUCCESS(
+                f"Results written to {options['output']}"
+            ))
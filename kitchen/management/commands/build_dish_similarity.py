@@ -0,0 +1,43 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from kitchen import similarity
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the dish similarity matrix, store the similar dishes of "
+        "every dish and save the matrix to KITCHEN_SIMILARITY_PATH. With "
+        "--poll, keep the stored lists current with the catalog writes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--poll",
+            type=float,
+            default=0,
+            help="Seconds between refreshes of the lists changed by "
+                 "writes; 0 rebuilds everything once and exits.",
+        )
+
+    def handle(self, *args, **options):
+        if options["poll"]:
+            while True:
+                stored = similarity.refresh()
+                if stored:
+                    self.stdout.write(f"Refreshed {stored} similar lists")
+                time.sleep(options["poll"])
+        matrix = similarity.rebuild()
+        self.stdout.write(
+            f"{len(matrix.dish_ids)} dishes x "
+            f"{len(matrix.ingredient_ids)} ingredients "
+            f"({matrix.bits.nbytes} bytes)"
+        )
+        path = similarity.storage_path()
+        if path:
+            self.stdout.write(self.style.SUCCESS(f"Saved to {path}"))
+        else:
+            self.stdout.write(self.style.WARNING(
+                "KITCHEN_SIMILARITY_PATH is not set; nothing was saved."
+            ))
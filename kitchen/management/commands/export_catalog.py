@@ -0,0 +1,44 @@
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from kitchen.catalog import CATALOGS, FORMATS, get_catalog, get_writer
+
+
+class Command(BaseCommand):
+    help = "Stream a catalog model to CSV or JSON Lines in chunks."
+
+    def add_arguments(self, parser):
+        parser.add_argument("model", choices=list(CATALOGS))
+        parser.add_argument(
+            "--output",
+            default="-",
+            help="File to write, or - for stdout.",
+        )
+        parser.add_argument(
+            "--format",
+            choices=FORMATS,
+            help="Defaults to the output extension, or csv for stdout.",
+        )
+        parser.add_argument("--chunk-size", type=int, default=2000)
+
+    def handle(self, *args, **options):
+        output = options["output"]
+        fmt = options["format"] or (
+            "csv" if output == "-" else Path(output).suffix.lstrip(".")
+        )
+        if fmt not in FORMATS:
+            raise CommandError("Pass --format for this file.")
+
+        catalog = get_catalog(options["model"])
+        if output == "-":
+            self.dump(catalog, self.stdout, fmt, options)
+        else:
+            with open(output, "w", newline="", encoding="utf-8") as stream:
+                self.dump(catalog, stream, fmt, options)
+
+    def dump(self, catalog, stream, fmt, options):
+        writer = get_writer(stream, fmt, catalog)
+        writer.header()
+        for row in catalog.export_rows(chunk_size=options["chunk_size"]):
+            writer.write(row)
@@ -0,0 +1,183 @@
+import random
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from kitchen.catalog import batched
+from kitchen.models import Cook, Dish, DishType, Ingredient
+from kitchen.signals import catalog_bulk_changed
+
+FIRST_NAMES = (
+    "Anna", "Bohdan", "Chiara", "Daniel", "Elena", "Farid", "Greta",
+    "Hiro", "Iryna", "Jamal", "Kateryna", "Luca", "Maria", "Nikolai",
+    "Olena", "Pablo", "Quentin", "Rosa", "Sven", "Taras", "Yuki", "Zoe",
+)
+LAST_NAMES = (
+    "Bianchi", "Dubois", "Fischer", "Garcia", "Ivanenko", "Jensen",
+    "Kowalski", "Moreau", "Novak", "Okafor", "Petrenko", "Rossi",
+    "Schmidt", "Shevchenko", "Silva", "Tanaka", "Weber", "Yamamoto",
+)
+DISH_TYPES = (
+    "Pizza", "Pasta", "Soup", "Salad", "Grill", "Dessert", "Cake",
+    "Breakfast", "Seafood", "Curry", "Sandwich", "Stew", "Noodles",
+)
+INGREDIENT_WORDS = (
+    "Basil", "Garlic", "Tomato", "Onion", "Mozzarella", "Parmesan",
+    "Chicken", "Beef", "Salmon", "Shrimp", "Rice", "Potato", "Carrot",
+    "Mushroom", "Pepper", "Spinach", "Lemon", "Butter", "Cream", "Egg",
+    "Flour", "Sugar", "Chocolate", "Vanilla", "Honey", "Thyme", "Chili",
+)
+INGREDIENT_STYLES = (
+    "", "Fresh", "Smoked", "Dried", "Roasted", "Pickled", "Wild", "Aged",
+)
+DISH_STYLES = (
+    "Classic", "Spicy", "Creamy", "Rustic", "Grandma's", "Crispy",
+    "Slow-cooked", "Chef's", "Garden", "Royal", "Street", "Homemade",
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate a seeded synthetic catalog of cooks, dish types, "
+        "ingredients and dishes for load testing."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--cooks", type=int, default=1000)
+        parser.add_argument("--dish-types", type=int, default=50)
+        parser.add_argument("--ingredients", type=int, default=5000)
+        parser.add_argument("--dishes", type=int, default=50000)
+        parser.add_argument(
+            "--ingredients-per-dish",
+            type=int,
+            nargs=2,
+            default=(3, 12),
+            metavar=("MIN", "MAX"),
+        )
+        parser.add_argument(
+            "--cooks-per-dish",
+            type=int,
+            nargs=2,
+            default=(1, 4),
+            metavar=("MIN", "MAX"),
+        )
+        parser.add_argument("--batch-size", type=int, default=2000)
+
+    def handle(self, *args, **options):
+        if options["dishes"] and not options["dish_types"]:
+            raise CommandError("Dishes need at least one dish type.")
+        self.random = random.Random(options["seed"])
+        self.batch_size = options["batch_size"]
+        # Names carry a per-run prefix so reruns add rows instead of clashing.
+        self.prefix = f"{options['seed']}-{Cook.objects.count()}"
+
+        dish_types = self.create_dish_types(options["dish_types"])
+        ingredients = self.create_ingredients(options["ingredients"])
+        cooks = self.create_cooks(options["cooks"])
+        dishes = self.create_dishes(
+            options["dishes"],
+            dish_types,
+            ingredients,
+            cooks,
+            options["ingredients_per_dish"],
+            options["cooks_per_dish"],
+        )
+
+        for model in (DishType, Ingredient, Cook, Dish):
+            catalog_bulk_changed.send(sender=model, pks=None)
+        self.stdout.write(self.style.SUCCESS(
+            f"Generated {len(dish_types)} dish types, "
+            f"{len(ingredients)} ingredients, {len(cooks)} cooks "
+            f"and {dishes} dishes."
+        ))
+
+    def bulk_create(self, model, objects):
+        pks = []
+        for batch in batched(objects, self.batch_size):
+            with transaction.atomic():
+                pks += [obj.pk for obj in model.objects.bulk_create(batch)]
+        return pks
+
+    def create_dish_types(self, count):
+        def name(index):
+            kind = DISH_TYPES[index % len(DISH_TYPES)]
+            return f"{kind} {self.prefix}-{index}"
+
+        return self.bulk_create(DishType, (
+            DishType(name=name(index)) for index in range(count)
+        ))
+
+    def create_ingredients(self, count):
+        def name(index):
+            style = self.random.choice(INGREDIENT_STYLES)
+            word = self.random.choice(INGREDIENT_WORDS)
+            return f"{style} {word} {index}".strip()[:63]
+
+        return self.bulk_create(Ingredient, (
+            Ingredient(name=name(index)) for index in range(count)
+        ))
+
+    def create_cooks(self, count):
+        password = make_password(None)
+        return self.bulk_create(Cook, (
+            Cook(
+                username=f"cook_{self.prefix}_{index}",
+                first_name=self.random.choice(FIRST_NAMES),
+                last_name=self.random.choice(LAST_NAMES),
+                years_of_experience=min(
+                    int(self.random.expovariate(1 / 6)),
+                    45
+                ),
+                password=password,
+            )
+            for index in range(count)
+        ))
+
+    def create_dishes(
+        self,
+        count,
+        dish_types,
+        ingredients,
+        cooks,
+        ingredients_per_dish,
+        cooks_per_dish,
+    ):
+        ingredient_links = Dish.ingredients.through
+        cook_links = Dish.cooks.through
+
+        def dish(index):
+            style = self.random.choice(DISH_STYLES)
+            main = self.random.choice(INGREDIENT_WORDS)
+            price = Decimal(f"{self.random.lognormvariate(2.6, 0.5):.2f}")
+            return Dish(
+                name=f"{style} {main} #{index}",
+                description=f"{style} dish built around {main.lower()}.",
+                price=price,
+                type_id=self.random.choice(dish_types),
+            )
+
+        def sample(population, bounds):
+            low, high = bounds
+            size = min(self.random.randint(low, high), len(population))
+            return self.random.sample(population, size)
+
+        created = 0
+        dishes = (dish(index) for index in range(count))
+        for batch in batched(dishes, self.batch_size):
+            with transaction.atomic():
+                Dish.objects.bulk_create(batch)
+                ingredient_links.objects.bulk_create(
+                    ingredient_links(dish_id=obj.pk, ingredient_id=pk)
+                    for obj in batch
+                    for pk in sample(ingredients, ingredients_per_dish)
+                )
+                cook_links.objects.bulk_create(
+                    cook_links(dish_id=obj.pk, cook_id=pk)
+                    for obj in batch
+                    for pk in sample(cooks, cooks_per_dish)
+                )
+            created += len(batch)
+        return created
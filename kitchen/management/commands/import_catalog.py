@@ -0,0 +1,58 @@
+import sys
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from kitchen.catalog import (
+    CATALOGS,
+    FORMATS,
+    CatalogError,
+    get_catalog,
+    import_rows,
+    read_rows,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Stream a CSV or JSON Lines file into the catalog in batches. "
+        "Rows are matched on their natural key (name or username); "
+        "import dish types, ingredients and cooks before dishes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("model", choices=list(CATALOGS))
+        parser.add_argument("path", help="File to read, or - for stdin.")
+        parser.add_argument(
+            "--format",
+            choices=FORMATS,
+            help="Defaults to the file extension.",
+        )
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        fmt = options["format"] or Path(path).suffix.lstrip(".")
+        if fmt not in FORMATS:
+            raise CommandError("Pass --format for this file.")
+
+        try:
+            catalog = get_catalog(options["model"])
+            if path == "-":
+                created, updated = self.load(catalog, sys.stdin, fmt, options)
+            else:
+                with open(path, newline="", encoding="utf-8") as stream:
+                    created, updated = self.load(
+                        catalog, stream, fmt, options
+                    )
+        except CatalogError as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {options['model']}: "
+            f"{created} created, {updated} updated."
+        ))
+
+    def load(self, catalog, stream, fmt, options):
+        rows = read_rows(stream, fmt, catalog.list_fields)
+        return import_rows(catalog, rows, options["batch_size"])
@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from kitchen import counters
+
+
+class Command(BaseCommand):
+    help = "Recount the dashboard counters and store them in the cache."
+
+    def handle(self, *args, **options):
+        for name, value in counters.rebuild().items():
+            self.stdout.write(f"{name}: {value}")
+        self.stdout.write(self.style.SUCCESS("Dashboard counters rebuilt."))
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from kitchen import relation_counts
+
+
+class Command(BaseCommand):
+    help = (
+        "Recount the denormalized relation counts (Cook.dish_count, "
+        "Dish.cook_count...) and fix the rows that drifted."
+    )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            fixed = relation_counts.repair()
+        for (model, counted), rows in fixed.items():
+            field = relation_counts.COUNTS[model, counted][0]
+            self.stdout.write(
+                f"{model._meta.object_name}.{field}: {rows} fixed"
+            )
+        self.stdout.write(self.style.SUCCESS("Relation counts repaired."))
@@ -0,0 +1,37 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from kitchen import scheduler
+
+
+class Command(BaseCommand):
+    help = (
+        "Assign queued order items to qualified cooks. Several instances "
+        "can run at once: each claims rows the others have not locked."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=scheduler.BATCH_SIZE,
+        )
+        parser.add_argument(
+            "--poll",
+            type=float,
+            default=0,
+            help="Seconds to wait for new items once the queue is empty; "
+                 "0 drains it once and exits.",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            claimed, assigned = scheduler.drain(options["batch_size"])
+            if claimed or not options["poll"]:
+                self.stdout.write(
+                    f"Assigned {assigned} of {claimed} claimed items"
+                )
+            if not options["poll"]:
+                return
+            time.sleep(options["poll"])
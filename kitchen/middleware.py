@@ -0,0 +1,152 @@
+from contextlib import ExitStack
+from time import perf_counter
+
+from asgiref.sync import (
+    iscoroutinefunction,
+    markcoroutinefunction,
+    sync_to_async,
+)
+from django.conf import settings
+from django.db import connections
+
+from kitchen import routers, versions
+from kitchen.instrumentation import (
+    RequestMetrics,
+    current_metrics,
+    get_query_budget,
+    registry,
+    report_over_budget,
+)
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS", "TRACE")
+
+
+class QueryInstrumentationMiddleware:
+    """
+    Records query count, DB time, template render time (measured by
+    ``InstrumentedDjangoTemplates``) and total time of every request,
+    aggregates them per URL name and reports them in a ``Server-Timing``
+    header. The metrics are also attached to the response
+    as ``response.metrics`` for tests.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        metrics = RequestMetrics()
+        request.metrics = metrics
+        token = current_metrics.set(metrics)
+        try:
+            with self.wrap_connections(metrics):
+                response = self.get_response(request)
+        finally:
+            current_metrics.reset(token)
+        return self.finish(request, response, metrics)
+
+    async def __acall__(self, request):
+        # Connections are thread-local: wrap the ones of the thread-sensitive
+        # worker that runs this request's ORM calls and template rendering.
+        metrics = RequestMetrics()
+        request.metrics = metrics
+        token = current_metrics.set(metrics)
+        wrappers = await sync_to_async(self.wrap_connections)(metrics)
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(wrappers.close)()
+            current_metrics.reset(token)
+        return self.finish(request, response, metrics)
+
+    @staticmethod
+    def wrap_connections(metrics):
+        stack = ExitStack()
+        for alias in connections:
+            stack.enter_context(connections[alias].execute_wrapper(metrics))
+        return stack
+
+    def finish(self, request, response, metrics):
+        metrics.total_time = perf_counter() - metrics.started
+
+        resolver_match = getattr(request, "resolver_match", None)
+        if resolver_match is not None:
+            metrics.view_name = resolver_match.view_name
+        metrics.query_budget = get_query_budget(resolver_match)
+        if metrics.over_budget:
+            report_over_budget(metrics)
+        registry.record(metrics)
+
+        response.metrics = metrics
+        if getattr(settings, "KITCHEN_SERVER_TIMING", True):
+            response["Server-Timing"] = metrics.server_timing()
+        return response
+
+
+class PrimaryPinningMiddleware:
+    """
+    Scopes database routing to the request. Writes and the requests that
+    follow them read from the primary instead of the replica:
+
+    * unsafe methods, so forms validate against current data;
+    * requests carrying the cookie set after a write, e.g. the redirect
+      after a create view, for ``KITCHEN_REPLICA_LAG`` seconds;
+    * any request while a kitchen write is younger than the lag, so pages
+      and ETags cached from a lagging replica cannot outlive the write.
+
+    Does nothing unless ``KITCHEN_REPLICA_DATABASE`` is set.
+    """
+    cookie_name = "kitchen_primary"
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if routers.replica_alias() is None:
+            return self.get_response(request)
+        pinned = self.pins_request(request) or versions.written_within(
+            routers.replica_lag()
+        )
+        with routers.routing_context(pinned) as state:
+            response = self.get_response(request)
+        return self.finish(response, state)
+
+    async def __acall__(self, request):
+        if routers.replica_alias() is None:
+            return await self.get_response(request)
+        pinned = self.pins_request(request) or await sync_to_async(
+            versions.written_within
+        )(routers.replica_lag())
+        with routers.routing_context(pinned) as state:
+            response = await self.get_response(request)
+        return self.finish(response, state)
+
+    def pins_request(self, request):
+        return (
+            request.method not in SAFE_METHODS
+            or self.cookie_name in request.COOKIES
+        )
+
+    def finish(self, response, state):
+        if state.written:
+            response.set_cookie(
+                self.cookie_name,
+                "1",
+                max_age=routers.replica_lag(),
+                secure=settings.SESSION_COOKIE_SECURE,
+                httponly=True,
+                samesite="Lax",
+            )
+        return response
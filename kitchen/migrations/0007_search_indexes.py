@@ -0,0 +1,213 @@
+from django.db import migrations
+
+# The DDL as of this migration, kept here rather than built from
+# kitchen.search_schema so later edits to that module cannot change what
+# replaying this migration creates.
+
+POSTGRES_CREATE = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    (
+        "CREATE INDEX IF NOT EXISTS kitchen_cook_username_trgm ON "
+        "kitchen_cook USING gin ((UPPER(username::text)) gin_trgm_ops)"
+    ),
+    (
+        "CREATE INDEX IF NOT EXISTS kitchen_dish_name_trgm ON kitchen_dish "
+        "USING gin ((UPPER(name::text)) gin_trgm_ops)"
+    ),
+    (
+        "CREATE INDEX IF NOT EXISTS kitchen_dishtype_name_trgm ON "
+        "kitchen_dishtype USING gin ((UPPER(name::text)) gin_trgm_ops)"
+    ),
+    (
+        "CREATE INDEX IF NOT EXISTS kitchen_ingredient_name_trgm ON "
+        "kitchen_ingredient USING gin ((UPPER(name::text)) gin_trgm_ops)"
+    ),
+    (
+        "CREATE INDEX IF NOT EXISTS kitchen_dish_description_fts ON "
+        "kitchen_dish USING gin (to_tsvector('english'::regconfig, "
+        "COALESCE(description, '')))"
+    ),
+]
+
+POSTGRES_DROP = [
+    "DROP INDEX IF EXISTS kitchen_cook_username_trgm",
+    "DROP INDEX IF EXISTS kitchen_dish_name_trgm",
+    "DROP INDEX IF EXISTS kitchen_dishtype_name_trgm",
+    "DROP INDEX IF EXISTS kitchen_ingredient_name_trgm",
+    "DROP INDEX IF EXISTS kitchen_dish_description_fts",
+]
+
+SQLITE_CREATE = [
+    (
+        "CREATE VIRTUAL TABLE IF NOT EXISTS kitchen_dish_fts USING fts5(name, "
+        "description, ingredients, tokenize='trigram')"
+    ),
+    (
+        "INSERT INTO kitchen_dish_fts(rowid, name, description, ingredients) "
+        "SELECT id, name, description, (SELECT group_concat(i.name, ' ') FROM "
+        "kitchen_dish_ingredients l JOIN kitchen_ingredient i ON i.id = "
+        "l.ingredient_id WHERE l.dish_id = kitchen_dish.id) FROM kitchen_dish"
+    ),
+    (
+        "CREATE VIRTUAL TABLE IF NOT EXISTS kitchen_cook_fts USING "
+        "fts5(username, tokenize='trigram')"
+    ),
+    (
+        "INSERT INTO kitchen_cook_fts(rowid, username) SELECT id, username "
+        "FROM kitchen_cook"
+    ),
+    (
+        "CREATE VIRTUAL TABLE IF NOT EXISTS kitchen_dishtype_fts USING "
+        "fts5(name, tokenize='trigram')"
+    ),
+    (
+        "INSERT INTO kitchen_dishtype_fts(rowid, name) SELECT id, name FROM "
+        "kitchen_dishtype"
+    ),
+    (
+        "CREATE VIRTUAL TABLE IF NOT EXISTS kitchen_ingredient_fts USING "
+        "fts5(name, tokenize='trigram')"
+    ),
+    (
+        "INSERT INTO kitchen_ingredient_fts(rowid, name) SELECT id, name FROM "
+        "kitchen_ingredient"
+    ),
+    (
+        "CREATE TRIGGER IF NOT EXISTS kitchen_dish_fts_ai AFTER INSERT ON "
+        "kitchen_dish BEGIN INSERT INTO kitchen_dish_fts(rowid, name, "
+        "description, ingredients) VALUES (new.id, new.name, new.description, "
+        "(SELECT group_concat(i.name, ' ') FROM kitchen_dish_ingredients l "
+        "JOIN kitchen_ingredient i ON i.id = l.ingredient_id WHERE l.dish_id "
+        "= new.id)); END"
+    ),
+    (
+        "CREATE TRIGGER IF NOT EXISTS kitchen_dish_fts_au AFTER UPDATE OF "
+        "name, description ON kitchen_dish BEGIN UPDATE kitchen_dish_fts SET "
+        "name = new.name, description = new.description WHERE rowid = new.id; "
+        "END"
+    ),
+    (
+        "CREATE TRIGGER IF NOT EXISTS kitchen_dish_fts_ad AFTER DELETE ON "
+        "kitchen_dish BEGIN DELETE FROM kitchen_dish_fts WHERE rowid = "
+        "old.id; END"
+    ),
+    (
+        "CREATE TRIGGER IF NOT EXISTS kitchen_dish_ingredients_fts_ai AFTER "
+        "INSERT ON kitchen_dish_ingredients BEGIN UPDATE kitchen_dish_fts SET "
+        "ingredients = (SELECT group_concat(i.name, ' ') FROM "
+        "kitchen_dish_ingredients l JOIN kitchen_ingredient i ON i.id = "
+        "l.ingredient_id WHERE l.dish_id = new.dish_id) WHERE rowid = "
+        "new.dish_id; END"
+    ),
+    (
+        "CREATE TRIGGER IF NOT EXISTS kitchen_dish_ingredients_fts_ad AFTER "
+        "DELETE ON kitchen_dish_ingredients BEGIN UPDATE kitchen_dish_fts SET "
+        "ingredients = (SELECT group_concat(i.name, ' ') FROM "
+        "kitchen_dish_ingredients l JOIN kitchen_ingredient i ON i.id = "
+        "l.ingredient_id WHERE l.dish_id = old.dish_id) WHERE rowid = "
+        "old.dish_id; END"
+    ),
+    (
+        "CREATE TRIGGER IF NOT EXISTS kitchen_ingredient_dish_fts_au AFTER "
+        "UPDATE OF name ON kitchen_ingredient BEGIN UPDATE kitchen_dish_fts "
+        "SET ingredients = (SELECT group_concat(i.name, ' ') FROM "
+        "kitchen_dish_ingredients l JOIN kitchen_ingredient i ON i.id = "
+        "l.ingredient_id WHERE l.dish_id = kitchen_dish_fts.rowid) WHERE "
+        "rowid IN (SELECT dish_id FROM kitchen_dish_ingredients WHERE "
+        "ingredient_id = new.id); END"
+    ),
+    (
+        "CREATE TRIGGER IF NOT EXISTS kitchen_cook_fts_ai AFTER INSERT ON "
+        "kitchen_cook BEGIN INSERT INTO kitchen_cook_fts(rowid, username) "
+        "VALUES (new.id, new.username); END"
+    ),
+    (
+        "CREATE TRIGGER IF NOT EXISTS kitchen_cook_fts_au AFTER UPDATE OF "
+        "username ON kitchen_cook BEGIN UPDATE kitchen_cook_fts SET username "
+        "= new.username WHERE rowid = new.id; END"
+    ),
+    (
+        "CREATE TRIGGER IF NOT EXISTS kitchen_cook_fts_ad AFTER DELETE ON "
+        "kitchen_cook BEGIN DELETE FROM kitchen_cook_fts WHERE rowid = "
+        "old.id; END"
+    ),
+    (
+        "CREATE TRIGGER IF NOT EXISTS kitchen_dishtype_fts_ai AFTER INSERT ON "
+        "kitchen_dishtype BEGIN INSERT INTO kitchen_dishtype_fts(rowid, "
+        "name) VALUES (new.id, new.name); END"
+    ),
+    (
+        "CREATE TRIGGER IF NOT EXISTS kitchen_dishtype_fts_au AFTER UPDATE OF "
+        "name ON kitchen_dishtype BEGIN UPDATE kitchen_dishtype_fts SET name "
+        "= new.name WHERE rowid = new.id; END"
+    ),
+    (
+        "CREATE TRIGGER IF NOT EXISTS kitchen_dishtype_fts_ad AFTER DELETE ON "
+        "kitchen_dishtype BEGIN DELETE FROM kitchen_dishtype_fts WHERE rowid "
+        "= old.id; END"
+    ),
+    (
+        "CREATE TRIGGER IF NOT EXISTS kitchen_ingredient_fts_ai AFTER INSERT "
+        "ON kitchen_ingredient BEGIN INSERT INTO "
+        "kitchen_ingredient_fts(rowid, name) VALUES (new.id, new.name); END"
+    ),
+    (
+        "CREATE TRIGGER IF NOT EXISTS kitchen_ingredient_fts_au AFTER UPDATE "
+        "OF name ON kitchen_ingredient BEGIN UPDATE kitchen_ingredient_fts "
+        "SET name = new.name WHERE rowid = new.id; END"
+    ),
+    (
+        "CREATE TRIGGER IF NOT EXISTS kitchen_ingredient_fts_ad AFTER DELETE "
+        "ON kitchen_ingredient BEGIN DELETE FROM kitchen_ingredient_fts WHERE "
+        "rowid = old.id; END"
+    ),
+]
+
+SQLITE_DROP = [
+    "DROP TRIGGER IF EXISTS kitchen_dish_ingredients_fts_ai",
+    "DROP TRIGGER IF EXISTS kitchen_dish_ingredients_fts_ad",
+    "DROP TRIGGER IF EXISTS kitchen_ingredient_dish_fts_au",
+    "DROP TRIGGER IF EXISTS kitchen_dish_fts_ai",
+    "DROP TRIGGER IF EXISTS kitchen_dish_fts_au",
+    "DROP TRIGGER IF EXISTS kitchen_dish_fts_ad",
+    "DROP TRIGGER IF EXISTS kitchen_cook_fts_ai",
+    "DROP TRIGGER IF EXISTS kitchen_cook_fts_au",
+    "DROP TRIGGER IF EXISTS kitchen_cook_fts_ad",
+    "DROP TRIGGER IF EXISTS kitchen_dishtype_fts_ai",
+    "DROP TRIGGER IF EXISTS kitchen_dishtype_fts_au",
+    "DROP TRIGGER IF EXISTS kitchen_dishtype_fts_ad",
+    "DROP TRIGGER IF EXISTS kitchen_ingredient_fts_ai",
+    "DROP TRIGGER IF EXISTS kitchen_ingredient_fts_au",
+    "DROP TRIGGER IF EXISTS kitchen_ingredient_fts_ad",
+    "DROP TABLE IF EXISTS kitchen_dish_fts",
+    "DROP TABLE IF EXISTS kitchen_cook_fts",
+    "DROP TABLE IF EXISTS kitchen_dishtype_fts",
+    "DROP TABLE IF EXISTS kitchen_ingredient_fts",
+]
+
+
+def run_sql(statements_by_vendor):
+    """
+    ``RunPython`` operation executing the statements kept above for the
+    connection's backend; other backends are left alone.
+    """
+    def operation(apps, schema_editor):
+        vendor = schema_editor.connection.vendor
+        for statement in statements_by_vendor.get(vendor, ()):
+            schema_editor.execute(statement)
+
+    return operation
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("kitchen", "0006_alter_dishtype_options_alter_dishtype_table"),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            run_sql({"postgresql": POSTGRES_CREATE, "sqlite": SQLITE_CREATE}),
+            run_sql({"postgresql": POSTGRES_DROP, "sqlite": SQLITE_DROP}),
+        ),
+    ]
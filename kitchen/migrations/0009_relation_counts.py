@@ -0,0 +1,237 @@
+# Generated by Django 5.2.3 on 2026-10-18 18:56
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+# SQLite cannot rebuild a table that triggers on other tables refer to, so
+# the search triggers of 0007_search_indexes are dropped around the table
+# changes and created again afterwards. The statements are copies, kept
+# here so later edits to kitchen.search_schema cannot change them.
+SQLITE_CREATE_TRIGGERS = [
+    (
+        "CREATE TRIGGER IF NOT EXISTS kitchen_dish_fts_ai AFTER INSERT ON "
+        "kitchen_dish BEGIN INSERT INTO kitchen_dish_fts(rowid, name, "
+        "description, ingredients) VALUES (new.id, new.name, new.description, "
+        "(SELECT group_concat(i.name, ' ') FROM kitchen_dish_ingredients l "
+        "JOIN kitchen_ingredient i ON i.id = l.ingredient_id WHERE l.dish_id "
+        "= new.id)); END"
+    ),
+    (
+        "CREATE TRIGGER IF NOT EXISTS kitchen_dish_fts_au AFTER UPDATE OF "
+        "name, description ON kitchen_dish BEGIN UPDATE kitchen_dish_fts SET "
+        "name = new.name, description = new.description WHERE rowid = new.id; "
+        "END"
+    ),
+    (
+        "CREATE TRIGGER IF NOT EXISTS kitchen_dish_fts_ad AFTER DELETE ON "
+        "kitchen_dish BEGIN DELETE FROM kitchen_dish_fts WHERE rowid = "
+        "old.id; END"
+    ),
+    (
+        "CREATE TRIGGER IF NOT EXISTS kitchen_dish_ingredients_fts_ai AFTER "
+        "INSERT ON kitchen_dish_ingredients BEGIN UPDATE kitchen_dish_fts SET "
+        "ingredients = (SELECT group_concat(i.name, ' ') FROM "
+        "kitchen_dish_ingredients l JOIN kitchen_ingredient i ON i.id = "
+        "l.ingredient_id WHERE l.dish_id = new.dish_id) WHERE rowid = "
+        "new.dish_id; END"
+    ),
+    (
+        "CREATE TRIGGER IF NOT EXISTS kitchen_dish_ingredients_fts_ad AFTER "
+        "DELETE ON kitchen_dish_ingredients BEGIN UPDATE kitchen_dish_fts SET "
+        "ingredients = (SELECT group_concat(i.name, ' ') FROM "
+        "kitchen_dish_ingredients l JOIN kitchen_ingredient i ON i.id = "
+        "l.ingredient_id WHERE l.dish_id = old.dish_id) WHERE rowid = "
+        "old.dish_id; END"
+    ),
+    (
+        "CREATE TRIGGER IF NOT EXISTS kitchen_ingredient_dish_fts_au AFTER "
+        "UPDATE OF name ON kitchen_ingredient BEGIN UPDATE kitchen_dish_fts "
+        "SET ingredients = (SELECT group_concat(i.name, ' ') FROM "
+        "kitchen_dish_ingredients l JOIN kitchen_ingredient i ON i.id = "
+        "l.ingredient_id WHERE l.dish_id = kitchen_dish_fts.rowid) WHERE "
+        "rowid IN (SELECT dish_id FROM kitchen_dish_ingredients WHERE "
+        "ingredient_id = new.id); END"
+    ),
+    (
+        "CREATE TRIGGER IF NOT EXISTS kitchen_cook_fts_ai AFTER INSERT ON "
+        "kitchen_cook BEGIN INSERT INTO kitchen_cook_fts(rowid, username) "
+        "VALUES (new.id, new.username); END"
+    ),
+    (
+        "CREATE TRIGGER IF NOT EXISTS kitchen_cook_fts_au AFTER UPDATE OF "
+        "username ON kitchen_cook BEGIN UPDATE kitchen_cook_fts SET username "
+        "= new.username WHERE rowid = new.id; END"
+    ),
+    (
+        "CREATE TRIGGER IF NOT EXISTS kitchen_cook_fts_ad AFTER DELETE ON "
+        "kitchen_cook BEGIN DELETE FROM kitchen_cook_fts WHERE rowid = "
+        "old.id; END"
+    ),
+    (
+        "CREATE TRIGGER IF NOT EXISTS kitchen_dishtype_fts_ai AFTER INSERT ON "
+        "kitchen_dishtype BEGIN INSERT INTO kitchen_dishtype_fts(rowid, "
+        "name) VALUES (new.id, new.name); END"
+    ),
+    (
+        "CREATE TRIGGER IF NOT EXISTS kitchen_dishtype_fts_au AFTER UPDATE OF "
+        "name ON kitchen_dishtype BEGIN UPDATE kitchen_dishtype_fts SET name "
+        "= new.name WHERE rowid = new.id; END"
+    ),
+    (
+        "CREATE TRIGGER IF NOT EXISTS kitchen_dishtype_fts_ad AFTER DELETE ON "
+        "kitchen_dishtype BEGIN DELETE FROM kitchen_dishtype_fts WHERE rowid "
+        "= old.id; END"
+    ),
+    (
+        "CREATE TRIGGER IF NOT EXISTS kitchen_ingredient_fts_ai AFTER INSERT "
+        "ON kitchen_ingredient BEGIN INSERT INTO "
+        "kitchen_ingredient_fts(rowid, name) VALUES (new.id, new.name); END"
+    ),
+    (
+        "CREATE TRIGGER IF NOT EXISTS kitchen_ingredient_fts_au AFTER UPDATE "
+        "OF name ON kitchen_ingredient BEGIN UPDATE kitchen_ingredient_fts "
+        "SET name = new.name WHERE rowid = new.id; END"
+    ),
+    (
+        "CREATE TRIGGER IF NOT EXISTS kitchen_ingredient_fts_ad AFTER DELETE "
+        "ON kitchen_ingredient BEGIN DELETE FROM kitchen_ingredient_fts WHERE "
+        "rowid = old.id; END"
+    ),
+]
+
+SQLITE_DROP_TRIGGERS = [
+    "DROP TRIGGER IF EXISTS kitchen_dish_ingredients_fts_ai",
+    "DROP TRIGGER IF EXISTS kitchen_dish_ingredients_fts_ad",
+    "DROP TRIGGER IF EXISTS kitchen_ingredient_dish_fts_au",
+    "DROP TRIGGER IF EXISTS kitchen_dish_fts_ai",
+    "DROP TRIGGER IF EXISTS kitchen_dish_fts_au",
+    "DROP TRIGGER IF EXISTS kitchen_dish_fts_ad",
+    "DROP TRIGGER IF EXISTS kitchen_cook_fts_ai",
+    "DROP TRIGGER IF EXISTS kitchen_cook_fts_au",
+    "DROP TRIGGER IF EXISTS kitchen_cook_fts_ad",
+    "DROP TRIGGER IF EXISTS kitchen_dishtype_fts_ai",
+    "DROP TRIGGER IF EXISTS kitchen_dishtype_fts_au",
+    "DROP TRIGGER IF EXISTS kitchen_dishtype_fts_ad",
+    "DROP TRIGGER IF EXISTS kitchen_ingredient_fts_ai",
+    "DROP TRIGGER IF EXISTS kitchen_ingredient_fts_au",
+    "DROP TRIGGER IF EXISTS kitchen_ingredient_fts_ad",
+]
+
+
+def run_sql(statements_by_vendor):
+    """
+    ``RunPython`` operation executing the statements kept above for the
+    connection's backend; other backends are left alone.
+    """
+    def operation(apps, schema_editor):
+        vendor = schema_editor.connection.vendor
+        for statement in statements_by_vendor.get(vendor, ()):
+            schema_editor.execute(statement)
+
+    return operation
+
+
+def count_of(rows, column):
+    counted = rows.objects.filter(
+        **{column: OuterRef("pk")}
+    ).order_by().values(column).annotate(total=Count("*")).values("total")
+    return Coalesce(Subquery(counted), Value(0))
+
+
+def populate_counts(apps, schema_editor):
+    cook_model = apps.get_model("kitchen", "Cook")
+    dish_model = apps.get_model("kitchen", "Dish")
+    dish_type_model = apps.get_model("kitchen", "DishType")
+    ingredient_model = apps.get_model("kitchen", "Ingredient")
+    cooks = dish_model.cooks.through
+    ingredients = dish_model.ingredients.through
+
+    dish_model.objects.update(
+        cook_count=count_of(cooks, "dish_id"),
+        ingredient_count=count_of(ingredients, "dish_id"),
+    )
+    cook_model.objects.update(dish_count=count_of(cooks, "cook_id"))
+    ingredient_model.objects.update(
+        dish_count=count_of(ingredients, "ingredient_id"),
+    )
+    dish_type_model.objects.update(dish_count=count_of(dish_model, "type_id"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("kitchen", "0008_updated_at"),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            run_sql({"sqlite": SQLITE_DROP_TRIGGERS}),
+            run_sql({"sqlite": SQLITE_CREATE_TRIGGERS}),
+        ),
+        migrations.AddField(
+            model_name="cook",
+            name="dish_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="dish",
+            name="cook_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="dish",
+            name="ingredient_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="dishtype",
+            name="dish_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="ingredient",
+            name="dish_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name="cook",
+            index=models.Index(
+                fields=["-dish_count", "username", "id"],
+                name="cook_dish_count_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="dish",
+            index=models.Index(
+                fields=["-cook_count", "name", "id"],
+                name="dish_cook_count_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="dish",
+            index=models.Index(
+                fields=["-ingredient_count", "name", "id"],
+                name="dish_ingredient_count_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="dishtype",
+            index=models.Index(
+                fields=["-dish_count", "name", "id"],
+                name="dishtype_dish_count_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="ingredient",
+            index=models.Index(
+                fields=["-dish_count", "name", "id"],
+                name="ingredient_dish_count_idx",
+            ),
+        ),
+        migrations.RunPython(populate_counts, migrations.RunPython.noop),
+        migrations.RunPython(
+            run_sql({"sqlite": SQLITE_CREATE_TRIGGERS}),
+            run_sql({"sqlite": SQLITE_DROP_TRIGGERS}),
+        ),
+    ]
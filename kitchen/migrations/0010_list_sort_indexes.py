@@ -0,0 +1,54 @@
+# Generated by Django 5.2.3 on 2026-10-18 19:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("kitchen", "0009_relation_counts"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="cook",
+            index=models.Index(
+                fields=["-years_of_experience", "username", "id"],
+                name="cook_experience_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="dish",
+            index=models.Index(fields=["name", "id"], name="dish_name_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="dish",
+            index=models.Index(fields=["price", "id"], name="dish_price_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="dish",
+            index=models.Index(
+                fields=["type", "name", "id"], name="dish_type_name_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="dish",
+            index=models.Index(
+                fields=["type", "price", "id"], name="dish_type_price_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="dish",
+            index=models.Index(
+                fields=["type", "-cook_count", "name", "id"],
+                name="dish_type_cook_count_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="dish",
+            index=models.Index(
+                fields=["type", "-ingredient_count", "name", "id"],
+                name="dish_type_ingredient_count_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 5.2.3 on 2026-10-18 20:13
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("kitchen", "0011_order_tickets"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SimilarDish",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("rank", models.PositiveSmallIntegerField()),
+                ("score", models.FloatField()),
+                (
+                    "dish",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="similar_rows",
+                        to="kitchen.dish",
+                    ),
+                ),
+                (
+                    "similar",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="kitchen.dish",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ("dish", "rank"),
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("dish", "rank"),
+                        name="similardish_dish_rank_unique",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -5,21 +5,64 @@ from django.urls import reverse
 from kitchen_service.settings import base
 
 
-class DishType(models.Model):
+class RelationCountsMixin:
+    """
+    Leaves the denormalized relation counts out of updates: the signal
+    handlers in ``kitchen.relation_counts`` shift them in the database, so
+    the copy held by an instance goes stale and must not be written back.
+    """
+    count_fields = ("dish_count", )
+
+    def save(self, *args, **kwargs):
+        if (
+            not args
+            and not self._state.adding
+            and not kwargs.get("force_insert")
+            and kwargs.get("update_fields") is None
+        ):
+            kwargs["update_fields"] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name not in self.count_fields
+            ]
+        super().save(*args, **kwargs)
+
+
+class DishType(RelationCountsMixin, models.Model):
     name = models.CharField(max_length=255)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+    dish_count = models.PositiveIntegerField(default=0, editable=False)
 
     class Meta:
         ordering = ("name", )
+        indexes = [
+            models.Index(
+                fields=["-dish_count", "name", "id"],
+                name="dishtype_dish_count_idx",
+            ),
+        ]
 
     def __str__(self):
         return self.name
 
 
-class Cook(AbstractUser):
+class Cook(RelationCountsMixin, AbstractUser):
     years_of_experience = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+    dish_count = models.PositiveIntegerField(default=0, editable=False)
 
     class Meta:
         ordering = ("username", )
+        indexes = [
+            models.Index(
+                fields=["-dish_count", "username", "id"],
+                name="cook_dish_count_idx",
+            ),
+            models.Index(
+                fields=["-years_of_experience", "username", "id"],
+                name="cook_experience_idx",
+            ),
+        ]
 
     def __str__(self):
         return f"{self.username}: ({self.first_name} {self.last_name})"
@@ -28,17 +71,55 @@ class Cook(AbstractUser):
         return reverse("kitchen:cook-detail", kwargs={"pk": self.pk})
 
 
-class Ingredient(models.Model):
+class Ingredient(RelationCountsMixin, models.Model):
     name = models.CharField(max_length=63)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+    dish_count = models.PositiveIntegerField(default=0, editable=False)
 
     class Meta:
         ordering = ("name", )
+        indexes = [
+            models.Index(
+                fields=["-dish_count", "name", "id"],
+                name="ingredient_dish_count_idx",
+            ),
+        ]
 
     def __str__(self):
         return self.name
 
 
-class Dish(models.Model):
+class DishQuerySet(models.QuerySet):
+    def with_related(self, m2m=True):
+        """
+        Dish read path: the type is joined, cooks and ingredients come in one
+        prefetch query each, and only the columns the pages show are loaded.
+        """
+        queryset = self.select_related("type").only(
+            "name",
+            "description",
+            "price",
+            "type__name",
+        )
+        if not m2m:
+            return queryset
+        return queryset.prefetch_related(
+            models.Prefetch(
+                "ingredients",
+                queryset=Ingredient.objects.only("name"),
+            ),
+            models.Prefetch(
+                "cooks",
+                queryset=Cook.objects.only(
+                    "username",
+                    "first_name",
+                    "last_name",
+                ),
+            ),
+        )
+
+
+class Dish(RelationCountsMixin, models.Model):
     name = models.CharField(max_length=255)
     description = models.TextField()
     price = models.DecimalField(max_digits=10, decimal_places=2)
@@ -52,10 +133,144 @@ class Dish(models.Model):
         related_name="dishes"
     )
     ingredients = models.ManyToManyField(Ingredient, related_name="dishes")
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+    cook_count = models.PositiveIntegerField(default=0, editable=False)
+    ingredient_count = models.PositiveIntegerField(default=0, editable=False)
+
+    objects = DishQuerySet.as_manager()
+    count_fields = ("cook_count", "ingredient_count")
 
     class Meta:
         ordering = ("name", )
         verbose_name_plural = "dishes"
+        indexes = [
+            models.Index(fields=["name", "id"], name="dish_name_idx"),
+            models.Index(fields=["price", "id"], name="dish_price_idx"),
+            models.Index(
+                fields=["-cook_count", "name", "id"],
+                name="dish_cook_count_idx",
+            ),
+            models.Index(
+                fields=["-ingredient_count", "name", "id"],
+                name="dish_ingredient_count_idx",
+            ),
+            # The same orderings within one type.
+            models.Index(
+                fields=["type", "name", "id"],
+                name="dish_type_name_idx",
+            ),
+            models.Index(
+                fields=["type", "price", "id"],
+                name="dish_type_price_idx",
+            ),
+            models.Index(
+                fields=["type", "-cook_count", "name", "id"],
+                name="dish_type_cook_count_idx",
+            ),
+            models.Index(
+                fields=["type", "-ingredient_count", "name", "id"],
+                name="dish_type_ingredient_count_idx",
+            ),
+        ]
 
     def __str__(self):
         return f"{self.name} (price: {self.price}, type: {self.type})"
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Lets the count handlers see which type a saved dish moved from.
+        if "type_id" in instance.__dict__:
+            instance._loaded_type_id = instance.type_id
+        return instance
+
+
+class SimilarDish(models.Model):
+    """
+    One of the most similar dishes of ``dish``, stored by
+    ``kitchen.similarity`` so the dish page reads them with one query.
+    """
+    dish = models.ForeignKey(
+        Dish,
+        on_delete=models.CASCADE,
+        related_name="similar_rows"
+    )
+    similar = models.ForeignKey(
+        Dish,
+        on_delete=models.CASCADE,
+        related_name="+"
+    )
+    rank = models.PositiveSmallIntegerField()
+    score = models.FloatField()
+
+    class Meta:
+        ordering = ("dish", "rank")
+        constraints = [
+            models.UniqueConstraint(
+                fields=["dish", "rank"],
+                name="similardish_dish_rank_unique",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.dish_id} ~ {self.similar_id} ({self.score:.2f})"
+
+
+class Order(models.Model):
+    table = models.CharField(max_length=63, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        ordering = ("-created_at", "-id")
+
+    def __str__(self):
+        return f"Order #{self.pk}" + (f" ({self.table})" if self.table else "")
+
+
+class OrderItem(models.Model):
+    class Status(models.TextChoices):
+        QUEUED = "queued", "Queued"
+        ASSIGNED = "assigned", "Assigned"
+        DONE = "done", "Done"
+        NO_COOK = "no_cook", "No qualified cook"
+
+    order = models.ForeignKey(
+        Order,
+        on_delete=models.CASCADE,
+        related_name="items"
+    )
+    dish = models.ForeignKey(
+        Dish,
+        on_delete=models.PROTECT,
+        related_name="order_items"
+    )
+    quantity = models.PositiveIntegerField(default=1)
+    status = models.CharField(
+        max_length=15,
+        choices=Status.choices,
+        default=Status.QUEUED,
+    )
+    cook = models.ForeignKey(
+        base.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="tickets"
+    )
+    assigned_at = models.DateTimeField(null=True, blank=True)
+    done_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ("id", )
+        indexes = [
+            # The scheduler claims the oldest queued items first.
+            models.Index(fields=["status", "id"], name="orderitem_queue_idx"),
+            # Queue depth of each cook.
+            models.Index(
+                fields=["cook", "status"],
+                name="orderitem_cook_status_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.quantity} x {self.dish.name} ({self.status})"
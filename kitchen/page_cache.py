@@ -0,0 +1,190 @@
+"""
+Rendered-page cache with tag-based invalidation.
+
+Every cached page carries a few tags known before it is rendered, such as
+``dish:12`` for a dish page or ``ingredient:list`` for the ingredient list,
+and stores the tag versions it was rendered under. Writes delete the tags
+they affect. ``DEPENDENCIES`` fans a write out to the pages that render the
+changed row without being about it: a renamed ingredient invalidates every
+dish listing it, and a renamed cook invalidates their dishes. A page whose
+tag versions no longer match is a miss, so the TTL can be long.
+"""
+import hashlib
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.middleware.csrf import get_token
+
+from kitchen.models import Cook, Dish, DishType, Ingredient
+
+PAGE_KEY_PREFIX = "kitchen:page:"
+TAG_KEY_PREFIX = "kitchen:tag:"
+
+# Carried by every page and deleted by writes that can touch any row.
+CATALOG_TAG = "catalog"
+
+# Changed model -> (model whose pages render it, lookup from that model).
+DEPENDENCIES = {
+    DishType: ((Dish, "type"), (Cook, "dishes__type")),
+    Ingredient: ((Dish, "ingredients"), ),
+    Cook: ((Dish, "cooks"), ),
+    Dish: ((Cook, "dishes"), ),
+}
+
+
+def cache_timeout():
+    return getattr(settings, "KITCHEN_PAGE_CACHE_TIMEOUT", 60 * 60 * 24)
+
+
+def object_tag(model, pk):
+    return f"{model._meta.model_name}:{pk}"
+
+
+def list_tag(model):
+    return f"{model._meta.model_name}:list"
+
+
+def dependent_tags(model, pks):
+    """Tags of every page showing one of the ``pks`` rows of ``model``."""
+    tags = {list_tag(model)}
+    tags.update(object_tag(model, pk) for pk in pks)
+    for dependent, lookup in DEPENDENCIES.get(model, ()):
+        related = dependent.objects.filter(
+            **{f"{lookup}__in": pks}
+        ).values_list("pk", flat=True).distinct()
+        tags.update(object_tag(dependent, pk) for pk in related)
+    return tags
+
+
+def tag_key(tag):
+    return f"{TAG_KEY_PREFIX}{tag}"
+
+
+def tag_versions(tags):
+    """Current version of every tag, creating missing ones."""
+    keys = {tag_key(tag): tag for tag in tags}
+    found = cache.get_many(keys)
+    missing = [key for key in keys if key not in found]
+    if missing:
+        for key in missing:
+            cache.add(key, uuid.uuid4().hex, timeout=None)
+        found.update(cache.get_many(missing))
+    return {tag: found.get(key) for key, tag in keys.items()}
+
+
+async def atag_versions(tags):
+    keys = {tag_key(tag): tag for tag in tags}
+    found = await cache.aget_many(keys)
+    missing = [key for key in keys if key not in found]
+    if missing:
+        for key in missing:
+            await cache.aadd(key, uuid.uuid4().hex, timeout=None)
+        found.update(await cache.aget_many(missing))
+    return {tag: found.get(key) for key, tag in keys.items()}
+
+
+def invalidate(tags):
+    cache.delete_many([tag_key(tag) for tag in tags])
+
+
+def page_key(request):
+    # The page embeds the user's CSRF token, so the secret is part of the
+    # key as well as the user.
+    get_token(request)
+    fingerprint = repr((
+        request.resolver_match.view_name,
+        request.user.pk,
+        request.META.get("CSRF_COOKIE"),
+        request.get_full_path(),
+    ))
+    digest = hashlib.md5(fingerprint.encode(), usedforsecurity=False)
+    return f"{PAGE_KEY_PREFIX}{digest.hexdigest()}"
+
+
+def get_page(key):
+    entry = cache.get(key)
+    if entry is None:
+        return None
+    current = cache.get_many([tag_key(tag) for tag in entry["tags"]])
+    return page_from_entry(entry, current)
+
+
+async def aget_page(key):
+    entry = await cache.aget(key)
+    if entry is None:
+        return None
+    current = await cache.aget_many([tag_key(tag) for tag in entry["tags"]])
+    return page_from_entry(entry, current)
+
+
+def page_from_entry(entry, current):
+    for tag, version in entry["tags"].items():
+        if current.get(tag_key(tag)) != version:
+            return None
+    return HttpResponse(entry["content"], content_type=entry["content_type"])
+
+
+def set_page(key, response, versions):
+    if None in versions.values():
+        return
+    cache.set(
+        key,
+        {
+            "content": response.content,
+            "content_type": response["Content-Type"],
+            "tags": versions,
+        },
+        cache_timeout(),
+    )
+
+
+class PageCacheMixin:
+    """
+    Serves GET requests from the page cache. ``cache_tags`` are formatted
+    with the URL kwargs, e.g. ``"dish:{pk}"``; their versions are read
+    before rendering so a write racing the render still invalidates it.
+    """
+    cache_tags = ()
+
+    def get_cache_tags(self):
+        tags = [tag.format(**self.kwargs) for tag in self.cache_tags]
+        return [*tags, CATALOG_TAG]
+
+    def get(self, request, *args, **kwargs):
+        key = page_key(request)
+        cached = get_page(key)
+        if cached is not None:
+            return cached
+
+        versions = tag_versions(self.get_cache_tags())
+        response = super().get(request, *args, **kwargs)
+        return self.store_page(key, response, versions)
+
+    @staticmethod
+    def store_page(key, response, versions):
+        if response.status_code == 200:
+            # Store once rendered, so the render stays with the middleware
+            # timing it.
+            if hasattr(response, "add_post_render_callback"):
+                response.add_post_render_callback(
+                    lambda rendered: set_page(key, rendered, versions)
+                )
+            else:
+                set_page(key, response, versions)
+        return response
+
+
+class AsyncPageCacheMixin(PageCacheMixin):
+    """``PageCacheMixin`` for async views."""
+
+    async def get(self, request, *args, **kwargs):
+        key = page_key(request)
+        cached = await aget_page(key)
+        if cached is not None:
+            return cached
+
+        versions = await atag_versions(self.get_cache_tags())
+        response = await super().get(request, *args, **kwargs)
+        return self.store_page(key, response, versions)
@@ -0,0 +1,319 @@
+import base64
+import binascii
+import hashlib
+import json
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.core.paginator import InvalidPage, Paginator
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections
+from django.db.models import Q, QuerySet
+from django.http import Http404
+from django.utils.functional import cached_property
+
+FORWARD = "n"
+BACKWARD = "p"
+
+
+class InvalidCursor(InvalidPage):
+    pass
+
+
+def ordering_key(ordering):
+    """Short fingerprint of an ordering, carried by its cursors."""
+    return hashlib.blake2s(
+        ",".join(ordering).encode(),
+        digest_size=4,
+    ).hexdigest()
+
+
+def encode_cursor(direction, values, key=""):
+    payload = json.dumps(
+        {"d": direction, "k": key, "v": values},
+        cls=DjangoJSONEncoder,
+        separators=(",", ":"),
+    )
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    """``(direction, ordering key, values)`` of a cursor."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        direction, key, values = payload["d"], payload["k"], payload["v"]
+    except (binascii.Error, ValueError, TypeError, KeyError):
+        raise InvalidCursor("Invalid cursor")
+    if (
+        direction not in (FORWARD, BACKWARD)
+        or not isinstance(key, str)
+        or not isinstance(values, list)
+    ):
+        raise InvalidCursor("Invalid cursor")
+    return direction, key, values
+
+
+class KeysetPage:
+    """
+    A page of results fetched with a ``WHERE key > cursor`` seek instead of
+    ``OFFSET``, so it exposes neighbour cursors rather than page numbers.
+    """
+    is_keyset = True
+
+    def __init__(self, object_list, paginator, next_cursor, previous_cursor):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __repr__(self):
+        return f"<KeysetPage of {len(self.object_list)} objects>"
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class KeysetPaginator:
+    """
+    Cursor paginator keyed on the queryset ordering (``Meta.ordering`` by
+    default) with ``pk`` appended as a tiebreaker. Every page costs a single
+    indexed range query and no ``COUNT(*)`` is ever issued.
+    """
+
+    def __init__(self, queryset, per_page):
+        self.per_page = int(per_page)
+        self.ordering = self.get_ordering(queryset)
+        self.key = ordering_key(self.ordering)
+        self.queryset = queryset.order_by(*self.ordering)
+        self.fields = [
+            self.get_field(queryset.model, name.lstrip("-"))
+            for name in self.ordering
+        ]
+
+    @staticmethod
+    def get_ordering(queryset):
+        query = queryset.query
+        ordering = list(query.order_by or query.get_meta().ordering or ())
+        for field in ordering:
+            if not isinstance(field, str):
+                raise ValueError(
+                    "KeysetPaginator only supports ordering by field names."
+                )
+        if not ordering or ordering[-1].lstrip("-") not in ("pk", "id"):
+            ordering.append("pk")
+        return tuple(ordering)
+
+    @staticmethod
+    def get_field(model, name):
+        """
+        The model field a cursor value of ``name`` is parsed with, or
+        ``None`` for annotations.
+        """
+        field = None
+        try:
+            for part in name.split("__"):
+                if field is not None:
+                    model = field.related_model
+                opts = model._meta
+                field = opts.pk if part == "pk" else opts.get_field(part)
+        except FieldDoesNotExist:
+            return None
+        while field.is_relation:
+            field = field.target_field
+        return field
+
+    def parse_values(self, values):
+        """
+        Cursor values as the ordering fields' Python types. Anything else,
+        such as a cursor crafted by hand, is an ``InvalidCursor``.
+        """
+        if len(values) != len(self.ordering):
+            raise InvalidCursor("Cursor does not match the current ordering")
+        parsed = []
+        for field, value in zip(self.fields, values):
+            if field is not None:
+                try:
+                    value = field.to_python(value)
+                    field.run_validators(value)
+                except (ValueError, TypeError, ValidationError):
+                    raise InvalidCursor("Invalid cursor value")
+            if value is None or isinstance(value, (list, dict)):
+                raise InvalidCursor("Invalid cursor value")
+            parsed.append(value)
+        return parsed
+
+    def get_cursor_values(self, obj):
+        values = []
+        for field in self.ordering:
+            value = obj
+            for attr in field.lstrip("-").split("__"):
+                value = getattr(value, attr)
+            values.append(value)
+        return json.loads(json.dumps(values, cls=DjangoJSONEncoder))
+
+    def seek_filter(self, values, backward):
+        names = [field.lstrip("-") for field in self.ordering]
+        seek = Q()
+        for index, field in enumerate(self.ordering):
+            descending = field.startswith("-")
+            lookup = "lt" if descending != backward else "gt"
+            clause = Q(**{f"{names[index]}__{lookup}": values[index]})
+            for name, value in zip(names[:index], values[:index]):
+                clause &= Q(**{name: value})
+            seek |= clause
+        # Redundant bound on the leading column so the database can start an
+        # index range scan at the cursor instead of evaluating the OR chain.
+        descending = self.ordering[0].startswith("-")
+        leading = "lte" if descending != backward else "gte"
+        return Q(**{f"{names[0]}__{leading}": values[0]}) & seek
+
+    def page_queryset(self, cursor):
+        """The query for the page at ``cursor``, one row past its end."""
+        direction, values = FORWARD, None
+        if cursor:
+            direction, key, values = decode_cursor(cursor)
+            if key != self.key:
+                raise InvalidCursor(
+                    "Cursor does not match the current ordering"
+                )
+            values = self.parse_values(values)
+        backward = direction == BACKWARD
+
+        queryset = self.queryset
+        if values is not None:
+            queryset = queryset.filter(self.seek_filter(values, backward))
+        if backward:
+            queryset = queryset.reverse()
+        return queryset[:self.per_page + 1], values, backward
+
+    def build_page(self, rows, values, backward):
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if backward:
+            rows.reverse()
+
+        next_cursor = previous_cursor = None
+        if rows:
+            first = self.get_cursor_values(rows[0])
+            last = self.get_cursor_values(rows[-1])
+            if has_more or backward:
+                next_cursor = encode_cursor(FORWARD, last, self.key)
+            if has_more if backward else values is not None:
+                previous_cursor = encode_cursor(BACKWARD, first, self.key)
+        return KeysetPage(rows, self, next_cursor, previous_cursor)
+
+    def page(self, cursor=None):
+        queryset, values, backward = self.page_queryset(cursor)
+        return self.build_page(list(queryset), values, backward)
+
+    async def apage(self, cursor=None):
+        queryset, values, backward = self.page_queryset(cursor)
+        rows = [obj async for obj in queryset]
+        return self.build_page(rows, values, backward)
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Numbered paginator that does not ``COUNT(*)`` big PostgreSQL tables:
+    an unfiltered queryset of a table the planner estimates at
+    ``estimate_threshold`` rows or more is counted from
+    ``pg_class.reltuples``, kept current by autovacuum. Filtered
+    querysets, smaller tables and other backends are counted exactly.
+    """
+    estimate_threshold = 10000
+
+    @cached_property
+    def count(self):
+        estimate = self.estimated_count()
+        if estimate is not None and estimate >= self.estimate_threshold:
+            return estimate
+        return super().count
+
+    def estimated_count(self):
+        queryset = self.object_list
+        if not isinstance(queryset, QuerySet):
+            return None
+        query = queryset.query
+        if (
+            query.where
+            or query.distinct
+            or query.combinator
+            or query.is_sliced
+            or query.is_empty()
+        ):
+            return None
+        return self.table_estimate(queryset)
+
+    @staticmethod
+    def table_estimate(queryset):
+        """Planner row estimate of the table, or ``None`` when unknown."""
+        connection = connections[queryset.db]
+        if connection.vendor != "postgresql":
+            return None
+        table = connection.ops.quote_name(queryset.model._meta.db_table)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT reltuples FROM pg_class WHERE oid = to_regclass(%s)",
+                [table],
+            )
+            row = cursor.fetchone()
+        # -1 until the table is first vacuumed or analyzed.
+        if row is None or row[0] < 0:
+            return None
+        return int(row[0])
+
+
+class KeysetPaginationMixin:
+    """
+    ListView mixin switching pagination to ``KeysetPaginator``. The page is
+    selected with the ``cursor`` GET parameter instead of ``page``.
+    """
+    cursor_kwarg = "cursor"
+
+    def paginate_queryset(self, queryset, page_size):
+        paginator = KeysetPaginator(queryset, page_size)
+        try:
+            page = paginator.page(self.request.GET.get(self.cursor_kwarg))
+        except InvalidCursor as e:
+            raise Http404(f"Invalid cursor: {e}")
+        return paginator, page, page.object_list, page.has_other_pages()
+
+
+class AsyncKeysetPaginationMixin(KeysetPaginationMixin):
+    """
+    ``KeysetPaginationMixin`` for async list views: ``get`` fetches the page
+    with the async ORM before the context is built.
+    """
+
+    async def get(self, request, *args, **kwargs):
+        self.object_list = self.get_queryset()
+        paginator = KeysetPaginator(
+            self.object_list,
+            self.get_paginate_by(self.object_list),
+        )
+        try:
+            self.keyset_page = await paginator.apage(
+                request.GET.get(self.cursor_kwarg)
+            )
+        except InvalidCursor as e:
+            raise Http404(f"Invalid cursor: {e}")
+        return self.render_to_response(self.get_context_data())
+
+    def paginate_queryset(self, queryset, page_size):
+        page = self.keyset_page
+        return page.paginator, page, page.object_list, page.has_other_pages()
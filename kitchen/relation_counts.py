@@ -0,0 +1,141 @@
+"""
+Denormalized relation counts (``Cook.dish_count``, ``Dish.cook_count``...).
+
+Signal handlers shift the counts of the rows a write touches with one
+``F()`` update per side, so the lists can show and sort by them without
+joining the through tables. Set-based writes that bypass the signals are
+followed by ``repair``, which recounts with one correlated ``UPDATE`` per
+count.
+"""
+from functools import partial
+
+from django.db import transaction
+from django.db.models import (
+    Count,
+    F,
+    ManyToManyField,
+    OuterRef,
+    Subquery,
+    Value,
+)
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from kitchen import page_cache
+from kitchen.models import Cook, Dish, DishType, Ingredient
+
+# (model, counted model) -> (count field, rows to count, their column
+# pointing at ``model``)
+COUNTS = {
+    (Dish, Cook): ("cook_count", Dish.cooks.through, "dish_id"),
+    (Dish, Ingredient): (
+        "ingredient_count",
+        Dish.ingredients.through,
+        "dish_id",
+    ),
+    (Cook, Dish): ("dish_count", Dish.cooks.through, "cook_id"),
+    (Ingredient, Dish): (
+        "dish_count",
+        Dish.ingredients.through,
+        "ingredient_id",
+    ),
+    (DishType, Dish): ("dish_count", Dish, "type_id"),
+}
+
+
+def invalidate_lists(models):
+    tags = {page_cache.list_tag(model) for model in models}
+    transaction.on_commit(partial(page_cache.invalidate, tags))
+
+
+def shift(model, counted, pks, delta):
+    """Adds ``delta`` to the ``counted`` count of the ``pks`` rows."""
+    if not pks or not delta:
+        return
+    field = COUNTS[model, counted][0]
+    model.objects.filter(pk__in=pks).update(**{
+        field: F(field) + delta,
+        "updated_at": timezone.now(),
+    })
+    invalidate_lists([model])
+
+
+def count_expression(key):
+    _, rows, column = COUNTS[key]
+    counted = rows.objects.filter(
+        **{column: OuterRef("pk")}
+    ).order_by().values(column).annotate(total=Count("*")).values("total")
+    return Coalesce(Subquery(counted), Value(0))
+
+
+def repair(keys=None, rows=None):
+    """
+    Recounts ``keys`` of ``COUNTS`` (all by default) and returns how many
+    rows were off, per key. Only those rows are written. ``rows`` can map
+    models to the primary keys of the only rows of theirs to recount.
+    """
+    fixed = {}
+    for key in keys or COUNTS:
+        model = key[0]
+        field = COUNTS[key][0]
+        counted = model.objects.all()
+        if rows and model in rows:
+            counted = counted.filter(pk__in=rows[model])
+        stale = counted.alias(
+            actual=count_expression(key)
+        ).exclude(**{field: F("actual")})
+        fixed[key] = stale.update(**{
+            field: count_expression(key),
+            "updated_at": timezone.now(),
+        })
+    changed = [key[0] for key, rows in fixed.items() if rows]
+    if changed:
+        invalidate_lists(changed)
+    return fixed
+
+
+def affected_keys(model, fields=None):
+    """
+    The counts a set-based write to ``model`` can change, or a write to
+    only the ``fields`` columns of existing rows, or to the links of its
+    ``fields`` many-to-many relations, when those are given.
+    """
+    keys = [key for key in COUNTS if model in key]
+    if fields is None:
+        return keys
+    fields = [model._meta.get_field(name) for name in fields]
+    columns = {field.attname for field in fields if field.concrete}
+    throughs = {
+        field.remote_field.through for field in fields
+        if isinstance(field, ManyToManyField)
+    }
+    return [
+        key for key in keys
+        if COUNTS[key][1] in throughs
+        or COUNTS[key][1] is model and COUNTS[key][2] in columns
+    ]
+
+
+def counting_pks(key, instance):
+    """Primary keys of the ``key[0]`` rows counting ``instance``."""
+    model, counted = key
+    _, rows, column = COUNTS[key]
+    if rows is counted:
+        lookup = "pk"
+    else:
+        lookup = next(
+            field.name for field in rows._meta.fields
+            if field.related_model is counted
+        )
+    return list(
+        rows.objects.filter(
+            **{lookup: instance.pk}
+        ).values_list(column, flat=True)
+    )
+
+
+def discount(instance):
+    """Takes a row that is about to be deleted out of the counts."""
+    for key in COUNTS:
+        if key[1] is type(instance):
+            shift(key[0], key[1], counting_pks(key, instance), -1)
@@ -0,0 +1,64 @@
+"""
+Minimal-diff saving of many-to-many relations.
+
+``set_related`` reads the current links of one side with a single query
+and writes only the difference: one ``DELETE`` of the links to drop and
+one ``INSERT`` of the links to add. ``m2m_changed`` is sent with the same
+actions ``RelatedManager.set()`` uses, once per direction with the whole
+``pk_set``, so the handlers in ``kitchen.signals`` see the usual
+arguments. A relation whose links did not change costs the one read and
+sends nothing.
+"""
+from django.db import router, transaction
+from django.db.models.signals import m2m_changed
+
+
+def current_pks(instance, field):
+    through = field.remote_field.through
+    return set(
+        through._default_manager.filter(**{
+            field.m2m_column_name(): instance.pk,
+        }).values_list(field.m2m_reverse_name(), flat=True)
+    )
+
+
+def set_related(instance, name, objs, created=False):
+    """
+    Makes ``objs`` the ``name`` relation of the saved ``instance``.
+    ``created`` skips reading the links of a row that cannot have any.
+    Returns the ``(added, removed)`` target pks.
+    """
+    field = instance._meta.get_field(name)
+    through = field.remote_field.through
+    model = field.related_model
+    wanted = {obj.pk for obj in objs}
+    existing = set() if created else current_pks(instance, field)
+    added, removed = wanted - existing, existing - wanted
+    if not added and not removed:
+        return added, removed
+    using = router.db_for_write(through, instance=instance)
+    source, target = field.m2m_column_name(), field.m2m_reverse_name()
+    signal = {
+        "sender": through,
+        "instance": instance,
+        "reverse": False,
+        "model": model,
+        "using": using,
+    }
+    with transaction.atomic(using=using, savepoint=False):
+        if removed:
+            m2m_changed.send(action="pre_remove", pk_set=removed, **signal)
+            through._default_manager.using(using).filter(**{
+                source: instance.pk,
+                f"{target}__in": removed,
+            }).delete()
+            m2m_changed.send(action="post_remove", pk_set=removed, **signal)
+        if added:
+            m2m_changed.send(action="pre_add", pk_set=added, **signal)
+            through._default_manager.using(using).bulk_create([
+                through(**{source: instance.pk, target: pk})
+                for pk in sorted(added)
+            ])
+            m2m_changed.send(action="post_add", pk_set=added, **signal)
+    getattr(instance, "_prefetched_objects_cache", {}).pop(name, None)
+    return added, removed
@@ -0,0 +1,84 @@
+"""
+Primary/replica routing for the kitchen models.
+
+Reads go to ``KITCHEN_REPLICA_DATABASE`` and writes to the primary. A
+request is pinned to the primary once it writes, and for its whole
+duration if it is a POST or follows a recent write (see
+``PrimaryPinningMiddleware``), so nobody reads a replica that has not
+caught up with a change they just made.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+ROUTED_APPS = {"kitchen"}
+
+
+@dataclass
+class RoutingState:
+    pinned: bool = False
+    written: bool = False
+
+
+_state = ContextVar("kitchen_routing_state", default=None)
+
+
+def replica_alias():
+    return getattr(settings, "KITCHEN_REPLICA_DATABASE", None)
+
+
+def replica_lag():
+    """Seconds the replica may trail the primary."""
+    return getattr(settings, "KITCHEN_REPLICA_LAG", 5)
+
+
+def current_state():
+    state = _state.get()
+    if state is None:
+        # Outside a request, e.g. management commands.
+        state = RoutingState()
+        _state.set(state)
+    return state
+
+
+@contextmanager
+def routing_context(pinned=False):
+    token = _state.set(RoutingState(pinned=pinned))
+    try:
+        yield _state.get()
+    finally:
+        _state.reset(token)
+
+
+def pin_to_primary():
+    current_state().pinned = True
+
+
+class PrimaryReplicaRouter:
+    def db_for_read(self, model, **hints):
+        alias = replica_alias()
+        if alias is None or model._meta.app_label not in ROUTED_APPS:
+            return None
+        if current_state().pinned:
+            return DEFAULT_DB_ALIAS
+        return alias
+
+    def db_for_write(self, model, **hints):
+        if model._meta.app_label in ROUTED_APPS:
+            state = current_state()
+            state.written = state.pinned = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        aliases = {DEFAULT_DB_ALIAS, replica_alias()}
+        if obj1._state.db in aliases and obj2._state.db in aliases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, **hints):
+        if db == replica_alias() and db != DEFAULT_DB_ALIAS:
+            return False
+        return None
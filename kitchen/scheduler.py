@@ -0,0 +1,155 @@
+"""
+Routes queued order items to the cooks who can prepare their dishes.
+
+``assign_batch`` claims the oldest queued items with ``SELECT ... FOR
+UPDATE SKIP LOCKED``, so several scheduler workers can drain the queue
+side by side: each locks a different slice instead of waiting on the
+rows another holds. A batch costs the same handful of queries whatever
+its size: the claim, the qualified cooks of its dishes, their queue
+depths and one ``UPDATE`` of the assigned items.
+
+Each item goes to the qualified cook with the lowest load, the number of
+tickets on their queue divided by a capacity that grows with
+``years_of_experience``. Items whose dish has no cook are parked as
+``NO_COOK`` so they do not block the head of the queue; ``requeue`` puts
+them back once cooks are assigned to the dish, and ``release`` queues the
+tickets of a cook who is leaving.
+"""
+from django.db import transaction
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from kitchen.models import Cook, Dish, OrderItem
+
+BATCH_SIZE = 200
+
+# Years of experience worth one more ticket of capacity.
+EXPERIENCE_PER_SLOT = 5
+
+
+def capacity(years_of_experience):
+    return 1 + max(years_of_experience, 0) / EXPERIENCE_PER_SLOT
+
+
+def claim(batch_size=BATCH_SIZE):
+    """
+    Locks the oldest queued items no other scheduler holds. Must run in a
+    transaction; backends without row locks (SQLite) ignore the locking.
+    """
+    return list(
+        OrderItem.objects.select_for_update(skip_locked=True, of=("self", ))
+        .filter(status=OrderItem.Status.QUEUED)
+        .order_by("id")
+        .only("id", "dish_id")[:batch_size]
+    )
+
+
+def qualified_cooks(dish_pks):
+    """``{dish pk: [cook pk, ...]}`` of the cooks who prepare each dish."""
+    cooks = {}
+    links = Dish.cooks.through.objects.filter(
+        dish_id__in=dish_pks
+    ).values_list("dish_id", "cook_id")
+    for dish_pk, cook_pk in links:
+        cooks.setdefault(dish_pk, []).append(cook_pk)
+    return cooks
+
+
+def cook_loads(cook_pks):
+    """``{cook pk: [tickets on their queue, capacity]}``."""
+    rows = Cook.objects.filter(pk__in=cook_pks).values(
+        "pk",
+        "years_of_experience",
+    ).annotate(
+        depth=Count(
+            "tickets",
+            filter=Q(tickets__status=OrderItem.Status.ASSIGNED),
+        )
+    ).values_list("pk", "years_of_experience", "depth")
+    return {
+        pk: [depth, capacity(years)]
+        for pk, years, depth in rows
+    }
+
+
+def pick_cook(candidates, loads):
+    # Least loaded first; ties go to the more experienced cook.
+    return min(
+        (pk for pk in candidates if pk in loads),
+        key=lambda pk: ((loads[pk][0] + 1) / loads[pk][1], -loads[pk][1], pk),
+        default=None,
+    )
+
+
+def assign(items):
+    """Assigns the claimed ``items`` and returns the number assigned."""
+    cooks = qualified_cooks({item.dish_id for item in items})
+    loads = cook_loads({pk for pks in cooks.values() for pk in pks})
+    now = timezone.now()
+    assigned = 0
+    for item in items:
+        item.cook_id = pick_cook(cooks.get(item.dish_id, ()), loads)
+        if item.cook_id is None:
+            item.status = OrderItem.Status.NO_COOK
+            continue
+        loads[item.cook_id][0] += 1
+        item.status = OrderItem.Status.ASSIGNED
+        item.assigned_at = now
+        assigned += 1
+    OrderItem.objects.bulk_update(
+        items,
+        ["cook", "status", "assigned_at"],
+        batch_size=BATCH_SIZE,
+    )
+    return assigned
+
+
+def assign_batch(batch_size=BATCH_SIZE):
+    """
+    Claims and assigns up to ``batch_size`` queued items in one
+    transaction. Returns ``(claimed, assigned)``; nothing claimed means
+    the queue is empty or every queued item is held by another worker.
+    """
+    with transaction.atomic():
+        items = claim(batch_size)
+        if not items:
+            return 0, 0
+        return len(items), assign(items)
+
+
+def drain(batch_size=BATCH_SIZE):
+    """Assigns batches until nothing is left to claim."""
+    claimed = assigned = 0
+    while True:
+        batch_claimed, batch_assigned = assign_batch(batch_size)
+        if not batch_claimed:
+            return claimed, assigned
+        claimed += batch_claimed
+        assigned += batch_assigned
+
+
+def complete(item_pks):
+    """Marks assigned items done, taking them off their cooks' queues."""
+    return OrderItem.objects.filter(
+        pk__in=item_pks,
+        status=OrderItem.Status.ASSIGNED,
+    ).update(status=OrderItem.Status.DONE, done_at=timezone.now())
+
+
+def requeue(dish_pks=None):
+    """Queues parked ``NO_COOK`` items again, e.g. after adding cooks."""
+    items = OrderItem.objects.filter(status=OrderItem.Status.NO_COOK)
+    if dish_pks is not None:
+        items = items.filter(dish_id__in=dish_pks)
+    return items.update(status=OrderItem.Status.QUEUED)
+
+
+def release(cook_pks):
+    """
+    Queues the assigned items of ``cook_pks`` again, e.g. before the cooks
+    are deleted, so the next batch hands them to someone else.
+    """
+    return OrderItem.objects.filter(
+        cook_id__in=cook_pks,
+        status=OrderItem.Status.ASSIGNED,
+    ).update(status=OrderItem.Status.QUEUED, cook=None, assigned_at=None)
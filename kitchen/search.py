@@ -0,0 +1,160 @@
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.db.models import Exists, FloatField, OuterRef, Q
+from django.db.models.expressions import RawSQL
+from django.utils.module_loading import import_string
+
+
+@dataclass(frozen=True)
+class SearchSpec:
+    """
+    Searchable columns of a model: ``text`` are short strings matched as
+    substrings, ``documents`` are long texts matched as full text and
+    ``related`` are ``<m2m>__<field>`` paths matched through a semi-join.
+    """
+    text: tuple
+    documents: tuple = ()
+    related: tuple = ()
+
+
+SEARCH_SPECS = {
+    "kitchen.cook": SearchSpec(text=("username", )),
+    "kitchen.dishtype": SearchSpec(text=("name", )),
+    "kitchen.ingredient": SearchSpec(text=("name", )),
+    "kitchen.dish": SearchSpec(
+        text=("name", ),
+        documents=("description", ),
+        related=("ingredients__name", ),
+    ),
+}
+
+
+def get_search_spec(model):
+    return SEARCH_SPECS[model._meta.label_lower]
+
+
+def related_exists(model, path, lookup, value):
+    """
+    ``EXISTS`` over the m2m through table, so matching several related rows
+    never multiplies the parent rows the way a plain join filter does.
+    """
+    relation, field = path.split("__", 1)
+    m2m = model._meta.get_field(relation)
+    through = m2m.remote_field.through
+    return Exists(
+        through.objects.filter(**{
+            m2m.m2m_field_name(): OuterRef("pk"),
+            f"{m2m.m2m_reverse_field_name()}__{field}__{lookup}": value,
+        })
+    )
+
+
+class SearchBackend:
+    """
+    Portable ``icontains`` search. Indexed backends fall back to it for
+    queries shorter than a trigram, which no index can serve.
+    """
+    min_query_length = 3
+
+    def search(self, queryset, query):
+        query = query.strip()
+        if not query:
+            return queryset
+        spec = get_search_spec(queryset.model)
+        if len(query) < self.min_query_length:
+            return queryset.filter(
+                self.substring_filter(queryset.model, spec, query)
+            )
+        return self.indexed_search(queryset, spec, query)
+
+    def substring_filter(self, model, spec, query):
+        condition = Q()
+        for field in spec.text + spec.documents:
+            condition |= Q(**{f"{field}__icontains": query})
+        for path in spec.related:
+            condition |= related_exists(model, path, "icontains", query)
+        return condition
+
+    def indexed_search(self, queryset, spec, query):
+        return queryset.filter(
+            self.substring_filter(queryset.model, spec, query)
+        )
+
+    @staticmethod
+    def order_by_rank(queryset):
+        return queryset.order_by(
+            "-search_rank",
+            *queryset.model._meta.ordering
+        )
+
+
+class PostgresSearchBackend(SearchBackend):
+    """
+    Substring matches are served by GIN ``gin_trgm_ops`` indexes on
+    ``UPPER(column)`` (the expression ``icontains`` compiles to), documents
+    by a GIN index on their ``tsvector``. Results are ranked by trigram
+    similarity plus full-text rank.
+    """
+    config = "english"
+
+    def indexed_search(self, queryset, spec, query):
+        from django.contrib.postgres.search import (
+            SearchQuery,
+            SearchRank,
+            SearchVector,
+            TrigramSimilarity,
+        )
+
+        model = queryset.model
+        search_query = SearchQuery(query, config=self.config)
+        condition = Q()
+        rank = None
+        for field in spec.text:
+            condition |= Q(**{f"{field}__icontains": query})
+            similarity = TrigramSimilarity(field, query)
+            rank = similarity if rank is None else rank + similarity
+        for field in spec.documents:
+            alias = f"_{field}_vector"
+            vector = SearchVector(field, config=self.config)
+            queryset = queryset.alias(**{alias: vector})
+            condition |= Q(**{alias: search_query})
+            rank += SearchRank(vector, search_query)
+        for path in spec.related:
+            condition |= related_exists(model, path, "icontains", query)
+        queryset = queryset.filter(condition).annotate(search_rank=rank)
+        return self.order_by_rank(queryset)
+
+
+class SQLiteFTSBackend(SearchBackend):
+    """
+    Matches against FTS5 ``trigram`` tables (``<table>_fts``) kept in sync by
+    triggers; a quoted phrase of three or more characters is a
+    case-insensitive substring match. Ranked by ``bm25``.
+    """
+
+    def indexed_search(self, queryset, spec, query):
+        table = queryset.model._meta.db_table
+        fts_table = f"{table}_fts"
+        phrase = '"{}"'.format(query.replace('"', '""'))
+        matches = RawSQL(
+            f"SELECT rowid FROM {fts_table} WHERE {fts_table} MATCH %s",
+            (phrase, ),
+        )
+        rank = RawSQL(
+            f"SELECT -bm25({fts_table}) FROM {fts_table} "
+            f"WHERE {fts_table} MATCH %s AND rowid = {table}.id",
+            (phrase, ),
+            output_field=FloatField(),
+        )
+        queryset = queryset.filter(pk__in=matches).annotate(search_rank=rank)
+        return self.order_by_rank(queryset)
+
+
+def get_search_backend():
+    backend = getattr(
+        settings,
+        "KITCHEN_SEARCH_BACKEND",
+        "kitchen.search.SearchBackend"
+    )
+    return import_string(backend)()
@@ -0,0 +1,111 @@
+"""
+DDL backing the indexed search backends in ``kitchen.search``.
+
+Migrations keep frozen copies of the statements they run (see
+``0007_search_indexes``); the builders here describe the current schema
+for the ``post_migrate`` hook, which reinstalls the SQLite triggers that
+table rebuilds drop.
+"""
+from django.db import connections
+
+SIMPLE_FTS_COLUMNS = (
+    ("cook", "username"),
+    ("dishtype", "name"),
+    ("ingredient", "name"),
+)
+
+
+def _dish_tables(get_model):
+    dish = get_model("dish")
+    through = dish._meta.get_field("ingredients").remote_field.through
+    return (
+        dish._meta.db_table,
+        through._meta.db_table,
+        get_model("ingredient")._meta.db_table,
+    )
+
+
+def _ingredient_names(links, ingredients, dish_id):
+    return (
+        f"(SELECT group_concat(i.name, ' ') FROM {links} l "
+        f"JOIN {ingredients} i ON i.id = l.ingredient_id "
+        f"WHERE l.dish_id = {dish_id})"
+    )
+
+
+def sqlite_trigger_statements(get_model):
+    """
+    Triggers live on the base tables, so SQLite drops them whenever a
+    migration rebuilds one of those tables; they are therefore created with
+    ``IF NOT EXISTS`` and reinstalled after every ``migrate``. Triggers that
+    reference a rebuilt table from another table make the rebuild fail, so
+    such migrations drop them first with their own copies of the
+    ``DROP TRIGGER`` statements (see ``0008_updated_at``).
+    """
+    table, links, ingredients = _dish_tables(get_model)
+    fts = f"{table}_fts"
+    statements = [
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} "
+        f"BEGIN INSERT INTO {fts}(rowid, name, description, ingredients) "
+        f"VALUES (new.id, new.name, new.description, "
+        f"{_ingredient_names(links, ingredients, 'new.id')}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_au "
+        f"AFTER UPDATE OF name, description ON {table} "
+        f"BEGIN UPDATE {fts} SET name = new.name, "
+        f"description = new.description WHERE rowid = new.id; END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} "
+        f"BEGIN DELETE FROM {fts} WHERE rowid = old.id; END",
+        f"CREATE TRIGGER IF NOT EXISTS {links}_fts_ai "
+        f"AFTER INSERT ON {links} "
+        f"BEGIN UPDATE {fts} SET ingredients = "
+        f"{_ingredient_names(links, ingredients, 'new.dish_id')} "
+        f"WHERE rowid = new.dish_id; END",
+        f"CREATE TRIGGER IF NOT EXISTS {links}_fts_ad "
+        f"AFTER DELETE ON {links} "
+        f"BEGIN UPDATE {fts} SET ingredients = "
+        f"{_ingredient_names(links, ingredients, 'old.dish_id')} "
+        f"WHERE rowid = old.dish_id; END",
+        f"CREATE TRIGGER IF NOT EXISTS {ingredients}_dish_fts_au "
+        f"AFTER UPDATE OF name ON {ingredients} "
+        f"BEGIN UPDATE {fts} SET ingredients = "
+        f"{_ingredient_names(links, ingredients, f'{fts}.rowid')} "
+        f"WHERE rowid IN (SELECT dish_id FROM {links} "
+        f"WHERE ingredient_id = new.id); END",
+    ]
+    for model_name, column in SIMPLE_FTS_COLUMNS:
+        table = get_model(model_name)._meta.db_table
+        fts = f"{table}_fts"
+        statements += [
+            f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} "
+            f"BEGIN INSERT INTO {fts}(rowid, {column}) "
+            f"VALUES (new.id, new.{column}); END",
+            f"CREATE TRIGGER IF NOT EXISTS {fts}_au "
+            f"AFTER UPDATE OF {column} ON {table} "
+            f"BEGIN UPDATE {fts} SET {column} = new.{column} "
+            f"WHERE rowid = new.id; END",
+            f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} "
+            f"BEGIN DELETE FROM {fts} WHERE rowid = old.id; END",
+        ]
+    return statements
+
+
+def install_sqlite_triggers(sender, using="default", apps=None, **kwargs):
+    """``post_migrate`` receiver restoring triggers lost to table rebuilds."""
+    connection = connections[using]
+    if connection.vendor != "sqlite" or apps is None:
+        return
+    try:
+        dish = apps.get_model("kitchen", "dish")
+    except LookupError:
+        return
+    if f"{dish._meta.db_table}_fts" not in (
+        connection.introspection.table_names()
+    ):
+        return
+
+    def get_model(model_name):
+        return apps.get_model("kitchen", model_name)
+
+    with connection.cursor() as cursor:
+        for statement in sqlite_trigger_statements(get_model):
+            cursor.execute(statement)
@@ -0,0 +1,539 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_delete,
+)
+from django.dispatch import Signal
+
+from kitchen import (
+    counters,
+    events,
+    ingredient_index,
+    page_cache,
+    relation_counts,
+    scheduler,
+    similarity,
+    versions,
+)
+from kitchen.models import Cook, Dish, DishType, Ingredient, SimilarDish
+
+# Sent after set-based writes that bypass the per-object model signals
+# (bulk_create, bulk_update, queryset update/delete, raw through-table
+# inserts). ``pks`` lists the affected primary keys of ``sender``, or is
+# ``None`` when any row may have changed. ``fields``, when given, names the
+# only columns the write changed, on existing rows, so handlers that do not
+# depend on them can skip it. A many-to-many relation named there had its
+# links changed; ``related_pks`` then lists the rows on its other side
+# whose links did.
+catalog_bulk_changed = Signal()
+
+
+def changed_relation(sender, fields):
+    """The other model of a relation whose links a bulk write changed."""
+    for name in fields or ():
+        field = sender._meta.get_field(name)
+        if field.many_to_many:
+            return field.related_model
+    return None
+
+
+def counter_created(sender, instance, created, **kwargs):
+    if created:
+        name = counter_names[sender]
+        transaction.on_commit(partial(counters.adjust, name, 1))
+
+
+def counter_deleted(sender, instance, **kwargs):
+    name = counter_names[sender]
+    transaction.on_commit(partial(counters.adjust, name, -1))
+
+
+def counters_bulk_changed(sender, fields=None, **kwargs):
+    if sender in counter_names and fields is None:
+        transaction.on_commit(counters.rebuild)
+
+
+counter_names = {
+    model: name for name, model in counters.COUNTED_MODELS.items()
+}
+
+for model in counter_names:
+    post_save.connect(
+        counter_created,
+        sender=model,
+        dispatch_uid=f"kitchen-counter-created-{model._meta.model_name}",
+    )
+    post_delete.connect(
+        counter_deleted,
+        sender=model,
+        dispatch_uid=f"kitchen-counter-deleted-{model._meta.model_name}",
+    )
+
+catalog_bulk_changed.connect(
+    counters_bulk_changed,
+    dispatch_uid="kitchen-counter-bulk-changed",
+)
+
+
+def is_login_update(update_fields):
+    # Logging in only touches last_login, which nothing serves.
+    return update_fields is not None and set(update_fields) <= {"last_login"}
+
+
+def version_saved(sender, instance, update_fields=None, **kwargs):
+    if is_login_update(update_fields):
+        return
+    transaction.on_commit(partial(versions.bump, sender))
+
+
+def version_deleted(sender, instance, **kwargs):
+    transaction.on_commit(partial(versions.bump, sender))
+
+
+def version_m2m_changed(sender, action, **kwargs):
+    if action.startswith("post_"):
+        transaction.on_commit(partial(versions.bump, Dish))
+
+
+def through_field(through, model):
+    return next(
+        field for field in through._meta.fields
+        if field.related_model is model
+    )
+
+
+def linked_pks(through, instance, model, pks=None):
+    source = through_field(through, type(instance))
+    target = through_field(through, model)
+    linked = through.objects.filter(**{source.name: instance.pk})
+    if pks is not None:
+        linked = linked.filter(**{f"{target.attname}__in": pks})
+    return linked.values_list(target.attname, flat=True)
+
+
+def count_m2m(sender, instance, action, model, pk_set, **kwargs):
+    """
+    Shifts the relation counts (and ``updated_at``) on both sides of a
+    many-to-many change, which saves neither row. Removals are counted
+    before they run, against the links that actually exist.
+    """
+    if action == "post_add":
+        delta = 1
+    elif action == "pre_remove":
+        delta = -1
+        pk_set = list(linked_pks(sender, instance, model, pk_set))
+    elif action == "pre_clear":
+        delta = -1
+        pk_set = list(linked_pks(sender, instance, model))
+    else:
+        return
+    relation_counts.shift(
+        type(instance),
+        model,
+        [instance.pk],
+        delta * len(pk_set),
+    )
+    relation_counts.shift(model, type(instance), pk_set, delta)
+
+
+def count_dish_type(sender, instance, created, update_fields=None, **kwargs):
+    if update_fields is not None and not {"type", "type_id"} & update_fields:
+        return
+    key = (DishType, Dish)
+    if created:
+        relation_counts.shift(*key, [instance.type_id], 1)
+    elif not hasattr(instance, "_loaded_type_id"):
+        # Saved without being loaded first, so the old type is unknown.
+        relation_counts.repair([key])
+    elif instance._loaded_type_id != instance.type_id:
+        relation_counts.shift(*key, [instance._loaded_type_id], -1)
+        relation_counts.shift(*key, [instance.type_id], 1)
+    instance._loaded_type_id = instance.type_id
+
+
+def count_deleted(sender, instance, **kwargs):
+    # Runs before the delete, while the links to the row still exist.
+    relation_counts.discount(instance)
+
+
+def counts_bulk_changed(sender, pks=None, fields=None, related_pks=None,
+                        **kwargs):
+    # Recounted in the same transaction as the write, unlike the caches.
+    keys = relation_counts.affected_keys(sender, fields)
+    if not keys:
+        return
+    related = changed_relation(sender, fields)
+    rows = None
+    if related is not None and pks is not None and related_pks is not None:
+        rows = {sender: pks, related: related_pks}
+    relation_counts.repair(keys, rows)
+
+
+def versions_bulk_changed(sender, **kwargs):
+    if sender in versions.VERSIONED_MODELS:
+        transaction.on_commit(partial(versions.bump, sender))
+
+
+def page_saved(sender, instance, update_fields=None, **kwargs):
+    if is_login_update(update_fields):
+        return
+    tags = page_cache.dependent_tags(sender, [instance.pk])
+    transaction.on_commit(partial(page_cache.invalidate, tags))
+
+
+def page_deleted(sender, instance, **kwargs):
+    # Runs before the delete, while the rows rendering it can be found.
+    tags = page_cache.dependent_tags(sender, [instance.pk])
+    transaction.on_commit(partial(page_cache.invalidate, tags))
+
+
+def page_m2m_changed(sender, instance, action, model, pk_set, **kwargs):
+    if action not in ("post_add", "post_remove", "pre_clear"):
+        return
+    if action == "pre_clear":
+        pk_set = linked_pks(sender, instance, model)
+    tags = {page_cache.object_tag(type(instance), instance.pk)}
+    tags.update(page_cache.object_tag(model, pk) for pk in pk_set)
+    transaction.on_commit(partial(page_cache.invalidate, tags))
+
+
+def pages_bulk_changed(sender, pks=None, fields=None, related_pks=None,
+                       **kwargs):
+    if sender not in page_cache.DEPENDENCIES:
+        return
+    if pks is None:
+        tags = {page_cache.CATALOG_TAG}
+    else:
+        tags = page_cache.dependent_tags(sender, pks)
+        # Rows unlinked by the write no longer lead to ``pks``.
+        related = changed_relation(sender, fields)
+        tags.update(
+            page_cache.object_tag(related, pk) for pk in related_pks or ()
+        )
+    transaction.on_commit(partial(page_cache.invalidate, tags))
+
+
+for model in versions.VERSIONED_MODELS:
+    post_save.connect(
+        version_saved,
+        sender=model,
+        dispatch_uid=f"kitchen-version-saved-{model._meta.model_name}",
+    )
+    post_delete.connect(
+        version_deleted,
+        sender=model,
+        dispatch_uid=f"kitchen-version-deleted-{model._meta.model_name}",
+    )
+
+for relation in (Dish.cooks, Dish.ingredients):
+    m2m_changed.connect(
+        version_m2m_changed,
+        sender=relation.through,
+        dispatch_uid=f"kitchen-version-m2m-{relation.field.name}",
+    )
+    m2m_changed.connect(
+        count_m2m,
+        sender=relation.through,
+        dispatch_uid=f"kitchen-count-m2m-{relation.field.name}",
+    )
+    m2m_changed.connect(
+        page_m2m_changed,
+        sender=relation.through,
+        dispatch_uid=f"kitchen-page-m2m-{relation.field.name}",
+    )
+
+for model in page_cache.DEPENDENCIES:
+    post_save.connect(
+        page_saved,
+        sender=model,
+        dispatch_uid=f"kitchen-page-saved-{model._meta.model_name}",
+    )
+    pre_delete.connect(
+        page_deleted,
+        sender=model,
+        dispatch_uid=f"kitchen-page-deleted-{model._meta.model_name}",
+    )
+
+catalog_bulk_changed.connect(
+    versions_bulk_changed,
+    dispatch_uid="kitchen-version-bulk-changed",
+)
+catalog_bulk_changed.connect(
+    pages_bulk_changed,
+    dispatch_uid="kitchen-page-bulk-changed",
+)
+
+post_save.connect(
+    count_dish_type,
+    sender=Dish,
+    dispatch_uid="kitchen-count-dish-type",
+)
+for model in {key[1] for key in relation_counts.COUNTS}:
+    pre_delete.connect(
+        count_deleted,
+        sender=model,
+        dispatch_uid=f"kitchen-count-deleted-{model._meta.model_name}",
+    )
+catalog_bulk_changed.connect(
+    counts_bulk_changed,
+    dispatch_uid="kitchen-count-bulk-changed",
+)
+
+
+def index_m2m(sender, instance, action, pk_set, **kwargs):
+    if action == "post_clear":
+        if isinstance(instance, Dish):
+            change = ("unlink_dishes", [instance.pk])
+        else:
+            change = ("remove_ingredients", [instance.pk])
+    elif action in ("post_add", "post_remove"):
+        pks = list(pk_set)
+        if isinstance(instance, Dish):
+            sides = (pks, [instance.pk])
+        else:
+            sides = ([instance.pk], pks)
+        verb = "link" if action == "post_add" else "unlink"
+        change = (verb, *sides)
+    else:
+        return
+    transaction.on_commit(partial(ingredient_index.index.apply, *change))
+
+
+def index_dish_saved(sender, instance, created, **kwargs):
+    if created:
+        transaction.on_commit(partial(
+            ingredient_index.index.apply, "add_dishes", [instance.pk]
+        ))
+
+
+def index_deleted(sender, instance, **kwargs):
+    change = "remove_dishes" if sender is Dish else "remove_ingredients"
+    transaction.on_commit(partial(
+        ingredient_index.index.apply, change, [instance.pk]
+    ))
+
+
+def index_bulk_changed(sender, fields=None, **kwargs):
+    # The index holds no columns, only which dishes exist and their links.
+    if sender not in (Dish, Ingredient):
+        return
+    if fields is None or changed_relation(sender, fields) in (
+        Dish,
+        Ingredient,
+    ):
+        transaction.on_commit(ingredient_index.invalidate)
+
+
+m2m_changed.connect(
+    index_m2m,
+    sender=Dish.ingredients.through,
+    dispatch_uid="kitchen-index-m2m",
+)
+post_save.connect(
+    index_dish_saved,
+    sender=Dish,
+    dispatch_uid="kitchen-index-dish-saved",
+)
+for model in (Dish, Ingredient):
+    post_delete.connect(
+        index_deleted,
+        sender=model,
+        dispatch_uid=f"kitchen-index-deleted-{model._meta.model_name}",
+    )
+catalog_bulk_changed.connect(
+    index_bulk_changed,
+    dispatch_uid="kitchen-index-bulk-changed",
+)
+
+
+def similarity_m2m(sender, instance, action, pk_set, **kwargs):
+    if action not in ("post_add", "post_remove", "pre_clear"):
+        return
+    if isinstance(instance, Dish):
+        dish_pks = [instance.pk]
+    elif action == "pre_clear":
+        dish_pks = list(linked_pks(sender, instance, Dish))
+    else:
+        dish_pks = list(pk_set)
+    transaction.on_commit(partial(similarity.mark_changed, dish_pks))
+
+
+def similarity_dish_saved(sender, instance, **kwargs):
+    transaction.on_commit(partial(similarity.mark_changed, [instance.pk]))
+
+
+def similarity_dish_deleted(sender, instance, **kwargs):
+    # Runs before the delete cascades to the lists naming the dish, while
+    # the dishes to refill can be found.
+    dish_pks = [instance.pk, *SimilarDish.objects.filter(
+        similar=instance
+    ).values_list("dish_id", flat=True)]
+    transaction.on_commit(partial(similarity.mark_changed, dish_pks))
+
+
+def similarity_ingredient_deleted(sender, instance, **kwargs):
+    # Runs before the delete, while the dishes using it can be found.
+    dish_pks = list(linked_pks(Dish.ingredients.through, instance, Dish))
+    if dish_pks:
+        transaction.on_commit(partial(similarity.mark_changed, dish_pks))
+
+
+def similarity_bulk_changed(sender, pks=None, fields=None, **kwargs):
+    # Scores use the ingredients, type and price, never the cooks.
+    if changed_relation(sender, fields) is Cook:
+        return
+    if sender is Dish and pks is not None:
+        transaction.on_commit(partial(similarity.mark_changed, list(pks)))
+    elif sender in (Dish, Ingredient) and fields is None:
+        transaction.on_commit(similarity.invalidate)
+
+
+m2m_changed.connect(
+    similarity_m2m,
+    sender=Dish.ingredients.through,
+    dispatch_uid="kitchen-similarity-m2m",
+)
+post_save.connect(
+    similarity_dish_saved,
+    sender=Dish,
+    dispatch_uid="kitchen-similarity-dish-saved",
+)
+pre_delete.connect(
+    similarity_dish_deleted,
+    sender=Dish,
+    dispatch_uid="kitchen-similarity-dish-deleted",
+)
+pre_delete.connect(
+    similarity_ingredient_deleted,
+    sender=Ingredient,
+    dispatch_uid="kitchen-similarity-ingredient-deleted",
+)
+catalog_bulk_changed.connect(
+    similarity_bulk_changed,
+    dispatch_uid="kitchen-similarity-bulk-changed",
+)
+
+
+def requeue_m2m(sender, instance, action, pk_set, **kwargs):
+    # Items parked for want of a cook can go to the cooks just added.
+    if action != "post_add":
+        return
+    dish_pks = [instance.pk] if isinstance(instance, Dish) else list(pk_set)
+    transaction.on_commit(partial(scheduler.requeue, dish_pks))
+
+
+def requeue_bulk_changed(sender, pks=None, fields=None, **kwargs):
+    if sender not in (Cook, Dish):
+        return
+    if fields is None:
+        transaction.on_commit(scheduler.requeue)
+    elif sender is Dish and changed_relation(sender, fields) is Cook:
+        transaction.on_commit(partial(scheduler.requeue, pks))
+
+
+def release_cook_deleted(sender, instance, **kwargs):
+    # Runs in the delete's transaction, before SET_NULL orphans the
+    # tickets still assigned to the cook.
+    scheduler.release([instance.pk])
+
+
+m2m_changed.connect(
+    requeue_m2m,
+    sender=Dish.cooks.through,
+    dispatch_uid="kitchen-requeue-m2m",
+)
+catalog_bulk_changed.connect(
+    requeue_bulk_changed,
+    dispatch_uid="kitchen-requeue-bulk-changed",
+)
+pre_delete.connect(
+    release_cook_deleted,
+    sender=Cook,
+    dispatch_uid="kitchen-release-cook-deleted",
+)
+
+
+def event_saved(sender, instance, update_fields=None, **kwargs):
+    if is_login_update(update_fields):
+        return
+    event = partial(
+        events.publish,
+        events.MODEL_TOPICS[sender],
+        events.saved_data(instance),
+    )
+    transaction.on_commit(event)
+
+
+def event_deleted(sender, instance, **kwargs):
+    event = partial(
+        events.publish,
+        events.MODEL_TOPICS[sender],
+        {"action": "deleted", "pk": instance.pk},
+    )
+    transaction.on_commit(event)
+
+
+def event_m2m(sender, instance, action, model, pk_set, **kwargs):
+    if action not in ("post_add", "post_remove", "pre_clear"):
+        return
+    if action == "pre_clear":
+        pk_set = linked_pks(sender, instance, model)
+    changed = {type(instance): [instance.pk], model: list(pk_set)}
+    for changed_model, pks in changed.items():
+        topic = events.MODEL_TOPICS.get(changed_model)
+        if topic and pks:
+            event = partial(
+                events.publish,
+                topic,
+                {"action": "changed", "pks": pks},
+            )
+            transaction.on_commit(event)
+
+
+def events_bulk_changed(sender, pks=None, fields=None, related_pks=None,
+                        **kwargs):
+    topic = events.MODEL_TOPICS.get(sender)
+    if topic is None:
+        return
+    if pks is None:
+        data = {"action": "reset"}
+    else:
+        data = {"action": "changed", "pks": list(pks)}
+    transaction.on_commit(partial(events.publish, topic, data))
+    related_topic = events.MODEL_TOPICS.get(changed_relation(sender, fields))
+    if related_topic and related_pks:
+        event = partial(
+            events.publish,
+            related_topic,
+            {"action": "changed", "pks": list(related_pks)},
+        )
+        transaction.on_commit(event)
+
+
+for model in events.MODEL_TOPICS:
+    post_save.connect(
+        event_saved,
+        sender=model,
+        dispatch_uid=f"kitchen-event-saved-{model._meta.model_name}",
+    )
+    post_delete.connect(
+        event_deleted,
+        sender=model,
+        dispatch_uid=f"kitchen-event-deleted-{model._meta.model_name}",
+    )
+
+for relation in (Dish.cooks, Dish.ingredients):
+    m2m_changed.connect(
+        event_m2m,
+        sender=relation.through,
+        dispatch_uid=f"kitchen-event-m2m-{relation.field.name}",
+    )
+
+catalog_bulk_changed.connect(
+    events_bulk_changed,
+    dispatch_uid="kitchen-event-bulk-changed",
+)
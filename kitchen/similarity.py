@@ -0,0 +1,432 @@
+"""
+Dish similarity for the "similar dishes" panel of the dish page.
+
+Dishes are the rows of a bit matrix with one column per ingredient,
+packed eight columns to a byte. The ingredients two dishes share are the
+popcount of their rows ANDed together, so a batch of dishes is scored
+against the whole menu in a few vectorized NumPy passes:
+
+    score = 0.6 * ingredient Jaccard + 0.25 * same type + 0.15 * price band
+
+The best ``SIMILAR_DISHES`` of every dish are stored as ``SimilarDish``
+rows, so the dish page reads its panel with one query and never touches
+the matrix. A committed write only advances a shared generation and
+records the changed dishes under it for ``CHANGE_TIMEOUT`` seconds.
+``refresh``, run every few seconds by ``build_dish_similarity --poll``,
+rescores the dishes changed since its last pass in one batch and
+rewrites the lists they can enter or leave. It rebuilds everything when
+a change has expired, when it is more than ``MAX_CHANGES`` behind, or
+after a set-based write that recorded none.
+
+The refresher keeps the matrix in memory and saves it to
+``KITCHEN_SIMILARITY_PATH`` (``.npz``) after each pass, so a restarted
+refresher loads it instead of recomputing it.
+"""
+import os
+import threading
+import zipfile
+from functools import partial
+
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from kitchen import page_cache, versions
+from kitchen.generations import Generation
+from kitchen.models import Dish, SimilarDish
+
+INGREDIENT_WEIGHT = 0.6
+TYPE_WEIGHT = 0.25
+PRICE_WEIGHT = 0.15
+
+SIMILAR_DISHES = 5
+
+# Queries scored per pass, and bytes of AND-ed rows held at once.
+BATCH_SIZE = 64
+CHUNK_BYTES = 1 << 24
+
+POPCOUNT = np.array([bin(byte).count("1") for byte in range(256)], np.uint8)
+
+counter = Generation("kitchen:similarity:generation")
+
+CHANGE_KEY = "kitchen:similarity:change:{}"
+CHANGE_TIMEOUT = 60 * 60
+MAX_CHANGES = 1000
+
+# Dishes whose stored lists are rewritten per statement.
+STORE_BATCH_SIZE = 500
+
+
+def storage_path():
+    return getattr(settings, "KITCHEN_SIMILARITY_PATH", None)
+
+
+def price_bands(prices):
+    """Powers of two the prices fall into; -1 for free dishes."""
+    prices = np.asarray(prices, dtype=np.float64)
+    positive = prices > 0
+    bands = np.floor(np.log2(np.where(positive, prices, 1)))
+    return np.where(positive, bands, -1).astype(np.int16)
+
+
+def empty_arrays():
+    return {
+        "dish_ids": np.zeros(0, np.int64),
+        "type_ids": np.zeros(0, np.int64),
+        "price_bands": np.zeros(0, np.int16),
+        "ingredient_ids": np.zeros(0, np.int64),
+        "bits": np.zeros((0, 0), np.uint8),
+    }
+
+
+class SimilarityMatrix:
+    fields = ("dish_ids", "type_ids", "price_bands", "ingredient_ids", "bits")
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.generation = None
+        self.set_arrays(**empty_arrays())
+
+    def set_arrays(self, **arrays):
+        for name in self.fields:
+            setattr(self, name, arrays[name])
+        self.columns = {
+            pk: column
+            for column, pk in enumerate(self.ingredient_ids.tolist())
+        }
+        self.sizes = POPCOUNT[self.bits].sum(axis=1, dtype=np.int32)
+
+    def encode_rows(self, dish_pks, links):
+        """Packed ingredient rows of ``dish_pks`` from ``(dish, ingr.)``."""
+        new = sorted({pk for _, pk in links} - self.columns.keys())
+        if new:
+            self.ingredient_ids = np.concatenate([self.ingredient_ids, new])
+            self.columns.update({
+                pk: column
+                for column, pk in enumerate(new, len(self.columns))
+            })
+        width = (len(self.columns) + 7) // 8
+        if width > self.bits.shape[1]:
+            self.bits = np.pad(
+                self.bits,
+                ((0, 0), (0, width - self.bits.shape[1])),
+            )
+        rows = np.zeros((len(dish_pks), width), np.uint8)
+        if links:
+            position = {pk: row for row, pk in enumerate(dish_pks)}
+            row_index = np.array([position[dish] for dish, _ in links])
+            columns = np.array([self.columns[pk] for _, pk in links])
+            np.bitwise_or.at(
+                rows,
+                (row_index, columns >> 3),
+                (1 << (columns & 7)).astype(np.uint8),
+            )
+        return rows
+
+    def load_rows(self, queryset):
+        dishes = list(
+            queryset.order_by("pk").values_list("pk", "type_id", "price")
+        )
+        dish_pks = [pk for pk, _, _ in dishes]
+        links = list(
+            Dish.ingredients.through.objects.filter(
+                dish__in=queryset
+            ).values_list("dish_id", "ingredient_id")
+        )
+        return (
+            np.array(dish_pks, np.int64),
+            np.array([type_pk for _, type_pk, _ in dishes], np.int64),
+            price_bands([price for _, _, price in dishes]),
+            self.encode_rows(dish_pks, links),
+        )
+
+    def build(self):
+        self.set_arrays(**empty_arrays())
+        dish_ids, type_ids, bands, bits = self.load_rows(Dish.objects.all())
+        self.set_arrays(
+            dish_ids=dish_ids,
+            type_ids=type_ids,
+            price_bands=bands,
+            ingredient_ids=self.ingredient_ids,
+            bits=bits,
+        )
+
+    def refresh(self, dish_pks):
+        """Re-reads the rows of ``dish_pks``, dropping deleted dishes."""
+        keep = ~np.isin(self.dish_ids, dish_pks)
+        dish_ids, type_ids, bands, bits = self.load_rows(
+            Dish.objects.filter(pk__in=dish_pks)
+        )
+        dish_ids = np.concatenate([self.dish_ids[keep], dish_ids])
+        order = np.argsort(dish_ids, kind="stable")
+        self.set_arrays(
+            dish_ids=dish_ids[order],
+            type_ids=np.concatenate([self.type_ids[keep], type_ids])[order],
+            price_bands=np.concatenate(
+                [self.price_bands[keep], bands]
+            )[order],
+            ingredient_ids=self.ingredient_ids,
+            bits=np.concatenate([self.bits[keep], bits])[order],
+        )
+
+    def save(self):
+        path = storage_path()
+        if not path:
+            return
+        os.makedirs(os.path.dirname(os.fspath(path)) or ".", exist_ok=True)
+        temporary = f"{path}.{os.getpid()}.tmp"
+        with open(temporary, "wb") as stream:
+            np.savez(
+                stream,
+                generation=np.array(self.generation, np.int64),
+                **{name: getattr(self, name) for name in self.fields},
+            )
+        os.replace(temporary, path)
+
+    def load(self, generation):
+        """Adopts the saved matrix if it is at ``generation``."""
+        path = storage_path()
+        if not path or not os.path.exists(path):
+            return False
+        try:
+            with np.load(path) as stored:
+                if int(stored["generation"]) != generation:
+                    return False
+                self.set_arrays(**{name: stored[name] for name in self.fields})
+        except (OSError, KeyError, ValueError, zipfile.BadZipFile):
+            return False
+        self.generation = generation
+        return True
+
+    def stored_generation(self):
+        path = storage_path()
+        if not path or not os.path.exists(path):
+            return None
+        try:
+            with np.load(path) as stored:
+                return int(stored["generation"])
+        except (OSError, KeyError, ValueError, zipfile.BadZipFile):
+            return None
+
+    def changes_until(self, generation):
+        """
+        The dishes changed between this matrix's generation and
+        ``generation``, or ``None`` when they are not all recorded.
+        """
+        if self.generation is None:
+            return None
+        behind = range(self.generation + 1, generation + 1)
+        if len(behind) > MAX_CHANGES or generation < self.generation:
+            return None
+        keys = [CHANGE_KEY.format(n) for n in behind]
+        found = cache.get_many(keys)
+        if len(found) < len(keys):
+            return None
+        return sorted({pk for pks in found.values() for pk in pks})
+
+    def rows_of(self, dish_pks):
+        """``[(pk, row)]`` of the ``dish_pks`` the matrix has a row for."""
+        dish_ids = self.dish_ids
+        rows = np.searchsorted(dish_ids, dish_pks)
+        return [
+            (pk, row) for pk, row in zip(dish_pks, rows.tolist())
+            if row < len(dish_ids) and dish_ids[row] == pk
+        ]
+
+    def affected(self, dish_pks):
+        """
+        The dishes whose best matches can differ after ``dish_pks``
+        changed: those dishes, the dishes listing one of them, and the
+        dishes one of them now scores at least as high as their last
+        stored match. Scores are symmetric, so one pass of the changed
+        rows against the menu finds the latter.
+        """
+        affected = set(dish_pks)
+        affected.update(SimilarDish.objects.filter(
+            similar_id__in=dish_pks
+        ).values_list("dish_id", flat=True))
+        thresholds = np.zeros(len(self.dish_ids), np.float32)
+        last = dict(SimilarDish.objects.filter(
+            rank=SIMILAR_DISHES - 1
+        ).values_list("dish_id", "score"))
+        if last:
+            rows = self.rows_of(sorted(last))
+            thresholds[[row for _, row in rows]] = [
+                last[pk] for pk, _ in rows
+            ]
+        found = self.rows_of(list(dish_pks))
+        for start in range(0, len(found), BATCH_SIZE):
+            batch = np.array([
+                row for _, row in found[start:start + BATCH_SIZE]
+            ])
+            best = self.scores(batch).max(axis=0)
+            best[batch] = 0
+            entering = (best > 0) & (best >= thresholds)
+            affected.update(self.dish_ids[entering].tolist())
+        return sorted(affected)
+
+    def scores(self, rows):
+        """Similarity of the dishes at ``rows`` to every dish."""
+        queries = self.bits[rows]
+        total = len(self.dish_ids)
+        scores = np.empty((len(rows), total), np.float32)
+        width = max(self.bits.shape[1], 1)
+        step = max(CHUNK_BYTES // (len(rows) * width), 1)
+        for start in range(0, total, step):
+            stop = min(start + step, total)
+            shared = POPCOUNT[
+                queries[:, None, :] & self.bits[None, start:stop, :]
+            ].sum(axis=2, dtype=np.int32)
+            union = (
+                self.sizes[rows, None] + self.sizes[None, start:stop] - shared
+            )
+            jaccard = np.divide(
+                shared,
+                union,
+                out=np.zeros(shared.shape, np.float64),
+                where=union > 0,
+            )
+            same_type = (
+                self.type_ids[rows, None] == self.type_ids[None, start:stop]
+            )
+            band_gap = np.abs(
+                self.price_bands[rows, None].astype(np.int32)
+                - self.price_bands[None, start:stop]
+            )
+            scores[:, start:stop] = (
+                INGREDIENT_WEIGHT * jaccard
+                + TYPE_WEIGHT * same_type
+                + PRICE_WEIGHT * np.clip(1 - band_gap / 2, 0, 1)
+            )
+        return scores
+
+    def top_k(self, dish_pks, k=SIMILAR_DISHES):
+        """
+        ``{pk: [(similar pk, score), ...]}`` with the ``k`` best matches of
+        each of ``dish_pks`` that has a row, best first.
+        """
+        found = self.rows_of(list(dish_pks))
+        results = {}
+        for start in range(0, len(found), BATCH_SIZE):
+            batch = found[start:start + BATCH_SIZE]
+            batch_rows = np.array([row for _, row in batch])
+            scores = self.scores(batch_rows)
+            scores[np.arange(len(batch)), batch_rows] = -np.inf
+            for (pk, _), row_scores in zip(batch, scores):
+                results[pk] = self.best(row_scores, k)
+        return results
+
+    def best(self, scores, k):
+        count = min(k, int(np.count_nonzero(scores > 0)))
+        if count == 0:
+            return []
+        candidates = np.argpartition(-scores, count - 1)[:count]
+        # Best score first, then lowest id.
+        order = np.lexsort((self.dish_ids[candidates], -scores[candidates]))
+        return [
+            (int(self.dish_ids[column]), float(scores[column]))
+            for column in candidates[order]
+        ]
+
+
+matrix = SimilarityMatrix()
+
+
+def similar_dishes(dish_pk, k=SIMILAR_DISHES):
+    """The stored dishes most similar to ``dish_pk``, best first."""
+    return [
+        row.similar for row in SimilarDish.objects.filter(
+            dish_id=dish_pk,
+            rank__lt=k,
+        ).select_related("similar__type").order_by("rank")
+    ]
+
+
+def store(dish_pks=None):
+    """
+    Rewrites the stored lists of ``dish_pks``, or of every dish, from the
+    matrix, and invalidates the dish pages showing them.
+    """
+    if dish_pks is None:
+        dish_pks = matrix.dish_ids.tolist()
+        with transaction.atomic():
+            SimilarDish.objects.all().delete()
+            store_batches(dish_pks)
+        tags = {page_cache.CATALOG_TAG}
+    else:
+        with transaction.atomic():
+            store_batches(dish_pks)
+        tags = {page_cache.object_tag(Dish, pk) for pk in dish_pks}
+    transaction.on_commit(partial(lists_changed, tags))
+
+
+def lists_changed(tags):
+    # The lists are part of the dish pages and of their validators.
+    page_cache.invalidate(tags)
+    versions.bump(Dish)
+
+
+def store_batches(dish_pks):
+    for start in range(0, len(dish_pks), STORE_BATCH_SIZE):
+        batch = dish_pks[start:start + STORE_BATCH_SIZE]
+        SimilarDish.objects.filter(dish_id__in=batch).delete()
+        SimilarDish.objects.bulk_create([
+            SimilarDish(dish_id=pk, similar_id=similar, rank=rank, score=score)
+            for pk, ranked in matrix.top_k(batch).items()
+            for rank, (similar, score) in enumerate(ranked)
+        ])
+
+
+def mark_changed(dish_pks):
+    """Records a committed write to ``dish_pks`` for the next refresh."""
+    generation = counter.next()
+    cache.set(CHANGE_KEY.format(generation), list(dish_pks), CHANGE_TIMEOUT)
+
+
+def refresh():
+    """
+    Brings the stored lists up to date with the recorded writes. Returns
+    how many dishes had their list rewritten.
+    """
+    with matrix.lock:
+        # Read before the rows, so a write racing the pass is replayed by
+        # the next one rather than lost.
+        generation = counter.current(initial=matrix.stored_generation)
+        if generation == matrix.generation:
+            return 0
+        changed = matrix.changes_until(generation)
+        if changed is not None:
+            matrix.refresh(changed)
+            dish_pks = matrix.affected(changed)
+            store(dish_pks)
+            stored = len(dish_pks)
+        elif matrix.load(generation):
+            # Saved by a pass that also stored its lists.
+            return 0
+        else:
+            matrix.build()
+            store()
+            stored = len(matrix.dish_ids)
+        matrix.generation = generation
+        matrix.save()
+    return stored
+
+
+def rebuild():
+    """Builds, stores and saves everything at a new generation."""
+    with matrix.lock:
+        # Advanced first, so a write racing the build is replayed.
+        generation = counter.next()
+        matrix.build()
+        store()
+        matrix.generation = generation
+        matrix.save()
+    return matrix
+
+
+def invalidate():
+    """Makes the next refresh rebuild, e.g. after bulk writes."""
+    counter.next()
+    with matrix.lock:
+        matrix.generation = None
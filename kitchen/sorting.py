@@ -0,0 +1,66 @@
+from django.core.exceptions import ValidationError
+
+
+class SortableListMixin:
+    """
+    ListView mixin ordering the queryset by the ``sort`` GET parameter.
+    Each key of ``sort_options`` maps to the ``order_by`` fields it applies;
+    unknown keys keep the default ordering. The fields should match an index
+    so the keyset pages stay range scans.
+    """
+    sort_kwarg = "sort"
+    sort_options = {}
+
+    def get_sort(self):
+        sort = self.request.GET.get(self.sort_kwarg)
+        return sort if sort in self.sort_options else None
+
+    def sort_queryset(self, queryset):
+        sort = self.get_sort()
+        if sort is None:
+            return queryset
+        return queryset.order_by(*self.sort_options[sort])
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["current_sort"] = self.get_sort()
+        return context
+
+
+class FilterableListMixin:
+    """
+    Narrows the queryset by exact-match GET parameters: each key of
+    ``filter_options`` is a parameter, mapped to the model field it filters
+    on. Values the field cannot parse or store, such as an id past the
+    column's range, are ignored.
+    """
+    filter_options = {}
+
+    def get_filters(self, model):
+        filters = {}
+        for param, field_name in self.filter_options.items():
+            value = self.request.GET.get(param)
+            if not value:
+                continue
+            field = model._meta.get_field(field_name)
+            while field.is_relation:
+                field = field.target_field
+            try:
+                value = field.to_python(value)
+                field.run_validators(value)
+            except (ValueError, TypeError, OverflowError, ValidationError):
+                continue
+            filters[param] = value
+        return filters
+
+    def filter_queryset(self, queryset):
+        filters = self.get_filters(queryset.model)
+        return queryset.filter(**{
+            self.filter_options[param]: value
+            for param, value in filters.items()
+        })
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["current_filters"] = self.get_filters(self.model)
+        return context
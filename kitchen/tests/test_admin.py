@@ -0,0 +1,160 @@
+from unittest import mock
+
+from django.contrib.admin.sites import site
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from kitchen.admin import DishAdmin
+from kitchen.models import Dish, DishType, Ingredient
+from kitchen.pagination import EstimatedCountPaginator
+
+DISH_CHANGELIST_URL = reverse("admin:kitchen_dish_changelist")
+
+
+class AdminTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_superuser(
+            username="admin",
+            password="test1234",
+        )
+        self.client.force_login(self.user)
+        self.types = [
+            DishType.objects.create(name=f"Type {index}")
+            for index in range(3)
+        ]
+        Dish.objects.bulk_create(
+            Dish(
+                name=f"Dish {index}",
+                description="test_description",
+                price=10,
+                type=self.types[index % 3],
+            )
+            for index in range(30)
+        )
+
+    def changelist_queries(self, **params):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(DISH_CHANGELIST_URL, params)
+        self.assertEqual(response.status_code, 200)
+        return [query["sql"] for query in queries.captured_queries]
+
+    def test_changelist_joins_types_and_counts_once(self):
+        queries = self.changelist_queries()
+        more_dishes = [
+            Dish(
+                name=f"Extra {index}",
+                description="test_description",
+                price=10,
+                type=self.types[0],
+            )
+            for index in range(30)
+        ]
+        Dish.objects.bulk_create(more_dishes)
+
+        self.assertEqual(len(self.changelist_queries()), len(queries))
+        type_queries = [
+            sql for sql in queries if sql.startswith(
+                'SELECT "kitchen_dishtype"'
+            )
+        ]
+        # Only the list filter reads dish types.
+        self.assertEqual(len(type_queries), 1)
+        self.assertFalse(any("kitchen_dish_cooks" in sql for sql in queries))
+
+    def test_filtered_changelist_skips_full_count(self):
+        queries = self.changelist_queries(type=self.types[0].pk)
+
+        counts = [sql for sql in queries if "COUNT(" in sql]
+        self.assertEqual(len(counts), 1)
+
+    def test_type_filter_offers_busiest_types(self):
+        self.types[1].dish_count = 5
+        self.types[1].save(update_fields=["dish_count"])
+        with mock.patch("kitchen.admin.DishTypeListFilter.limit", 1):
+            response = self.client.get(
+                DISH_CHANGELIST_URL,
+                {"type": self.types[2].pk},
+            )
+
+        choices = [
+            choice["display"]
+            for spec in response.context["cl"].filter_specs
+            for choice in spec.choices(response.context["cl"])
+        ]
+        self.assertEqual(choices, ["All", "Type 1", "Type 2"])
+        self.assertEqual(response.context["cl"].result_count, 10)
+
+    def test_dish_m2m_fields_use_autocomplete(self):
+        basil = Ingredient.objects.create(name="Basil")
+        Ingredient.objects.create(name="Garlic")
+        dish_admin = site._registry[Dish]
+
+        self.assertIsInstance(dish_admin, DishAdmin)
+        self.assertEqual(
+            dish_admin.autocomplete_fields,
+            ("cooks", "ingredients"),
+        )
+        response = self.client.get(
+            reverse("admin:autocomplete"),
+            {
+                "app_label": "kitchen",
+                "model_name": "dish",
+                "field_name": "ingredients",
+                "term": "bas",
+            },
+        )
+        self.assertEqual(
+            [result["id"] for result in response.json()["results"]],
+            [str(basil.pk)],
+        )
+
+
+class EstimatedCountPaginatorTest(TestCase):
+    def setUp(self):
+        dish_type = DishType.objects.create(name="Pasta")
+        Dish.objects.bulk_create(
+            Dish(
+                name=f"Dish {index}",
+                description="test_description",
+                price=10,
+                type=dish_type,
+            )
+            for index in range(3)
+        )
+
+    def paginator(self, queryset, estimate):
+        patcher = mock.patch.object(
+            EstimatedCountPaginator,
+            "table_estimate",
+            return_value=estimate,
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        return EstimatedCountPaginator(queryset, 10)
+
+    def test_big_unfiltered_table_uses_estimate(self):
+        paginator = self.paginator(Dish.objects.all(), 50000)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(paginator.count, 50000)
+
+    def test_filtered_queryset_is_counted(self):
+        paginator = self.paginator(Dish.objects.filter(price=10), 50000)
+
+        self.assertEqual(paginator.count, 3)
+
+    def test_small_table_is_counted(self):
+        paginator = self.paginator(Dish.objects.all(), 100)
+
+        self.assertEqual(paginator.count, 3)
+
+    def test_other_backends_are_counted(self):
+        paginator = EstimatedCountPaginator(Dish.objects.all(), 10)
+
+        with self.assertNumQueries(1):
+            self.assertEqual(paginator.count, 3)
@@ -0,0 +1,168 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from kitchen.models import Dish, DishType, Ingredient
+
+DISH_API_URL = reverse("kitchen:api-list", args=["dishes"])
+INGREDIENT_API_URL = reverse("kitchen:api-list", args=["ingredients"])
+
+
+class ApiTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(
+            username="test",
+            password="test1234",
+        )
+        self.client.force_login(self.user)
+        self.dish_type = DishType.objects.create(name="Pasta")
+        self.basil = Ingredient.objects.create(name="Basil")
+        self.dishes = []
+        for name in ("Pesto", "Carbonara", "Lasagna"):
+            dish = Dish.objects.create(
+                name=name,
+                description="test_description",
+                price=10,
+                type=self.dish_type,
+            )
+            dish.ingredients.add(self.basil)
+            dish.cooks.add(self.user)
+            self.dishes.append(dish)
+
+
+class ApiListTest(ApiTestCase):
+    def test_login_required(self):
+        self.client.logout()
+
+        response = self.client.get(DISH_API_URL)
+
+        self.assertEqual(response.status_code, 403)
+
+    def test_unknown_resource(self):
+        response = self.client.get(
+            reverse("kitchen:api-list", args=["orders"])
+        )
+
+        self.assertEqual(response.status_code, 404)
+
+    def test_list_uses_model_ordering_and_relations(self):
+        response = self.client.get(DISH_API_URL)
+        data = response.json()
+
+        self.assertEqual(
+            [dish["name"] for dish in data["results"]],
+            ["Carbonara", "Lasagna", "Pesto"]
+        )
+        self.assertEqual(data["results"][0], {
+            "id": self.dishes[1].pk,
+            "name": "Carbonara",
+            "description": "test_description",
+            "price": "10.00",
+            "type": self.dish_type.pk,
+            "ingredients": [self.basil.pk],
+            "cooks": [self.user.pk],
+        })
+
+    def test_sparse_fieldset_skips_columns_and_relations(self):
+        # session, user, dishes
+        with self.assertNumQueries(3):
+            response = self.client.get(DISH_API_URL, {"fields": "name"})
+
+        self.assertEqual(response.json()["results"][0], {"name": "Carbonara"})
+
+    def test_unknown_field(self):
+        response = self.client.get(DISH_API_URL, {"fields": "name,secret"})
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_cursor_pagination(self):
+        first = self.client.get(DISH_API_URL, {"limit": 2}).json()
+        second = self.client.get(
+            DISH_API_URL,
+            {"limit": 2, "cursor": first["next"]}
+        ).json()
+
+        self.assertEqual(len(first["results"]), 2)
+        self.assertEqual(
+            [dish["name"] for dish in second["results"]],
+            ["Pesto"]
+        )
+        self.assertIsNone(second["next"])
+
+    def test_detail(self):
+        url = reverse("kitchen:api-detail", args=["dishes", self.dishes[0].pk])
+
+        response = self.client.get(url, {"fields": "name,ingredients"})
+
+        self.assertEqual(
+            response.json(),
+            {"name": "Pesto", "ingredients": [self.basil.pk]}
+        )
+        missing = self.client.get(
+            reverse("kitchen:api-detail", args=["dishes", 0])
+        )
+        self.assertEqual(missing.status_code, 404)
+
+
+class ApiConditionalTest(ApiTestCase):
+    def revalidate(self, url, response):
+        return self.client.get(
+            url,
+            HTTP_IF_NONE_MATCH=response["ETag"],
+        )
+
+    def test_unchanged_catalog_returns_not_modified(self):
+        response = self.client.get(DISH_API_URL)
+
+        self.assertIn("ETag", response)
+        self.assertNotIn("Last-Modified", response)
+        # session, user; the catalog tables are not queried
+        with self.assertNumQueries(2):
+            revalidated = self.revalidate(DISH_API_URL, response)
+        self.assertEqual(revalidated.status_code, 304)
+
+    def test_own_write_changes_etag(self):
+        response = self.client.get(DISH_API_URL)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.dishes[0].ingredients.clear()
+
+        revalidated = self.revalidate(DISH_API_URL, response)
+        self.assertEqual(revalidated.status_code, 200)
+
+    def test_dependency_write_changes_etag(self):
+        dishes = self.client.get(DISH_API_URL)
+        ingredients = self.client.get(INGREDIENT_API_URL)
+        types = self.client.get(
+            reverse("kitchen:api-list", args=["dish-types"])
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Ingredient.objects.create(name="Garlic")
+
+        self.assertEqual(
+            self.revalidate(DISH_API_URL, dishes).status_code,
+            200
+        )
+        self.assertEqual(
+            self.revalidate(INGREDIENT_API_URL, ingredients).status_code,
+            200
+        )
+        self.assertEqual(
+            self.revalidate(
+                reverse("kitchen:api-list", args=["dish-types"]),
+                types
+            ).status_code,
+            304
+        )
+
+    def test_login_does_not_change_cook_etag(self):
+        url = reverse("kitchen:api-list", args=["cooks"])
+        response = self.client.get(url)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.login(username="test", password="test1234")
+
+        self.assertEqual(self.revalidate(url, response).status_code, 304)
@@ -0,0 +1,133 @@
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import include, path, reverse
+
+from kitchen import similarity, urls as kitchen_urls
+from kitchen.async_views import ASYNC_VIEWS, use_async_views
+from kitchen.models import Dish, DishType, Ingredient
+
+urlpatterns = [
+    path(
+        "",
+        include(
+            (use_async_views(kitchen_urls.urlpatterns), "kitchen"),
+            namespace="kitchen",
+        )
+    ),
+    path("accounts/", include("django.contrib.auth.urls")),
+]
+
+
+@override_settings(ROOT_URLCONF=__name__)
+class AsyncViewsTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(
+            username="test",
+            password="test1234",
+        )
+        self.async_client.force_login(self.user)
+        dish_type = DishType.objects.create(name="Pasta")
+        basil = Ingredient.objects.create(name="Basil")
+        self.dish = Dish.objects.create(
+            name="Pesto",
+            description="test_description",
+            price=10,
+            type=dish_type,
+        )
+        self.dish.ingredients.add(basil)
+        self.dish.cooks.add(self.user)
+        self.dish_url = reverse(
+            "kitchen:dish-detail",
+            kwargs={"pk": self.dish.pk}
+        )
+        self.cook_url = reverse(
+            "kitchen:cook-detail",
+            kwargs={"pk": self.user.pk}
+        )
+
+    async def test_pages_are_served_by_async_views(self):
+        pages = {
+            reverse("kitchen:index"): "Dishes",
+            reverse("kitchen:dish-type-list"): "Pasta",
+            reverse("kitchen:dish-list"): "Pesto",
+            reverse("kitchen:ingredient-list"): "Basil",
+            reverse("kitchen:cook-list"): "test",
+            self.dish_url: "Basil",
+            self.cook_url: "Pesto",
+        }
+        for url, text in pages.items():
+            response = await self.async_client.get(url)
+
+            self.assertTrue(iscoroutinefunction(response.resolver_match.func))
+            self.assertContains(response, text)
+
+    async def test_index_counts(self):
+        response = await self.async_client.get(reverse("kitchen:index"))
+
+        self.assertEqual(response.context["num_dishes"], 1)
+        self.assertEqual(response.context["num_ingredients"], 1)
+
+    async def test_query_counts_match_sync_views(self):
+        # Built ahead, as build_dish_similarity does on deploy.
+        await sync_to_async(similarity.rebuild)()
+        list_response = await self.async_client.get(
+            reverse("kitchen:dish-list")
+        )
+        detail_response = await self.async_client.get(self.dish_url)
+
+        # session, user, page
+        self.assertEqual(list_response.metrics.queries, 3)
+        # ... dish, ingredients, cooks, similar dishes
+        self.assertEqual(detail_response.metrics.queries, 6)
+
+    async def test_login_required(self):
+        await self.async_client.alogout()
+
+        response = await self.async_client.get(self.dish_url)
+
+        self.assertRedirects(
+            response,
+            f"/accounts/login/?next={self.dish_url}",
+            fetch_redirect_response=False,
+        )
+
+    async def test_missing_object_and_bad_cursor(self):
+        missing = await self.async_client.get(
+            reverse("kitchen:dish-detail", kwargs={"pk": 0})
+        )
+        bad_cursor = await self.async_client.get(
+            reverse("kitchen:dish-list"),
+            {"cursor": "bad"}
+        )
+
+        self.assertEqual(missing.status_code, 404)
+        self.assertEqual(bad_cursor.status_code, 404)
+
+    async def test_revalidation_and_page_cache(self):
+        response = await self.async_client.get(self.dish_url)
+
+        revalidated = await self.async_client.get(
+            self.dish_url,
+            headers={"if-none-match": response["ETag"]},
+        )
+        cached = await self.async_client.get(self.dish_url)
+
+        self.assertEqual(revalidated.status_code, 304)
+        # session, user
+        self.assertEqual(cached.metrics.queries, 2)
+        self.assertEqual(cached.content, response.content)
+
+
+class UseAsyncViewsTest(TestCase):
+    def test_swaps_only_read_views(self):
+        patterns = {
+            pattern.name: pattern.callback
+            for pattern in use_async_views(kitchen_urls.urlpatterns)
+        }
+
+        self.assertIs(patterns["index"], ASYNC_VIEWS["index"])
+        self.assertTrue(iscoroutinefunction(patterns["dish-list"]))
+        self.assertFalse(iscoroutinefunction(patterns["dish-create"]))
@@ -0,0 +1,172 @@
+import io
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test import Client, TestCase, TransactionTestCase
+
+from kitchen import benchmark
+from kitchen.models import Cook, Dish, DishType, Ingredient
+
+
+def generate(**options):
+    options = {
+        "cooks": 5,
+        "dish_types": 3,
+        "ingredients": 20,
+        "dishes": 30,
+        **options,
+    }
+    call_command("generate_kitchen_data", stdout=io.StringIO(), **options)
+
+
+class GenerateKitchenDataTest(TestCase):
+    def test_generates_requested_counts(self):
+        generate(ingredients_per_dish=(2, 4), cooks_per_dish=(1, 1))
+
+        self.assertEqual(Cook.objects.count(), 5)
+        self.assertEqual(DishType.objects.count(), 3)
+        self.assertEqual(Ingredient.objects.count(), 20)
+        self.assertEqual(Dish.objects.count(), 30)
+        links = Dish.ingredients.through.objects.count()
+        self.assertTrue(60 <= links <= 120)
+        self.assertEqual(Dish.cooks.through.objects.count(), 30)
+
+    def test_same_seed_generates_same_catalog(self):
+        def snapshot():
+            return list(Dish.objects.order_by("pk").values_list(
+                "name", "price", "type__name"
+            ))
+
+        generate(seed=7)
+        first = snapshot()
+        Dish.objects.all().delete()
+        DishType.objects.all().delete()
+        Ingredient.objects.all().delete()
+        Cook.objects.all().delete()
+        generate(seed=7)
+
+        self.assertEqual(snapshot(), first)
+
+    def test_dishes_without_types_are_rejected(self):
+        with self.assertRaises(CommandError):
+            generate(dish_types=0)
+
+
+class BenchmarkHarnessTest(TestCase):
+    def setUp(self):
+        generate()
+        self.client = Client()
+        self.client.force_login(
+            get_user_model().objects.create_user(
+                username="bench",
+                password="test1234",
+                is_staff=True,
+            )
+        )
+
+    def test_run_reports_every_url(self):
+        report = benchmark.run(self.client, iterations=2, warmup=0)
+
+        self.assertEqual(report["meta"]["rows"]["dish"], 30)
+        self.assertEqual(report["meta"]["skipped"], [])
+        result = report["results"]["kitchen:dish-detail"]
+        self.assertEqual(result["status"], 200)
+        self.assertEqual(result["queries"], 6)
+        for key in ("p50_ms", "p95_ms", "mean_ms", "alloc_peak_kb"):
+            self.assertIn(key, result)
+        self.assertIn("kitchen:autocomplete", report["results"])
+
+    def test_compare_reports_relative_change(self):
+        current = {"results": {"kitchen:index": {"queries": 4}}}
+        baseline = {"results": {"kitchen:index": {"queries": 2}}}
+
+        self.assertEqual(
+            benchmark.compare(current, baseline, metrics=("queries", )),
+            [("kitchen:index", "queries", 2, 4, 100.0)]
+        )
+
+
+class BenchmarkTemplatesCommandTest(TestCase):
+    def test_reports_render_time_before_and_after(self):
+        generate()
+        stdout = io.StringIO()
+
+        call_command(
+            "benchmark_templates",
+            iterations=2,
+            warmup=0,
+            host="testserver",
+            urls=["kitchen:dish-detail", "kitchen:dish-list"],
+            stdout=stdout,
+        )
+
+        output = stdout.getvalue()
+        self.assertIn("kitchen:dish-detail", output)
+        self.assertIn("kitchen:dish-list", output)
+        self.assertIn("->", output)
+
+
+class StatusHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        status = 500 if self.path.endswith("/broken/") else 200
+        self.send_response(status)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"ok")
+
+    def log_message(self, *args):
+        pass
+
+
+class LoadTestTest(TestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), StatusHandler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        self.base_url = f"http://127.0.0.1:{self.server.server_port}/app"
+
+    def test_reports_throughput_and_errors(self):
+        result = benchmark.load_test(
+            self.base_url,
+            ["/ok/", "/broken/"],
+            concurrency=2,
+            duration=0.2,
+        )
+
+        self.assertEqual(result["concurrency"], 2)
+        self.assertGreater(result["requests"], 2)
+        self.assertGreater(result["rps"], 0)
+        # Both clients alternate between the two paths.
+        self.assertAlmostEqual(
+            result["errors"],
+            result["requests"] / 2,
+            delta=2,
+        )
+        self.assertIsNotNone(result["p95_ms"])
+
+
+class BenchmarkConnectionsCommandTest(TransactionTestCase):
+    def test_reports_every_mode(self):
+        stdout = io.StringIO()
+
+        call_command("benchmark_connections", iterations=5, stdout=stdout)
+
+        output = stdout.getvalue()
+        for mode in ("connect", "per-request", "persistent", "configured"):
+            self.assertIn(mode, output)
+        self.assertIn("/ 5 requests", output)
+
+    def test_restores_connection_settings(self):
+        before = dict(connection.settings_dict)
+
+        benchmark.request_cycle_cost(iterations=2, CONN_MAX_AGE=30)
+
+        self.assertEqual(connection.settings_dict, before)
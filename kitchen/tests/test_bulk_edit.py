@@ -0,0 +1,405 @@
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db.models.signals import m2m_changed
+from django.test import TestCase
+from django.urls import reverse
+
+from kitchen import bulk_edit, ingredient_index, page_cache
+from kitchen.forms import DishBulkIngredientForm, DishBulkPriceForm
+from kitchen.models import Cook, Dish, DishType, Ingredient
+from kitchen.signals import catalog_bulk_changed
+
+BULK_EDIT_URL = reverse("kitchen:dish-bulk-edit")
+
+
+class BulkEditTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.pasta = DishType.objects.create(name="Pasta")
+        self.soup = DishType.objects.create(name="Soup")
+        self.garlic, self.basil, self.egg = (
+            Ingredient.objects.create(name=name)
+            for name in ("Garlic", "Basil", "Egg")
+        )
+        self.mario, self.luigi = (
+            get_user_model().objects.create_user(
+                username=username,
+                password="test1234",
+            )
+            for username in ("mario", "luigi")
+        )
+        self.pesto, self.aglio, self.minestrone = (
+            Dish.objects.create(
+                name=name,
+                description="test_description",
+                price=price,
+                type=dish_type,
+            )
+            for name, price, dish_type in (
+                ("Pesto", Decimal("10.00"), self.pasta),
+                ("Aglio", Decimal("8.50"), self.pasta),
+                ("Minestrone", Decimal("6.00"), self.soup),
+            )
+        )
+        self.pesto.ingredients.set([self.garlic, self.basil])
+        self.aglio.ingredients.set([self.garlic])
+        self.pesto.cooks.set([self.mario])
+
+    def prices(self):
+        return dict(Dish.objects.values_list("name", "price"))
+
+    def dish_counts(self, model):
+        return dict(model.objects.values_list("pk", "dish_count"))
+
+    def test_reprice_by_percent_in_one_update(self):
+        pasta = Dish.objects.filter(type=self.pasta)
+
+        # the dish ids, the update, the cooks whose pages show the dishes
+        # and the savepoint pair
+        with self.assertNumQueries(5):
+            updated = bulk_edit.reprice(pasta, percent=10)
+
+        self.assertEqual(updated, 2)
+        self.assertEqual(self.prices(), {
+            "Pesto": Decimal("11.00"),
+            "Aglio": Decimal("9.35"),
+            "Minestrone": Decimal("6.00"),
+        })
+
+    def test_reprice_by_amount_stops_at_zero(self):
+        bulk_edit.reprice(Dish.objects.all(), amount=Decimal("-7.00"))
+
+        self.assertEqual(self.prices(), {
+            "Pesto": Decimal("3.00"),
+            "Aglio": Decimal("1.50"),
+            "Minestrone": Decimal("0.00"),
+        })
+
+    def test_reprice_stops_at_the_column_maximum(self):
+        Dish.objects.filter(pk=self.pesto.pk).update(
+            price=Decimal("99999999.00")
+        )
+
+        bulk_edit.reprice(Dish.objects.all(), percent=1000)
+
+        prices = self.prices()
+        self.assertEqual(prices["Pesto"], Decimal("99999999.99"))
+        self.assertEqual(prices["Minestrone"], Decimal("66.00"))
+
+        bulk_edit.reprice(Dish.objects.all(), amount=Decimal("99999999.99"))
+
+        self.assertEqual(
+            set(self.prices().values()),
+            {Decimal("99999999.99")},
+        )
+
+    def test_reprice_needs_one_change(self):
+        with self.assertRaises(ValueError):
+            bulk_edit.reprice(Dish.objects.all())
+        with self.assertRaises(ValueError):
+            bulk_edit.reprice(Dish.objects.all(), percent=1, amount=1)
+
+    def test_add_ingredient_shifts_counts_and_index(self):
+        ingredient_index.search(include=[self.egg.pk])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            changed = bulk_edit.change_relation(
+                Dish.objects.filter(type=self.pasta),
+                "ingredients",
+                "add",
+                [self.egg, self.garlic],
+            )
+
+        # Egg joins both pasta dishes; both already have garlic.
+        self.assertEqual(changed, 2)
+        self.assertEqual(self.dish_counts(Ingredient)[self.egg.pk], 2)
+        self.assertEqual(
+            Dish.objects.get(pk=self.aglio.pk).ingredient_count,
+            2,
+        )
+        self.assertEqual(
+            sorted(ingredient_index.search(include=[self.egg.pk])),
+            sorted([self.pesto.pk, self.aglio.pk]),
+        )
+
+    def test_relation_change_sends_one_signal(self):
+        sent = []
+
+        def receiver(signal, **kwargs):
+            sent.append((signal, kwargs))
+
+        m2m_changed.connect(receiver, dispatch_uid="test-bulk-m2m")
+        catalog_bulk_changed.connect(receiver, dispatch_uid="test-bulk")
+        self.addCleanup(
+            m2m_changed.disconnect, dispatch_uid="test-bulk-m2m"
+        )
+        self.addCleanup(
+            catalog_bulk_changed.disconnect, dispatch_uid="test-bulk"
+        )
+
+        bulk_edit.change_relation(
+            Dish.objects.all(),
+            "ingredients",
+            "add",
+            [self.basil, self.egg],
+        )
+
+        self.assertEqual(len(sent), 1)
+        signal, kwargs = sent[0]
+        self.assertIs(signal, catalog_bulk_changed)
+        self.assertEqual(kwargs["fields"], ("ingredients", ))
+        self.assertEqual(
+            kwargs["pks"],
+            sorted([self.pesto.pk, self.aglio.pk, self.minestrone.pk]),
+        )
+        self.assertEqual(
+            kwargs["related_pks"],
+            sorted([self.basil.pk, self.egg.pk]),
+        )
+
+    def test_unchanged_links_send_nothing(self):
+        sent = []
+        catalog_bulk_changed.connect(
+            lambda **kwargs: sent.append(kwargs),
+            weak=False,
+            dispatch_uid="test-bulk",
+        )
+        self.addCleanup(
+            catalog_bulk_changed.disconnect, dispatch_uid="test-bulk"
+        )
+
+        changed = bulk_edit.change_relation(
+            Dish.objects.filter(type=self.soup),
+            "cooks",
+            "remove",
+            [self.mario],
+        )
+
+        self.assertEqual(changed, 0)
+        self.assertEqual(sent, [])
+
+    def test_replace_cook(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            changed = bulk_edit.change_relation(
+                Dish.objects.all(),
+                "cooks",
+                "replace",
+                [self.mario],
+                self.luigi,
+            )
+
+        self.assertEqual(changed, 1)
+        self.assertEqual(list(self.pesto.cooks.all()), [self.luigi])
+        self.assertEqual(Dish.objects.get(pk=self.pesto.pk).cook_count, 1)
+        self.assertEqual(self.dish_counts(Cook), {
+            self.mario.pk: 0,
+            self.luigi.pk: 1,
+        })
+
+    def test_removed_cook_page_is_invalidated(self):
+        tag = page_cache.object_tag(Cook, self.mario.pk)
+        before = page_cache.tag_versions([tag])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            bulk_edit.change_relation(
+                Dish.objects.all(),
+                "cooks",
+                "remove",
+                [self.mario],
+            )
+
+        self.assertNotEqual(page_cache.tag_versions([tag]), before)
+
+    def test_remove_ingredient_in_one_delete(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            changed = bulk_edit.change_relation(
+                Dish.objects.all(),
+                "ingredients",
+                "remove",
+                [self.garlic],
+            )
+
+        self.assertEqual(changed, 2)
+        self.assertFalse(self.garlic.dishes.exists())
+        self.assertEqual(
+            Dish.objects.get(pk=self.pesto.pk).ingredient_count,
+            1,
+        )
+        self.assertEqual(self.dish_counts(Ingredient)[self.garlic.pk], 0)
+        self.assertEqual(ingredient_index.search(include=[self.garlic.pk]), [])
+
+    def test_only_replace_takes_a_replacement(self):
+        with self.assertRaises(ValueError):
+            bulk_edit.change_relation(
+                Dish.objects.all(),
+                "cooks",
+                "add",
+                [self.mario],
+                self.luigi,
+            )
+        with self.assertRaises(ValueError):
+            bulk_edit.change_relation(
+                Dish.objects.all(),
+                "cooks",
+                "replace",
+                [self.mario],
+            )
+
+
+class BulkEditFormTest(TestCase):
+    def setUp(self):
+        self.garlic = Ingredient.objects.create(name="Garlic")
+        self.basil = Ingredient.objects.create(name="Basil")
+
+    def test_percent_is_bounded(self):
+        form = DishBulkPriceForm({"change": "percent", "value": "-150"})
+
+        self.assertFalse(form.is_valid())
+        self.assertIn("value", form.errors)
+
+    def test_replace_needs_one_replacement(self):
+        form = DishBulkIngredientForm({
+            "action": "replace",
+            "targets": [self.garlic.pk],
+        })
+
+        self.assertFalse(form.is_valid())
+        self.assertIn("replacement", form.errors)
+
+    def test_replacement_only_when_replacing(self):
+        form = DishBulkIngredientForm({
+            "action": "add",
+            "targets": [self.garlic.pk],
+            "replacement": [self.basil.pk],
+        })
+
+        self.assertFalse(form.is_valid())
+        self.assertIn("replacement", form.errors)
+
+
+class BulkEditViewTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(
+            username="test",
+            password="test1234",
+        )
+        self.client.force_login(self.user)
+        self.pasta = DishType.objects.create(name="Pasta")
+        soup = DishType.objects.create(name="Soup")
+        self.garlic = Ingredient.objects.create(name="Garlic")
+        for name, dish_type in (("Pesto", self.pasta), ("Broth", soup)):
+            Dish.objects.create(
+                name=name,
+                description="test_description",
+                price=10,
+                type=dish_type,
+            )
+
+    def test_login_required(self):
+        self.client.logout()
+
+        response = self.client.get(BULK_EDIT_URL)
+
+        self.assertNotEqual(response.status_code, 200)
+
+    def test_shows_matching_dish_count(self):
+        response = self.client.get(BULK_EDIT_URL, {"type": self.pasta.pk})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["dish_count"], 1)
+
+    def test_applies_to_filtered_dishes_and_returns_to_list(self):
+        url = f"{BULK_EDIT_URL}?type={self.pasta.pk}"
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(url, {
+                "operation": "ingredients",
+                "ingredients-action": "add",
+                "ingredients-targets": [self.garlic.pk],
+            })
+
+        self.assertRedirects(
+            response,
+            f"{reverse('kitchen:dish-list')}?type={self.pasta.pk}",
+            fetch_redirect_response=False,
+        )
+        self.assertEqual(
+            list(self.garlic.dishes.values_list("name", flat=True)),
+            ["Pesto"],
+        )
+
+    def test_invalid_form_is_shown_again(self):
+        response = self.client.post(BULK_EDIT_URL, {
+            "operation": "price",
+            "price-change": "percent",
+        })
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("value", response.context["forms"]["price"].errors)
+        self.assertEqual(
+            set(Dish.objects.values_list("price", flat=True)),
+            {Decimal("10.00")},
+        )
+
+    def test_admin_action_reprices_selected_dishes(self):
+        self.user.is_staff = True
+        self.user.is_superuser = True
+        self.user.save()
+        pesto = Dish.objects.get(name="Pesto")
+        url = reverse("admin:kitchen_dish_changelist")
+        selection = {
+            "action": "reprice_dishes",
+            "_selected_action": [pesto.pk],
+        }
+
+        response = self.client.post(url, selection)
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, "admin/kitchen/dish/bulk_edit.html")
+
+        response = self.client.post(url, {
+            **selection,
+            "apply": "Apply",
+            "change": "amount",
+            "value": "2.50",
+        })
+
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(
+            dict(Dish.objects.values_list("name", "price")),
+            {"Pesto": Decimal("12.50"), "Broth": Decimal("10.00")},
+        )
+
+    def test_admin_action_across_pages_keeps_the_filter(self):
+        self.user.is_staff = True
+        self.user.is_superuser = True
+        self.user.save()
+        pesto = Dish.objects.get(name="Pesto")
+        url = reverse("admin:kitchen_dish_changelist")
+        url = f"{url}?type={self.pasta.pk}"
+        selection = {
+            "action": "reprice_dishes",
+            "_selected_action": [pesto.pk],
+            "select_across": "1",
+        }
+
+        response = self.client.post(url, {**selection, "index": "0"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["dish_count"], 1)
+        self.assertContains(response, 'name="select_across" value="1"')
+        self.assertContains(response, 'name="_selected_action"', count=1)
+
+        response = self.client.post(url, {
+            **selection,
+            "apply": "Apply",
+            "change": "percent",
+            "value": "10",
+        })
+
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(
+            dict(Dish.objects.values_list("name", "price")),
+            {"Pesto": Decimal("11.00"), "Broth": Decimal("10.00")},
+        )
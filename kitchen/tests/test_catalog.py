@@ -0,0 +1,149 @@
+import io
+import json
+import os
+import tempfile
+
+from django.core.management import call_command
+from django.core.cache import cache
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from kitchen import counters
+from kitchen.catalog import CatalogError, DishCatalog, import_rows, read_rows
+from kitchen.models import Cook, Dish, DishType, Ingredient
+
+DISHES_CSV = (
+    "name,description,price,type,cooks,ingredients\n"
+    "Pesto,Green pasta,12.50,Pasta,mario|luigi,Basil|Garlic\n"
+    "Carbonara,Eggs and bacon,11,Pasta,mario,Egg\n"
+)
+
+
+class CatalogImportTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        DishType.objects.create(name="Pasta")
+        for name in ("Basil", "Garlic", "Egg"):
+            Ingredient.objects.create(name=name)
+        for username in ("mario", "luigi"):
+            Cook.objects.create_user(username=username, password="test1234")
+
+    def import_csv(self, content, batch_size=1000):
+        rows = read_rows(io.StringIO(content), "csv", DishCatalog.list_fields)
+        return import_rows(DishCatalog(), rows, batch_size)
+
+    def test_import_creates_dishes_with_relations(self):
+        created, updated = self.import_csv(DISHES_CSV)
+
+        pesto = Dish.objects.get(name="Pesto")
+        self.assertEqual((created, updated), (2, 0))
+        self.assertEqual(str(pesto.price), "12.50")
+        self.assertEqual(
+            sorted(pesto.cooks.values_list("username", flat=True)),
+            ["luigi", "mario"]
+        )
+        self.assertEqual(
+            sorted(pesto.ingredients.values_list("name", flat=True)),
+            ["Basil", "Garlic"]
+        )
+
+    def test_failed_batch_keeps_earlier_batches_counted(self):
+        salt = Ingredient.objects.create(name="Salt")
+        counters.get_counts()
+
+        with (
+            self.captureOnCommitCallbacks(execute=True),
+            self.assertRaises(CatalogError),
+        ):
+            self.import_csv(
+                "name,description,price,type,cooks,ingredients\n"
+                "Salted,Plain,3,Pasta,mario,Salt\n"
+                "Broken,Bad price,abc,Pasta,mario,Salt\n",
+                batch_size=1,
+            )
+
+        salt.refresh_from_db()
+        self.assertEqual(list(Dish.objects.values_list("name", flat=True)), [
+            "Salted",
+        ])
+        self.assertEqual(counters.get_counts()["dishes"], 1)
+        self.assertEqual(salt.dish_count, 1)
+
+    def test_malformed_jsonl_reports_the_line(self):
+        rows = read_rows(io.StringIO('{"name": "Pesto"}\n{oops\n'), "jsonl")
+
+        with self.assertRaisesMessage(CatalogError, "Line 2: invalid JSON"):
+            list(rows)
+
+    def test_reimport_updates_in_place(self):
+        self.import_csv(DISHES_CSV)
+
+        created, updated = self.import_csv(
+            "name,description,price,type,cooks,ingredients\n"
+            "Pesto,Green pasta,14,Pasta,luigi,Basil\n"
+        )
+
+        pesto = Dish.objects.get(name="Pesto")
+        self.assertEqual((created, updated), (0, 1))
+        self.assertEqual(Dish.objects.count(), 2)
+        self.assertEqual(pesto.price, 14)
+        self.assertEqual(list(pesto.ingredients.all()), [
+            Ingredient.objects.get(name="Basil")
+        ])
+
+    def test_batch_query_count_does_not_grow_with_rows(self):
+        rows = "".join(
+            f"Dish {index},Text,{index},Pasta,mario,Basil|Egg\n"
+            for index in range(50)
+        )
+        header = "name,description,price,type,cooks,ingredients\n"
+
+        # type lookup, existing lookup, insert, and per relation:
+        # target lookup, delete, insert; plus the savepoint pair and one
+        # recount per relation count afterwards.
+        with self.assertNumQueries(16):
+            self.import_csv(header + rows, batch_size=50)
+
+    def test_unknown_reference_is_rejected(self):
+        with self.assertRaises(CommandError):
+            with tempfile.NamedTemporaryFile(
+                "w", suffix=".csv", delete=False
+            ) as stream:
+                stream.write(
+                    "name,description,price,type,cooks,ingredients\n"
+                    "Soup,Hot,5,Soups,mario,Egg\n"
+                )
+            try:
+                call_command("import_catalog", "dish", stream.name)
+            finally:
+                os.unlink(stream.name)
+
+
+class CatalogExportTest(TestCase):
+    def test_export_then_import_round_trip(self):
+        dish_type = DishType.objects.create(name="Pasta")
+        basil = Ingredient.objects.create(name="Basil")
+        dish = Dish.objects.create(
+            name="Pesto",
+            description="Green pasta",
+            price=12,
+            type=dish_type,
+        )
+        dish.ingredients.add(basil)
+        out = io.StringIO()
+
+        call_command("export_catalog", "dish", format="jsonl", stdout=out)
+
+        row = json.loads(out.getvalue())
+        self.assertEqual(row["type"], "Pasta")
+        self.assertEqual(row["ingredients"], ["Basil"])
+        self.assertEqual(row["cooks"], [])
+
+        Dish.objects.all().delete()
+        rows = read_rows(io.StringIO(out.getvalue()), "jsonl")
+        import_rows(DishCatalog(), rows)
+
+        self.assertEqual(
+            list(Dish.objects.get(name="Pesto").ingredients.all()),
+            [basil]
+        )
@@ -0,0 +1,33 @@
+from django.core.checks import run_checks
+from django.test import SimpleTestCase, override_settings
+
+from kitchen.checks import check_shared_cache
+
+LOCMEM = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+}
+REDIS = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": "redis://127.0.0.1:6379",
+    },
+}
+
+
+class SharedCacheCheckTest(SimpleTestCase):
+    @override_settings(CACHES=LOCMEM)
+    def test_process_local_cache_fails_deploy_checks(self):
+        errors = run_checks(include_deployment_checks=True)
+
+        self.assertIn("kitchen.E001", [error.id for error in errors])
+
+    @override_settings(CACHES=LOCMEM)
+    def test_process_local_cache_is_fine_in_development(self):
+        self.assertNotIn(
+            "kitchen.E001",
+            [error.id for error in run_checks()],
+        )
+
+    @override_settings(CACHES=REDIS)
+    def test_shared_cache_passes(self):
+        self.assertEqual(check_shared_cache(None), [])
@@ -0,0 +1,61 @@
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from kitchen import counters
+from kitchen.models import Cook, DishType, Ingredient
+
+INDEX_URL = reverse("kitchen:index")
+
+
+class CountersTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        DishType.objects.create(name="Soup")
+        Ingredient.objects.create(name="Salt")
+
+    def test_counts_with_one_query_then_from_cache(self):
+        with self.assertNumQueries(1):
+            counts = counters.get_counts()
+        with self.assertNumQueries(0):
+            self.assertEqual(counters.get_counts(), counts)
+
+        self.assertEqual(
+            counts,
+            {"cooks": 0, "dishes": 0, "dish_types": 1, "ingredients": 1}
+        )
+
+    def test_signals_adjust_cached_counts_on_commit(self):
+        counters.get_counts()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            DishType.objects.create(name="Pizza")
+        with self.captureOnCommitCallbacks(execute=True):
+            Ingredient.objects.get(name="Salt").delete()
+        with self.captureOnCommitCallbacks(execute=True):
+            DishType.objects.get(name="Pizza").save()
+
+        counts = counters.get_counts()
+        self.assertEqual(counts["dish_types"], 2)
+        self.assertEqual(counts["ingredients"], 0)
+
+    def test_rebuild_counters_command(self):
+        cache.set(counters.cache_key("dish_types"), 42)
+        out = StringIO()
+
+        call_command("rebuild_counters", stdout=out)
+
+        self.assertIn("dish_types: 1", out.getvalue())
+        self.assertEqual(counters.get_counts()["dish_types"], 1)
+
+    def test_index_uses_cached_counts(self):
+        Cook.objects.create_user(username="test", password="test1234")
+        counters.rebuild()
+
+        response = self.client.get(INDEX_URL)
+
+        self.assertEqual(response.context["num_cooks"], 1)
+        self.assertEqual(response.context["num_dish_types"], 1)
@@ -0,0 +1,232 @@
+import asyncio
+import json
+import threading
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import RequestFactory, SimpleTestCase, TestCase
+from django.urls import reverse
+
+from kitchen import async_views, events
+from kitchen.models import Dish, DishType
+from kitchen.signals import catalog_bulk_changed
+
+EVENTS_URL = reverse("kitchen:live-events")
+
+
+def parse(text):
+    """``[(event, id, data)]`` of the events in SSE ``text``."""
+    parsed = []
+    for block in text.strip().split("\n\n"):
+        fields = dict(
+            line.split(": ", 1) for line in block.splitlines()
+            if not line.startswith(":")
+        )
+        if "event" in fields:
+            parsed.append((
+                fields["event"],
+                fields["id"],
+                json.loads(fields["data"]),
+            ))
+    return parsed
+
+
+class BrokerTest(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.broker = events.Broker(size=3)
+
+    def test_fresh_screen_gets_id_to_resume_from(self):
+        event = self.broker.publish("dish", {"action": "deleted", "pk": 1})
+
+        [(name, event_id, _)] = parse(self.broker.replay())
+
+        self.assertEqual((name, event_id), ("hello", event.id))
+
+    def test_resume_replays_missed_events_of_topics(self):
+        first = self.broker.publish("dish", {"pk": 1})
+        self.broker.publish("cook", {"pk": 2})
+        third = self.broker.publish("dish", {"pk": 3})
+
+        replayed = parse(self.broker.replay(["dish"], first.id))
+
+        self.assertEqual(replayed, [("dish", third.id, {"pk": 3})])
+        self.assertEqual(parse(self.broker.replay(last_id=third.id)), [])
+
+    def test_unknown_or_evicted_ids_reset(self):
+        first = self.broker.publish("dish", {"pk": 1})
+        for pk in range(2, 6):
+            last = self.broker.publish("dish", {"pk": pk})
+
+        future = str(int(last.id) + 1)
+        for last_id in (first.id, "1", future, "junk"):
+            with self.subTest(last_id=last_id):
+                [(name, event_id, _)] = parse(
+                    self.broker.replay(last_id=last_id)
+                )
+                self.assertEqual((name, event_id), ("reset", last.id))
+
+    async def test_stream_pushes_events_from_other_threads(self):
+        stream = self.broker.stream(["dish"], keepalive=0.05)
+        self.assertTrue((await anext(stream)).startswith("retry:"))
+        self.assertIn("event: hello", await anext(stream))
+
+        publisher = threading.Thread(
+            target=self.broker.publish,
+            args=("dish", {"pk": 7}),
+        )
+        publisher.start()
+        publisher.join()
+
+        self.assertIn('"pk":7', await anext(stream))
+        self.assertEqual(await anext(stream), ": keepalive\n\n")
+        await stream.aclose()
+        self.assertFalse(self.broker.subscriptions)
+
+    def test_workers_share_ids_and_log(self):
+        other = events.Broker(size=3)
+        first = self.broker.publish("dish", {"pk": 1})
+        second = other.publish("dish", {"pk": 2})
+
+        self.assertEqual(int(second.id), int(first.id) + 1)
+        self.assertEqual(
+            parse(self.broker.replay(last_id=first.id)),
+            [("dish", second.id, {"pk": 2})]
+        )
+
+    async def test_stream_reads_events_of_other_workers(self):
+        other = events.Broker(size=3)
+        stream = self.broker.stream(["dish"], keepalive=0.05)
+        await anext(stream)
+        await anext(stream)
+
+        await asyncio.to_thread(other.publish, "dish", {"pk": 8})
+
+        self.assertIn('"pk":8', await anext(stream))
+        await stream.aclose()
+
+    async def test_stream_too_far_behind_is_reset(self):
+        stream = self.broker.stream(keepalive=0.05)
+        await anext(stream)
+        await anext(stream)
+        for pk in range(5):
+            await asyncio.to_thread(self.broker.publish, "dish", {"pk": pk})
+
+        self.assertIn("event: reset", await anext(stream))
+        await stream.aclose()
+
+
+class EventSignalsTest(TestCase):
+    def setUp(self):
+        self.broker = events.broker
+        self.start = str(self.broker.counter.current())
+        self.cook = get_user_model().objects.create_user(
+            username="cook",
+            password="test1234",
+        )
+        self.dish_type = DishType.objects.create(name="Pasta")
+
+    def published(self):
+        return [
+            (name, data)
+            for name, _, data in parse(self.broker.replay(
+                last_id=self.start
+            ))
+        ]
+
+    def test_committed_writes_are_published(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            dish = Dish.objects.create(
+                name="Pesto",
+                description="test_description",
+                price=10,
+                type=self.dish_type,
+            )
+            dish.cooks.add(self.cook)
+        pk = dish.pk
+        with self.captureOnCommitCallbacks(execute=True):
+            dish.delete()
+
+        self.assertEqual(self.published()[-4:], [
+            ("dish", {
+                "action": "saved",
+                "pk": pk,
+                "name": "Pesto",
+                "price": "10",
+                "type_id": self.dish_type.pk,
+            }),
+            ("dish", {"action": "changed", "pks": [pk]}),
+            ("cook", {"action": "changed", "pks": [self.cook.pk]}),
+            ("dish", {"action": "deleted", "pk": pk}),
+        ])
+
+    def test_nothing_is_published_before_commit_or_on_login(self):
+        self.start = str(self.broker.counter.current())
+        self.dish_type.dishes.create(
+            name="Pesto",
+            description="test_description",
+            price=10,
+        )
+        self.client.login(username="cook", password="test1234")
+
+        self.assertEqual(self.published(), [])
+
+    def test_bulk_changes_reset_screens(self):
+        self.start = str(self.broker.counter.current())
+        with self.captureOnCommitCallbacks(execute=True):
+            catalog_bulk_changed.send(sender=Dish, pks=None)
+
+        self.assertEqual(self.published(), [("dish", {"action": "reset"})])
+
+
+class LiveEventsViewTest(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            username="test",
+            password="test1234",
+        )
+
+    def test_login_required(self):
+        response = self.client.get(EVENTS_URL)
+
+        self.assertNotEqual(response.status_code, 200)
+
+    def test_sync_view_replays_from_last_event_id(self):
+        self.client.force_login(self.user)
+        seen = events.publish("cook", {"pk": 1})
+        missed = events.publish("dish", {"pk": 2})
+        events.publish("cook", {"pk": 3})
+
+        response = self.client.get(
+            EVENTS_URL,
+            {"topic": "dish"},
+            headers={"last-event-id": seen.id},
+        )
+
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        self.assertEqual(response["Cache-Control"], "no-cache")
+        self.assertEqual(
+            parse(response.content.decode()),
+            [("dish", missed.id, {"pk": 2})]
+        )
+
+    async def test_async_view_streams_live(self):
+        seen = await asyncio.to_thread(events.publish, "dish", {"pk": 1})
+        request = RequestFactory().get(
+            EVENTS_URL,
+            headers={"last-event-id": seen.id},
+        )
+        request.user = self.user
+
+        async def auser():
+            return self.user
+
+        request.auser = auser
+
+        response = await async_views.live_events(request)
+        stream = aiter(response.streaming_content)
+        await anext(stream)
+        await asyncio.to_thread(events.publish, "dish", {"pk": 2})
+
+        self.assertIn(b'"pk":2', await anext(stream))
+        await stream.aclose()
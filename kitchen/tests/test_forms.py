@@ -1,3 +1,4 @@
+from django.db.models.signals import m2m_changed
 from django.test import TestCase
 
 from kitchen.forms import (
@@ -9,7 +10,7 @@ from kitchen.forms import (
     DishForm,
     DishSearchForm,
 )
-from kitchen.models import DishType, Cook, Ingredient
+from kitchen.models import Dish, DishType, Cook, Ingredient
 
 
 class CookFormTest(TestCase):
@@ -161,3 +162,130 @@ class DishFormTest(TestCase):
             form.fields["name"].widget.attrs["placeholder"],
             "Search by name"
         )
+
+
+class DishFormPickerTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.ingredients = [
+            Ingredient.objects.create(name=f"Ingredient_{index}")
+            for index in range(30)
+        ]
+
+    def test_picker_renders_only_selected_options(self):
+        selected = self.ingredients[:2]
+        form = DishForm(initial={"ingredients": [obj.pk for obj in selected]})
+
+        html = str(form["ingredients"])
+
+        self.assertEqual(html.count("<option"), 2)
+        self.assertIn("Ingredient_0", html)
+        self.assertNotIn("Ingredient_29", html)
+        self.assertIn(
+            'data-autocomplete-url="/autocomplete/ingredients/"',
+            html
+        )
+
+    def test_picker_validates_submitted_pks_in_one_query(self):
+        form = DishForm()
+        field = form.fields["ingredients"]
+        pks = [str(obj.pk) for obj in self.ingredients[:5]]
+
+        with self.assertNumQueries(1):
+            cleaned = field.clean(pks)
+
+        self.assertEqual(len(cleaned), 5)
+
+
+class DishFormSaveTest(TestCase):
+    def setUp(self):
+        self.dish_type = DishType.objects.create(name="Test type")
+        self.mario, self.luigi = (
+            Cook.objects.create_user(username=username, password="test1234")
+            for username in ("mario", "luigi")
+        )
+        self.basil, self.garlic = (
+            Ingredient.objects.create(name=name)
+            for name in ("Basil", "Garlic")
+        )
+        self.dish = Dish.objects.create(
+            name="Pesto",
+            description="Test description",
+            price=10,
+            type=self.dish_type,
+        )
+        self.dish.cooks.set([self.mario])
+        self.dish.ingredients.set([self.basil])
+        self.actions = []
+        m2m_changed.connect(self.record)
+        self.addCleanup(m2m_changed.disconnect, self.record)
+
+    def record(self, sender, action, pk_set, **kwargs):
+        self.actions.append((sender, action, pk_set and sorted(pk_set)))
+
+    def form(self, cooks, ingredients, instance=None):
+        form = DishForm(
+            data={
+                "name": "Pesto",
+                "description": "Test description",
+                "price": 10,
+                "type": self.dish_type.pk,
+                "cooks": [cook.pk for cook in cooks],
+                "ingredients": [obj.pk for obj in ingredients],
+            },
+            instance=instance or self.dish,
+        )
+        self.assertTrue(form.is_valid(), form.errors)
+        form.save(commit=False).save()
+        self.actions.clear()
+        return form
+
+    def test_untouched_relations_cost_one_read_each(self):
+        form = self.form([self.mario], [self.basil])
+
+        with self.assertNumQueries(2):
+            form.save_m2m()
+
+        self.assertEqual(self.actions, [])
+
+    def test_changes_are_written_as_one_diff_per_relation(self):
+        form = self.form([self.luigi], [self.basil, self.garlic])
+
+        # Per relation: the links, then one DELETE and one INSERT of the
+        # difference, each with the two count shifts of its signal (the
+        # count of removals re-reads the links to remove).
+        with self.assertNumQueries(12):
+            form.save_m2m()
+
+        cooks, ingredients = Dish.cooks.through, Dish.ingredients.through
+        self.assertEqual(self.actions, [
+            (cooks, "pre_remove", [self.mario.pk]),
+            (cooks, "post_remove", [self.mario.pk]),
+            (cooks, "pre_add", [self.luigi.pk]),
+            (cooks, "post_add", [self.luigi.pk]),
+            (ingredients, "pre_add", [self.garlic.pk]),
+            (ingredients, "post_add", [self.garlic.pk]),
+        ])
+        self.assertEqual(list(self.dish.cooks.all()), [self.luigi])
+        self.assertEqual(
+            Cook.objects.get(pk=self.mario.pk).dish_count,
+            0,
+        )
+        self.assertEqual(
+            Dish.objects.get(pk=self.dish.pk).ingredient_count,
+            2,
+        )
+
+    def test_new_dish_skips_reading_links(self):
+        form = self.form([self.mario], [self.garlic], instance=Dish())
+
+        # Per relation: the INSERT and the two count shifts.
+        with self.assertNumQueries(6):
+            form.save_m2m()
+
+        self.assertEqual(self.actions, [
+            (Dish.cooks.through, "pre_add", [self.mario.pk]),
+            (Dish.cooks.through, "post_add", [self.mario.pk]),
+            (Dish.ingredients.through, "pre_add", [self.garlic.pk]),
+            (Dish.ingredients.through, "post_add", [self.garlic.pk]),
+        ])
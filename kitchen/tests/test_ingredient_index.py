@@ -0,0 +1,204 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from kitchen import ingredient_index
+from kitchen.models import Dish, DishType, Ingredient
+from kitchen.signals import catalog_bulk_changed
+
+SEARCH_URL = reverse("kitchen:dish-ingredient-search")
+
+
+class IdsArrayTest(TestCase):
+    def test_sorted_without_duplicates(self):
+        array = ingredient_index.ids_array([200, 3, 0, 3, 10 ** 12])
+
+        self.assertEqual(array.tolist(), [0, 3, 200, 10 ** 12])
+        self.assertEqual(ingredient_index.ids_array([]).tolist(), [])
+
+
+class IngredientIndexTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        dish_type = DishType.objects.create(name="Pasta")
+        self.garlic, self.basil, self.nuts, self.egg = (
+            Ingredient.objects.create(name=name)
+            for name in ("Garlic", "Basil", "Nuts", "Egg")
+        )
+        self.dishes = {}
+        for name, ingredients in (
+            ("Pesto", [self.garlic, self.basil, self.nuts]),
+            ("Aglio", [self.garlic, self.basil]),
+            ("Carbonara", [self.egg]),
+            ("Plain", []),
+        ):
+            dish = Dish.objects.create(
+                name=name,
+                description="test_description",
+                price=10,
+                type=dish_type,
+            )
+            dish.ingredients.set(ingredients)
+            self.dishes[name] = dish
+
+    def names(self, **criteria):
+        pks = ingredient_index.search(**{
+            key: [ingredient.pk for ingredient in value]
+            for key, value in criteria.items()
+        })
+        return sorted(Dish.objects.filter(pk__in=pks).values_list(
+            "name", flat=True
+        ))
+
+    def test_all_any_and_none_of(self):
+        self.assertEqual(
+            self.names(include=[self.garlic, self.basil], exclude=[self.nuts]),
+            ["Aglio"]
+        )
+        self.assertEqual(
+            self.names(any_of=[self.nuts, self.egg]),
+            ["Carbonara", "Pesto"]
+        )
+        self.assertEqual(
+            self.names(exclude=[self.garlic]),
+            ["Carbonara", "Plain"]
+        )
+        self.assertEqual(len(self.names()), 4)
+
+    def test_query_runs_without_database_once_built(self):
+        ingredient_index.search()
+
+        with self.assertNumQueries(0):
+            ingredient_index.search(include=[self.garlic.pk])
+
+    def test_committed_writes_patch_the_index_in_place(self):
+        ingredient_index.search()
+        aglio = self.dishes["Aglio"]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            aglio.ingredients.add(self.nuts)
+            self.egg.dishes.add(self.dishes["Plain"])
+            self.dishes["Pesto"].ingredients.remove(self.garlic)
+            self.dishes["Carbonara"].delete()
+
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                ingredient_index.search(include=[self.nuts.pk]),
+                sorted([aglio.pk, self.dishes["Pesto"].pk])
+            )
+        self.assertEqual(self.names(include=[self.garlic]), ["Aglio"])
+        self.assertEqual(self.names(include=[self.egg]), ["Plain"])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            aglio.ingredients.clear()
+        self.assertEqual(self.names(include=[self.basil]), ["Pesto"])
+
+    def test_write_by_another_worker_is_applied_as_a_delta(self):
+        other = ingredient_index.IngredientIndex()
+        other.search()
+        ingredient_index.search()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.dishes["Plain"].ingredients.add(self.nuts)
+            self.dishes["Pesto"].delete()
+
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                other.search(include=[self.nuts.pk]),
+                [self.dishes["Plain"].pk]
+            )
+            self.assertEqual(len(other.search()), 3)
+
+    def test_missing_delta_triggers_rebuild(self):
+        other = ingredient_index.IngredientIndex()
+        other.search()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.dishes["Plain"].ingredients.add(self.nuts)
+        cache.delete(ingredient_index.DELTA_KEY.format(
+            ingredient_index.counter.current()
+        ))
+        Dish.ingredients.through.objects.create(
+            dish=self.dishes["Carbonara"],
+            ingredient=self.nuts,
+        )
+
+        self.assertEqual(
+            len(other.search(include=[self.nuts.pk])),
+            3
+        )
+
+    def test_write_by_another_worker_triggers_rebuild(self):
+        ingredient_index.search()
+        # Another worker committed a change this one has not seen.
+        ingredient_index.counter.next()
+        Dish.ingredients.through.objects.create(
+            dish=self.dishes["Plain"],
+            ingredient=self.nuts,
+        )
+
+        self.assertEqual(
+            self.names(include=[self.nuts]),
+            ["Pesto", "Plain"]
+        )
+
+    def test_bulk_change_invalidates(self):
+        ingredient_index.search()
+        Dish.ingredients.through.objects.filter(
+            ingredient=self.garlic
+        ).delete()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            catalog_bulk_changed.send(sender=Ingredient, pks=None)
+
+        self.assertEqual(self.names(include=[self.garlic]), [])
+
+
+class DishIngredientSearchViewTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(
+            username="test",
+            password="test1234",
+        )
+        self.client.force_login(self.user)
+        dish_type = DishType.objects.create(name="Pasta")
+        self.basil = Ingredient.objects.create(name="Basil")
+        self.nuts = Ingredient.objects.create(name="Nuts")
+        for index in range(12):
+            dish = Dish.objects.create(
+                name=f"Dish {index:02}",
+                description="test_description",
+                price=10,
+                type=dish_type,
+            )
+            dish.ingredients.add(self.basil)
+            if index % 2:
+                dish.ingredients.add(self.nuts)
+
+    def test_login_required(self):
+        self.client.logout()
+
+        response = self.client.get(SEARCH_URL)
+
+        self.assertNotEqual(response.status_code, 200)
+
+    def test_pages_through_matches(self):
+        params = {"include": [self.basil.pk], "exclude": [self.nuts.pk]}
+
+        response = self.client.get(SEARCH_URL, params)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["paginator"].count, 6)
+        self.assertEqual(
+            [dish.name for dish in response.context["dish_list"]],
+            [f"Dish {index:02}" for index in range(0, 12, 2)]
+        )
+        self.assertContains(response, "Basil")
+
+    def test_page_loads_only_its_dishes(self):
+        response = self.client.get(SEARCH_URL, {"include": [self.basil.pk]})
+
+        self.assertEqual(len(response.context["dish_list"]), 10)
+        self.assertTrue(response.context["is_paginated"])
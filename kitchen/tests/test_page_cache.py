@@ -0,0 +1,149 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from kitchen import page_cache
+from kitchen.models import Cook, Dish, DishType, Ingredient
+from kitchen.signals import catalog_bulk_changed
+
+DISH_LIST_URL = reverse("kitchen:dish-list")
+
+
+class PageCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(
+            username="test",
+            password="test1234",
+        )
+        self.client.force_login(self.user)
+        self.dish_type = DishType.objects.create(name="Pasta")
+        self.basil = Ingredient.objects.create(name="Basil")
+        self.cook = get_user_model().objects.create_user(
+            username="mario",
+            password="test1234",
+        )
+        self.dish = Dish.objects.create(
+            name="Pesto",
+            description="test_description",
+            price=10,
+            type=self.dish_type,
+        )
+        self.dish.ingredients.add(self.basil)
+        self.dish.cooks.add(self.cook)
+        self.dish_url = reverse(
+            "kitchen:dish-detail",
+            kwargs={"pk": self.dish.pk}
+        )
+        self.cook_url = reverse(
+            "kitchen:cook-detail",
+            kwargs={"pk": self.cook.pk}
+        )
+
+    def test_second_request_is_served_from_cache(self):
+        for url in (self.dish_url, self.cook_url, DISH_LIST_URL):
+            first = self.client.get(url)
+
+            # session, user
+            with self.assertNumQueries(2):
+                second = self.client.get(url)
+            self.assertEqual(second.status_code, 200)
+            self.assertEqual(second.content, first.content)
+
+    def test_key_includes_search_and_page(self):
+        self.client.get(DISH_LIST_URL)
+
+        # session, user, dishes
+        with self.assertNumQueries(3):
+            self.client.get(DISH_LIST_URL, {"name": "pe"})
+
+    def test_key_includes_user(self):
+        self.client.get(self.dish_url)
+        self.client.force_login(self.cook)
+
+        # session, user, dish, ingredients, cooks, similar dishes
+        with self.assertNumQueries(6):
+            self.client.get(self.dish_url)
+
+    def test_ingredient_edit_invalidates_dishes_listing_it(self):
+        self.client.get(self.dish_url)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.basil.name = "Thai basil"
+            self.basil.save()
+
+        self.assertContains(self.client.get(self.dish_url), "Thai basil")
+
+    def test_cook_edit_invalidates_their_dishes(self):
+        self.client.get(self.dish_url)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.cook.username = "luigi"
+            self.cook.save()
+
+        self.assertContains(self.client.get(self.dish_url), "luigi")
+
+    def test_dish_edits_invalidate_cook_pages(self):
+        self.client.get(self.cook_url)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.dish.name = "Green pesto"
+            self.dish.save()
+        self.assertContains(self.client.get(self.cook_url), "Green pesto")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.cook.dishes.clear()
+        self.assertNotContains(self.client.get(self.cook_url), "pesto")
+
+    def test_dish_type_edit_invalidates_dish_pages_and_list(self):
+        self.client.get(self.dish_url)
+        self.client.get(DISH_LIST_URL)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.dish_type.name = "Noodles"
+            self.dish_type.save()
+
+        self.assertContains(self.client.get(self.dish_url), "Noodles")
+        self.assertContains(self.client.get(DISH_LIST_URL), "Noodles")
+
+    def test_unrelated_edit_keeps_page(self):
+        self.client.get(self.dish_url)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Ingredient.objects.create(name="Garlic")
+
+        with self.assertNumQueries(2):
+            self.client.get(self.dish_url)
+
+    def test_bulk_change_without_pks_invalidates_everything(self):
+        self.client.get(self.dish_url)
+        Ingredient.objects.update(name="Oregano")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            catalog_bulk_changed.send(sender=Ingredient, pks=None)
+
+        self.assertContains(self.client.get(self.dish_url), "Oregano")
+
+
+class DependentTagsTest(TestCase):
+    def test_fans_out_through_the_dependency_graph(self):
+        dish_type = DishType.objects.create(name="Pasta")
+        cook = Cook.objects.create_user(username="mario", password="x")
+        dish = Dish.objects.create(
+            name="Pesto",
+            description="test_description",
+            price=10,
+            type=dish_type,
+        )
+        dish.cooks.add(cook)
+
+        self.assertEqual(
+            page_cache.dependent_tags(DishType, [dish_type.pk]),
+            {
+                "dishtype:list",
+                f"dishtype:{dish_type.pk}",
+                f"dish:{dish.pk}",
+                f"cook:{cook.pk}",
+            }
+        )
@@ -0,0 +1,139 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from kitchen.models import Dish, DishType, Ingredient
+from kitchen.pagination import (
+    FORWARD,
+    InvalidCursor,
+    KeysetPaginator,
+    encode_cursor,
+)
+
+INGREDIENT_LIST_URL = reverse("kitchen:ingredient-list")
+DISH_LIST_URL = reverse("kitchen:dish-list")
+
+
+class KeysetPaginatorTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        # Duplicate names force the pk tiebreaker to be used.
+        for index in range(25):
+            DishType.objects.create(name=f"Type_{index // 2:02d}")
+
+    def test_ordering_uses_meta_ordering_with_pk_tiebreaker(self):
+        paginator = KeysetPaginator(DishType.objects.all(), 10)
+
+        self.assertEqual(paginator.ordering, ("name", "pk"))
+
+    def test_pages_forward_and_backward(self):
+        paginator = KeysetPaginator(DishType.objects.all(), 10)
+        expected = list(DishType.objects.order_by("name", "pk"))
+
+        first = paginator.page()
+        second = paginator.page(first.next_cursor)
+        third = paginator.page(second.next_cursor)
+        back = paginator.page(third.previous_cursor)
+
+        self.assertEqual(list(first), expected[:10])
+        self.assertEqual(list(second), expected[10:20])
+        self.assertEqual(list(third), expected[20:])
+        self.assertEqual(list(back), expected[10:20])
+        self.assertFalse(first.has_previous())
+        self.assertFalse(third.has_next())
+        self.assertTrue(back.has_previous())
+
+    def test_page_runs_single_query_without_count(self):
+        paginator = KeysetPaginator(DishType.objects.all(), 10)
+        cursor = paginator.page().next_cursor
+
+        with CaptureQueriesContext(connection) as queries:
+            paginator.page(cursor)
+
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn("COUNT(", queries[0]["sql"].upper())
+
+    def test_invalid_cursor(self):
+        paginator = KeysetPaginator(DishType.objects.all(), 10)
+
+        with self.assertRaises(InvalidCursor):
+            paginator.page("not-a-cursor")
+
+    def test_cursor_values_must_parse_as_the_ordering_fields(self):
+        paginator = KeysetPaginator(DishType.objects.all(), 10)
+
+        for values in (["a", "xyz"], ["a", 10 ** 30], ["a", None], [1]):
+            with self.subTest(values=values):
+                with self.assertRaises(InvalidCursor):
+                    paginator.page(
+                        encode_cursor(FORWARD, values, paginator.key)
+                    )
+
+    def test_cursor_of_another_ordering_is_rejected(self):
+        by_name = KeysetPaginator(DishType.objects.all(), 10)
+        by_count = KeysetPaginator(
+            DishType.objects.order_by("-dish_count", "id"),
+            10,
+        )
+        cursor = by_count.page().next_cursor
+
+        with self.assertRaises(InvalidCursor):
+            by_name.page(cursor)
+
+
+class KeysetListViewTest(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            username="test",
+            password="test1234",
+        )
+        self.client.force_login(self.user)
+        for index in range(15):
+            Ingredient.objects.create(name=f"Ingredient_{index:02d}")
+
+    def test_ingredient_list_cursor_pagination(self):
+        response = self.client.get(INGREDIENT_LIST_URL)
+        page_obj = response.context["page_obj"]
+
+        self.assertTrue(response.context["is_paginated"])
+        self.assertEqual(len(response.context["ingredient_list"]), 10)
+
+        response = self.client.get(
+            INGREDIENT_LIST_URL,
+            {"cursor": page_obj.next_cursor}
+        )
+
+        self.assertEqual(
+            list(response.context["ingredient_list"]),
+            list(Ingredient.objects.all()[10:])
+        )
+
+    def test_ingredient_list_invalid_cursor(self):
+        response = self.client.get(INGREDIENT_LIST_URL, {"cursor": "bogus"})
+
+        self.assertEqual(response.status_code, 404)
+
+    def test_dish_list_rejects_crafted_and_foreign_cursors(self):
+        dish_type = DishType.objects.create(name="Pasta")
+        for index in range(15):
+            Dish.objects.create(
+                name=f"Dish_{index:02d}",
+                description="test_description",
+                price=index,
+                type=dish_type,
+            )
+        by_price = self.client.get(DISH_LIST_URL, {"sort": "price"})
+        price_cursor = by_price.context["page_obj"].next_cursor
+        crafted = encode_cursor(
+            FORWARD,
+            ["a", "xyz"],
+            KeysetPaginator(Dish.objects.all(), 10).key,
+        )
+
+        for cursor in (crafted, price_cursor):
+            with self.subTest(cursor=cursor):
+                response = self.client.get(DISH_LIST_URL, {"cursor": cursor})
+
+                self.assertEqual(response.status_code, 404)
@@ -0,0 +1,217 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from kitchen import relation_counts
+from kitchen.models import Cook, Dish, DishType, Ingredient
+
+COOK_LIST_URL = reverse("kitchen:cook-list")
+DISH_LIST_URL = reverse("kitchen:dish-list")
+
+
+class RelationCountsTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.pasta = DishType.objects.create(name="Pasta")
+        self.soup = DishType.objects.create(name="Soup")
+        self.basil = Ingredient.objects.create(name="Basil")
+        self.garlic = Ingredient.objects.create(name="Garlic")
+        self.mario = Cook.objects.create(username="mario")
+        self.luigi = Cook.objects.create(username="luigi")
+        self.dish = Dish.objects.create(
+            name="Pesto",
+            description="test_description",
+            price=10,
+            type=self.pasta,
+        )
+
+    def counts(self):
+        return {
+            "dish_cooks": Dish.objects.get(pk=self.dish.pk).cook_count,
+            "dish_ingredients": Dish.objects.get(
+                pk=self.dish.pk
+            ).ingredient_count,
+            "mario": Cook.objects.get(pk=self.mario.pk).dish_count,
+            "luigi": Cook.objects.get(pk=self.luigi.pk).dish_count,
+            "basil": Ingredient.objects.get(pk=self.basil.pk).dish_count,
+            "garlic": Ingredient.objects.get(pk=self.garlic.pk).dish_count,
+            "pasta": DishType.objects.get(pk=self.pasta.pk).dish_count,
+            "soup": DishType.objects.get(pk=self.soup.pk).dish_count,
+        }
+
+    def test_add_and_remove_shift_both_sides(self):
+        self.dish.cooks.add(self.mario, self.luigi)
+        self.dish.cooks.add(self.mario)
+        self.basil.dishes.add(self.dish)
+        self.dish.cooks.remove(self.luigi)
+        # Removing a cook who is not linked changes nothing.
+        self.dish.cooks.remove(self.luigi)
+
+        self.assertEqual(self.counts(), {
+            "dish_cooks": 1,
+            "dish_ingredients": 1,
+            "mario": 1,
+            "luigi": 0,
+            "basil": 1,
+            "garlic": 0,
+            "pasta": 1,
+            "soup": 0,
+        })
+
+    def test_clear_and_set(self):
+        self.dish.ingredients.add(self.basil, self.garlic)
+        self.mario.dishes.add(self.dish)
+
+        self.dish.ingredients.set([self.garlic])
+        self.mario.dishes.clear()
+
+        counts = self.counts()
+        self.assertEqual(counts["dish_ingredients"], 1)
+        self.assertEqual((counts["basil"], counts["garlic"]), (0, 1))
+        self.assertEqual((counts["dish_cooks"], counts["mario"]), (0, 0))
+
+    def test_type_change_moves_dish_count(self):
+        dish = Dish.objects.get(pk=self.dish.pk)
+        dish.type = self.soup
+        dish.save()
+        dish.name = "Minestrone"
+        dish.save()
+
+        counts = self.counts()
+        self.assertEqual((counts["pasta"], counts["soup"]), (0, 1))
+
+    def test_save_keeps_counts_shifted_meanwhile(self):
+        stale = Dish.objects.get(pk=self.dish.pk)
+        self.dish.cooks.add(self.mario)
+
+        stale.price = 12
+        stale.save()
+
+        self.assertEqual(self.counts()["dish_cooks"], 1)
+
+    def test_deletes_decrement_related_counts(self):
+        other = Dish.objects.create(
+            name="Carbonara",
+            description="test_description",
+            price=12,
+            type=self.pasta,
+        )
+        other.cooks.add(self.mario)
+        other.ingredients.add(self.basil)
+        self.dish.cooks.add(self.mario, self.luigi)
+        self.dish.ingredients.add(self.basil)
+
+        other.delete()
+        self.luigi.delete()
+        self.basil.delete()
+
+        dish = Dish.objects.get(pk=self.dish.pk)
+        self.assertEqual((dish.cook_count, dish.ingredient_count), (1, 0))
+        self.assertEqual(Cook.objects.get(pk=self.mario.pk).dish_count, 1)
+        self.assertEqual(DishType.objects.get(pk=self.pasta.pk).dish_count, 1)
+
+    def test_repair_fixes_only_drifted_rows(self):
+        self.dish.cooks.add(self.mario)
+        Cook.objects.filter(pk=self.mario.pk).update(dish_count=7)
+        Dish.cooks.through.objects.create(dish=self.dish, cook=self.luigi)
+
+        fixed = relation_counts.repair()
+
+        self.assertEqual(fixed[Cook, Dish], 2)
+        self.assertEqual(fixed[Dish, Cook], 1)
+        self.assertEqual(fixed[DishType, Dish], 0)
+        counts = self.counts()
+        self.assertEqual(
+            (counts["dish_cooks"], counts["mario"], counts["luigi"]),
+            (2, 1, 1)
+        )
+
+    def test_repair_limited_to_rows(self):
+        Cook.objects.filter(pk__in=[self.mario.pk, self.luigi.pk]).update(
+            dish_count=7
+        )
+
+        fixed = relation_counts.repair(
+            [(Cook, Dish)],
+            {Cook: [self.mario.pk]},
+        )
+
+        self.assertEqual(fixed, {(Cook, Dish): 1})
+        counts = self.counts()
+        self.assertEqual((counts["mario"], counts["luigi"]), (0, 7))
+
+    def test_link_changes_affect_only_their_relation(self):
+        self.assertEqual(
+            relation_counts.affected_keys(Dish, ("cooks", )),
+            [(Dish, Cook), (Cook, Dish)],
+        )
+        self.assertEqual(relation_counts.affected_keys(Dish, ("price", )), [])
+
+    def test_repair_command_reports_fixes(self):
+        DishType.objects.filter(pk=self.pasta.pk).update(dish_count=3)
+        out = StringIO()
+
+        call_command("repair_relation_counts", stdout=out)
+
+        self.assertIn("DishType.dish_count: 1 fixed", out.getvalue())
+        self.assertEqual(self.counts()["pasta"], 1)
+
+
+class RelationCountSortTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(
+            username="test",
+            password="test1234",
+        )
+        self.client.force_login(self.user)
+        dish_type = DishType.objects.create(name="Pasta")
+        for index, name in enumerate(("Arrabbiata", "Bolognese", "Carbonara")):
+            dish = Dish.objects.create(
+                name=name,
+                description="test_description",
+                price=10,
+                type=dish_type,
+            )
+            cooks = [
+                Cook.objects.create(username=f"{name}-{count}")
+                for count in range(index)
+            ]
+            dish.cooks.add(*cooks)
+        self.user.dishes.add(Dish.objects.get(name="Arrabbiata"))
+
+    def test_dishes_sort_by_cook_count_without_join(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(DISH_LIST_URL, {"sort": "cooks"})
+
+        self.assertEqual(
+            [dish.name for dish in response.context["dish_list"]],
+            ["Carbonara", "Arrabbiata", "Bolognese"]
+        )
+        self.assertEqual(response.context["current_sort"], "cooks")
+        for query in queries:
+            self.assertNotIn("kitchen_dish_cooks", query["sql"])
+
+    def test_cooks_sort_by_dish_count(self):
+        response = self.client.get(COOK_LIST_URL, {"sort": "dishes"})
+
+        cooks = list(response.context["cook_list"])
+        self.assertEqual(cooks[0].username, "Bolognese-0")
+        self.assertEqual(
+            [cook.dish_count for cook in cooks],
+            sorted((cook.dish_count for cook in cooks), reverse=True)
+        )
+        self.assertContains(response, "sort=dishes")
+
+    def test_unknown_sort_keeps_default_ordering(self):
+        response = self.client.get(COOK_LIST_URL, {"sort": "password"})
+
+        self.assertIsNone(response.context["current_sort"])
+        usernames = [cook.username for cook in response.context["cook_list"]]
+        self.assertEqual(usernames, sorted(usernames))
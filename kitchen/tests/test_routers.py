@@ -0,0 +1,138 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.contrib.sessions.models import Session
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+
+from kitchen import routers, versions
+from kitchen.middleware import PrimaryPinningMiddleware
+from kitchen.models import Dish, DishType, Ingredient
+
+COOKIE = PrimaryPinningMiddleware.cookie_name
+
+
+@override_settings(KITCHEN_REPLICA_DATABASE="replica")
+class PrimaryReplicaRouterTest(TestCase):
+    def setUp(self):
+        self.router = routers.PrimaryReplicaRouter()
+
+    def test_kitchen_reads_go_to_replica(self):
+        with routers.routing_context():
+            self.assertEqual(self.router.db_for_read(Dish), "replica")
+            self.assertIsNone(self.router.db_for_read(Session))
+
+    def test_write_pins_the_rest_of_the_request(self):
+        with routers.routing_context() as state:
+            self.assertEqual(self.router.db_for_write(Dish), "default")
+            self.assertEqual(self.router.db_for_read(Dish), "default")
+        self.assertTrue(state.written)
+
+    def test_pinned_request_reads_primary(self):
+        with routers.routing_context(pinned=True):
+            self.assertEqual(self.router.db_for_read(Dish), "default")
+
+    def test_migrations_only_run_on_primary(self):
+        self.assertFalse(self.router.allow_migrate("replica", "kitchen"))
+        self.assertIsNone(self.router.allow_migrate("default", "kitchen"))
+
+    @override_settings(KITCHEN_REPLICA_DATABASE=None)
+    def test_without_replica_defers_to_default_routing(self):
+        with routers.routing_context():
+            self.assertIsNone(self.router.db_for_read(Dish))
+
+
+@override_settings(KITCHEN_REPLICA_DATABASE="replica", KITCHEN_REPLICA_LAG=5)
+class PrimaryPinningMiddlewareTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        # No kitchen write within the replica lag.
+        for model in versions.VERSIONED_MODELS:
+            cache.set(versions.cache_key(model), time.time() - 60)
+        self.factory = RequestFactory()
+        self.seen = []
+        self.writes = False
+
+    def view(self, request):
+        if self.writes:
+            routers.PrimaryReplicaRouter().db_for_write(Dish)
+        self.seen.append(routers.current_state().pinned)
+        return HttpResponse()
+
+    def call(self, request):
+        return PrimaryPinningMiddleware(self.view)(request)
+
+    def test_plain_read_uses_replica(self):
+        response = self.call(self.factory.get("/"))
+
+        self.assertEqual(self.seen, [False])
+        self.assertNotIn(COOKIE, response.cookies)
+
+    def test_write_sets_short_lived_cookie(self):
+        self.writes = True
+
+        response = self.call(self.factory.post("/"))
+
+        self.assertEqual(response.cookies[COOKIE]["max-age"], 5)
+
+    def test_cookie_post_and_recent_write_pin_to_primary(self):
+        with_cookie = self.factory.get("/")
+        with_cookie.COOKIES[COOKIE] = "1"
+
+        self.call(with_cookie)
+        self.call(self.factory.post("/"))
+        versions.bump(Dish)
+        self.call(self.factory.get("/"))
+
+        self.assertEqual(self.seen, [True, True, True])
+
+    async def test_async_requests(self):
+        async def view(request):
+            return self.view(request)
+
+        self.writes = True
+        response = await PrimaryPinningMiddleware(view)(self.factory.get("/"))
+
+        self.assertEqual(self.seen, [True])
+        self.assertIn(COOKIE, response.cookies)
+
+    @override_settings(KITCHEN_REPLICA_DATABASE=None)
+    def test_inactive_without_replica(self):
+        self.writes = True
+
+        response = self.call(self.factory.post("/"))
+
+        self.assertNotIn(COOKIE, response.cookies)
+
+
+@override_settings(KITCHEN_REPLICA_DATABASE="default")
+class ReadAfterWriteTest(TestCase):
+    def test_create_redirect_sticks_to_primary(self):
+        user = get_user_model().objects.create_user(
+            username="test",
+            password="test1234",
+        )
+        self.client.force_login(user)
+        dish_type = DishType.objects.create(name="Pasta")
+        basil = Ingredient.objects.create(name="Basil")
+
+        response = self.client.post(
+            reverse("kitchen:dish-create"),
+            {
+                "name": "Pesto",
+                "description": "test_description",
+                "price": 10,
+                "type": dish_type.pk,
+                "cooks": [user.pk],
+                "ingredients": [basil.pk],
+            }
+        )
+
+        self.assertRedirects(
+            response,
+            reverse("kitchen:dish-list"),
+            fetch_redirect_response=False,
+        )
+        self.assertIn(COOKIE, response.cookies)
@@ -0,0 +1,195 @@
+import io
+import json
+import tempfile
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from kitchen import scheduler
+from kitchen.models import Dish, DishType, Order, OrderItem
+
+
+class SchedulerTest(TestCase):
+    def setUp(self):
+        dish_type = DishType.objects.create(name="Pasta")
+        cooks = get_user_model().objects
+        self.junior = cooks.create_user(
+            username="junior",
+            password="test1234",
+            years_of_experience=0,
+        )
+        self.senior = cooks.create_user(
+            username="senior",
+            password="test1234",
+            years_of_experience=10,
+        )
+        self.pesto, self.carbonara, self.risotto = (
+            Dish.objects.create(
+                name=name,
+                description="test_description",
+                price=10,
+                type=dish_type,
+            )
+            for name in ("Pesto", "Carbonara", "Risotto")
+        )
+        self.pesto.cooks.set([self.junior, self.senior])
+        self.carbonara.cooks.set([self.senior])
+        self.order = Order.objects.create(table="7")
+
+    def queue(self, dish, count=1):
+        return OrderItem.objects.bulk_create(
+            OrderItem(order=self.order, dish=dish) for _ in range(count)
+        )
+
+    def queues(self):
+        return {
+            cook.username: cook.tickets.filter(
+                status=OrderItem.Status.ASSIGNED
+            ).count()
+            for cook in (self.junior, self.senior)
+        }
+
+    def test_items_go_to_qualified_cooks(self):
+        self.queue(self.carbonara, 2)
+
+        self.assertEqual(scheduler.drain(), (2, 2))
+
+        self.assertEqual(self.queues(), {"junior": 0, "senior": 2})
+
+    def test_load_is_balanced_by_depth_and_experience(self):
+        self.queue(self.pesto, 8)
+
+        scheduler.drain()
+
+        # Ten years of experience give the senior cook three times the
+        # capacity of the junior one.
+        self.assertEqual(self.queues(), {"junior": 2, "senior": 6})
+
+    def test_existing_queues_are_taken_into_account(self):
+        self.queue(self.carbonara, 3)
+        scheduler.drain()
+
+        self.queue(self.pesto, 2)
+        scheduler.drain()
+
+        # Without the three queued tickets both would go to the senior.
+        self.assertEqual(self.queues(), {"junior": 1, "senior": 4})
+
+    def test_batch_query_count_does_not_grow(self):
+        self.queue(self.pesto, 5)
+        self.queue(self.carbonara, 5)
+
+        # savepoint, claim, qualified cooks, queue depths, update, release
+        with self.assertNumQueries(6):
+            self.assertEqual(scheduler.assign_batch(), (10, 10))
+
+    def test_batches_claim_oldest_items_first(self):
+        first, second, third = self.queue(self.pesto, 3)
+
+        self.assertEqual(scheduler.assign_batch(batch_size=2), (2, 2))
+
+        self.assertEqual(
+            list(OrderItem.objects.filter(
+                status=OrderItem.Status.QUEUED
+            ).values_list("pk", flat=True)),
+            [third.pk]
+        )
+
+    def test_items_without_cook_are_parked_until_one_is_added(self):
+        item, = self.queue(self.risotto)
+
+        self.assertEqual(scheduler.drain(), (1, 0))
+        item.refresh_from_db()
+        self.assertEqual(item.status, OrderItem.Status.NO_COOK)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.risotto.cooks.add(self.junior)
+        self.assertEqual(scheduler.drain(), (1, 1))
+        item.refresh_from_db()
+        self.assertEqual(item.cook, self.junior)
+
+    def test_completed_items_leave_the_queue(self):
+        items = self.queue(self.carbonara, 2)
+        scheduler.drain()
+
+        self.assertEqual(scheduler.complete([items[0].pk]), 1)
+
+        self.assertEqual(self.queues(), {"junior": 0, "senior": 1})
+
+    def test_deleted_cook_tickets_go_back_to_the_queue(self):
+        items = self.queue(self.pesto, 2)
+        scheduler.drain()
+        self.assertEqual(self.queues(), {"junior": 0, "senior": 2})
+
+        self.senior.delete()
+
+        queued = OrderItem.objects.filter(status=OrderItem.Status.QUEUED)
+        self.assertEqual(
+            list(queued.values_list("cook_id", "assigned_at")),
+            [(None, None), (None, None)]
+        )
+        self.assertEqual(scheduler.drain(), (2, 2))
+        self.assertEqual(
+            set(OrderItem.objects.filter(
+                pk__in=[item.pk for item in items]
+            ).values_list("cook_id", flat=True)),
+            {self.junior.pk}
+        )
+
+
+class OrderCommandsTest(TestCase):
+    def setUp(self):
+        dish_type = DishType.objects.create(name="Pasta")
+        cook = get_user_model().objects.create_user(
+            username="cook",
+            password="test1234",
+        )
+        for index in range(3):
+            dish = Dish.objects.create(
+                name=f"Dish {index}",
+                description="test_description",
+                price=10,
+                type=dish_type,
+            )
+            dish.cooks.add(cook)
+        # A real order that happens to use the benchmark's table name.
+        self.real_order = Order.objects.create(table="benchmark")
+
+    def test_schedule_orders_drains_the_queue(self):
+        order = Order.objects.create()
+        OrderItem.objects.create(order=order, dish=Dish.objects.first())
+        out = io.StringIO()
+
+        call_command("schedule_orders", stdout=out)
+
+        self.assertIn("Assigned 1 of 1", out.getvalue())
+
+    def test_benchmark_reports_throughput_and_cleans_up(self):
+        with tempfile.TemporaryDirectory() as directory:
+            output = Path(directory) / "orders.json"
+            call_command(
+                "benchmark_orders",
+                orders=20,
+                items_per_order=(2, 2),
+                batch_size=16,
+                output=str(output),
+                stdout=io.StringIO(),
+            )
+            report = json.loads(output.read_text())
+
+        result = report["results"]
+        self.assertEqual(result["tickets"], 40)
+        self.assertEqual(result["assigned"], 40)
+        self.assertEqual(result["batches"], 3)
+        self.assertGreater(result["tickets_per_s"], 0)
+        self.assertEqual(list(Order.objects.all()), [self.real_order])
+
+    def test_benchmark_needs_dishes_with_cooks(self):
+        Dish.cooks.through.objects.all().delete()
+        Dish.objects.update(cook_count=0)
+
+        with self.assertRaises(CommandError):
+            call_command("benchmark_orders", stdout=io.StringIO())
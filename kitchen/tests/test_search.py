@@ -0,0 +1,84 @@
+from django.test import TestCase, override_settings
+
+from kitchen.forms import CookSearchForm, DishSearchForm
+from kitchen.models import Cook, Dish, DishType, Ingredient
+from kitchen.pagination import KeysetPaginator
+from kitchen.search import SQLiteFTSBackend, SearchBackend
+
+
+@override_settings(KITCHEN_SEARCH_BACKEND="kitchen.search.SQLiteFTSBackend")
+class SQLiteFTSBackendTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        dish_type = DishType.objects.create(name="Soup")
+        cls.garlic = Ingredient.objects.create(name="Garlic")
+        cls.basil = Ingredient.objects.create(name="Basil")
+        cls.pesto = Dish.objects.create(
+            name="Pesto pasta",
+            description="Pasta with fresh basil sauce",
+            price=12,
+            type=dish_type,
+        )
+        cls.pesto.ingredients.set([cls.garlic, cls.basil])
+        cls.borsch = Dish.objects.create(
+            name="Borsch",
+            description="Beetroot soup",
+            price=8,
+            type=dish_type,
+        )
+        cls.borsch.ingredients.set([cls.garlic])
+        Cook.objects.create_user(username="gordon_ramsay", password="x")
+
+    def search(self, model, query):
+        return list(SQLiteFTSBackend().search(model.objects.all(), query))
+
+    def test_matches_name_substring_case_insensitive(self):
+        self.assertEqual(self.search(Dish, "ESTO"), [self.pesto])
+        self.assertEqual(
+            [cook.username for cook in self.search(Cook, "rams")],
+            ["gordon_ramsay"]
+        )
+
+    def test_matches_description_and_ingredient_names(self):
+        self.assertEqual(self.search(Dish, "beetroot"), [self.borsch])
+        self.assertEqual(
+            sorted(self.search(Dish, "garlic"), key=lambda dish: dish.pk),
+            [self.pesto, self.borsch]
+        )
+
+    def test_ingredient_rename_is_indexed(self):
+        self.basil.name = "Thai basil"
+        self.basil.save()
+
+        self.assertEqual(self.search(Dish, "thai"), [self.pesto])
+
+    def test_short_query_falls_back_to_icontains(self):
+        self.assertEqual(
+            self.search(Dish, "ch"),
+            list(Dish.objects.filter(name__icontains="ch"))
+        )
+
+    def test_results_are_ranked_and_paginate_by_cursor(self):
+        queryset = SQLiteFTSBackend().search(Dish.objects.all(), "pas")
+        paginator = KeysetPaginator(queryset, 1)
+
+        self.assertEqual(paginator.ordering, ("-search_rank", "name", "pk"))
+        self.assertEqual(list(paginator.page()), [self.pesto])
+
+    def test_search_form_uses_configured_backend(self):
+        form = DishSearchForm({"name": "basil"})
+
+        self.assertEqual(list(form.search(Dish.objects.all())), [self.pesto])
+        self.assertEqual(
+            len(CookSearchForm({"username": "gordon"}).search(
+                Cook.objects.all()
+            )),
+            1
+        )
+
+
+class SearchBackendTest(TestCase):
+    def test_empty_query_returns_queryset_unchanged(self):
+        queryset = Ingredient.objects.all()
+
+        self.assertIs(SearchBackend().search(queryset, "  "), queryset)
@@ -0,0 +1,241 @@
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from kitchen import similarity
+from kitchen.models import Dish, DishType, Ingredient, SimilarDish
+from kitchen.signals import catalog_bulk_changed
+
+
+class SimilarityTestMixin:
+    def setUp(self):
+        cache.clear()
+        similarity.invalidate()
+        self.pasta = DishType.objects.create(name="Pasta")
+        self.soup = DishType.objects.create(name="Soup")
+        self.garlic, self.basil, self.nuts, self.egg = (
+            Ingredient.objects.create(name=name)
+            for name in ("Garlic", "Basil", "Nuts", "Egg")
+        )
+        self.dishes = {}
+        for name, price, dish_type, ingredients in (
+            ("Pesto", 10, self.pasta, [self.garlic, self.basil, self.nuts]),
+            ("Aglio", 9, self.pasta, [self.garlic, self.basil]),
+            ("Broth", 11, self.soup, [self.garlic, self.basil]),
+            ("Carbonara", 40, self.pasta, [self.egg]),
+            ("Plain", 10, self.pasta, []),
+        ):
+            dish = Dish.objects.create(
+                name=name,
+                description="test_description",
+                price=price,
+                type=dish_type,
+            )
+            dish.ingredients.set(ingredients)
+            self.dishes[name] = dish
+
+    def ranked(self, name, k=similarity.SIMILAR_DISHES):
+        return [
+            dish.name
+            for dish in similarity.similar_dishes(self.dishes[name].pk, k)
+        ]
+
+
+class SimilarityMatrixTest(SimilarityTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        similarity.rebuild()
+
+    def test_ranks_by_ingredients_type_and_price(self):
+        self.assertEqual(
+            self.ranked("Pesto"),
+            ["Aglio", "Broth", "Plain", "Carbonara"]
+        )
+        self.assertEqual(self.ranked("Pesto", k=2), ["Aglio", "Broth"])
+        self.assertEqual(similarity.similar_dishes(0), [])
+
+    def test_stored_lists_are_read_with_one_query(self):
+        similarity.matrix.set_arrays(**similarity.empty_arrays())
+
+        with self.assertNumQueries(1):
+            self.assertEqual(self.ranked("Pesto", k=1), ["Aglio"])
+
+    def test_batch_matches_single_queries(self):
+        pks = [dish.pk for dish in self.dishes.values()]
+
+        with self.assertNumQueries(0):
+            batch = similarity.matrix.top_k(pks, k=3)
+
+        for pk in pks:
+            self.assertEqual(batch[pk], similarity.matrix.top_k([pk], 3)[pk])
+            self.assertNotIn(pk, [similar for similar, _ in batch[pk]])
+
+    def test_writes_are_applied_by_the_next_refresh(self):
+        plain = self.dishes["Plain"]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            plain.ingredients.add(self.garlic, self.basil, self.nuts)
+
+        self.assertEqual(self.ranked("Pesto", k=1), ["Aglio"])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(similarity.refresh(), 5)
+        self.assertEqual(self.ranked("Pesto", k=1), ["Plain"])
+        self.assertEqual(similarity.refresh(), 0)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.dishes["Aglio"].delete()
+            plain.ingredients.clear()
+        similarity.refresh()
+        self.assertNotIn("Aglio", self.ranked("Pesto"))
+        self.assertEqual(self.ranked("Pesto", k=1), ["Broth"])
+        self.assertEqual(self.ranked("Broth"), ["Pesto", "Plain"])
+
+    def test_refresh_rewrites_only_affected_lists(self):
+        carbonara = self.dishes["Carbonara"]
+        Dish.objects.create(
+            name="Frittata",
+            description="test_description",
+            price=1000,
+            type=DishType.objects.create(name="Omelette"),
+        )
+        similarity.rebuild()
+        frittata = Dish.objects.get(name="Frittata")
+        stored = set(SimilarDish.objects.exclude(
+            dish__in=[carbonara, frittata]
+        ).values_list("pk", flat=True))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            frittata.ingredients.add(self.egg)
+        similarity.refresh()
+
+        self.assertEqual(
+            SimilarDish.objects.filter(pk__in=stored).count(),
+            len(stored)
+        )
+        self.assertEqual(
+            similarity.similar_dishes(carbonara.pk, 1),
+            [frittata]
+        )
+
+    def test_bulk_change_rebuilds_on_refresh(self):
+        Dish.ingredients.through.objects.filter(
+            dish=self.dishes["Broth"]
+        ).delete()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            catalog_bulk_changed.send(sender=Ingredient, pks=None)
+        similarity.refresh()
+
+        self.assertEqual(self.ranked("Pesto", k=1), ["Aglio"])
+        self.assertEqual(self.ranked("Pesto")[-1], "Broth")
+
+    def test_expired_change_rebuilds_on_refresh(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.dishes["Plain"].ingredients.add(
+                self.garlic, self.basil, self.nuts
+            )
+        cache.delete(similarity.CHANGE_KEY.format(
+            similarity.counter.current()
+        ))
+
+        self.assertEqual(similarity.refresh(), 5)
+        self.assertEqual(self.ranked("Pesto", k=1), ["Plain"])
+
+
+class SimilarityStorageTest(SimilarityTestMixin, TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        settings = override_settings(
+            KITCHEN_SIMILARITY_PATH=Path(directory.name) / "similarity.npz"
+        )
+        settings.enable()
+        self.addCleanup(settings.disable)
+        super().setUp()
+
+    def forget(self):
+        """Simulates a restarted refresher with a fresh cache."""
+        similarity.matrix.generation = None
+        similarity.matrix.set_arrays(**similarity.empty_arrays())
+        cache.clear()
+
+    def test_restarted_refresher_loads_saved_matrix(self):
+        out = StringIO()
+        call_command("build_dish_similarity", stdout=out)
+        self.assertIn("5 dishes x 4 ingredients", out.getvalue())
+        self.forget()
+
+        with self.assertNumQueries(0):
+            self.assertEqual(similarity.refresh(), 0)
+        self.assertEqual(len(similarity.matrix.dish_ids), 5)
+
+    def test_refresh_keeps_saved_matrix_current(self):
+        similarity.rebuild()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.dishes["Plain"].ingredients.add(
+                self.garlic, self.basil, self.nuts
+            )
+        similarity.refresh()
+        self.forget()
+
+        with self.assertNumQueries(0):
+            similarity.refresh()
+            top = similarity.matrix.top_k([self.dishes["Pesto"].pk], 1)
+
+        self.assertEqual(
+            top[self.dishes["Pesto"].pk][0][0],
+            self.dishes["Plain"].pk
+        )
+
+    def test_stale_file_is_rebuilt(self):
+        similarity.rebuild()
+        similarity.counter.next()
+        similarity.matrix.generation = None
+
+        self.assertEqual(similarity.refresh(), 5)
+        self.assertEqual(
+            similarity.matrix.generation,
+            similarity.counter.current()
+        )
+
+
+class DishDetailSimilarTest(SimilarityTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        user = get_user_model().objects.create_user(
+            username="test",
+            password="test1234",
+        )
+        self.client.force_login(user)
+        similarity.rebuild()
+
+    def detail(self, name):
+        return self.client.get(
+            reverse("kitchen:dish-detail", args=[self.dishes[name].pk])
+        )
+
+    def test_detail_page_lists_similar_dishes(self):
+        response = self.detail("Pesto")
+
+        self.assertContains(response, "Similar dishes")
+        self.assertContains(
+            response,
+            reverse("kitchen:dish-detail", args=[self.dishes["Aglio"].pk])
+        )
+
+    def test_refresh_invalidates_cached_page(self):
+        self.detail("Carbonara")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.dishes["Broth"].ingredients.add(self.egg)
+        self.assertNotContains(self.detail("Carbonara"), "Broth")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            similarity.refresh()
+
+        self.assertContains(self.detail("Carbonara"), "Broth")
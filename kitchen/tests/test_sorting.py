@@ -0,0 +1,146 @@
+from unittest import skipUnless
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import RequestFactory, TestCase
+from django.urls import reverse
+
+from kitchen.models import Dish, DishType
+from kitchen.pagination import KeysetPaginator
+from kitchen.views import CookListView, DishListView
+
+COOK_LIST_URL = reverse("kitchen:cook-list")
+DISH_LIST_URL = reverse("kitchen:dish-list")
+DISH_EXPORT_URL = reverse("kitchen:dish-export")
+
+
+class ListSortFilterTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(
+            username="test",
+            password="test1234",
+            years_of_experience=3,
+        )
+        get_user_model().objects.create_user(
+            username="chef",
+            password="test1234",
+            years_of_experience=12,
+        )
+        self.client.force_login(self.user)
+        self.pasta = DishType.objects.create(name="Pasta")
+        self.soup = DishType.objects.create(name="Soup")
+        for name, price, dish_type in (
+            ("Carbonara", 12, self.pasta),
+            ("Minestrone", 7, self.soup),
+            ("Pesto", 9, self.pasta),
+        ):
+            Dish.objects.create(
+                name=name,
+                description="test_description",
+                price=price,
+                type=dish_type,
+            )
+
+    def dish_names(self, params):
+        response = self.client.get(DISH_LIST_URL, params)
+        return [dish.name for dish in response.context["dish_list"]]
+
+    def test_dishes_sort_by_price_both_ways(self):
+        self.assertEqual(
+            self.dish_names({"sort": "price"}),
+            ["Minestrone", "Pesto", "Carbonara"]
+        )
+        self.assertEqual(
+            self.dish_names({"sort": "-price"}),
+            ["Carbonara", "Pesto", "Minestrone"]
+        )
+
+    def test_dishes_filter_by_type_with_sort(self):
+        response = self.client.get(
+            DISH_LIST_URL,
+            {"type": self.pasta.pk, "sort": "-price"}
+        )
+
+        self.assertEqual(
+            [dish.name for dish in response.context["dish_list"]],
+            ["Carbonara", "Pesto"]
+        )
+        self.assertEqual(
+            response.context["current_filters"],
+            {"type": self.pasta.pk}
+        )
+        self.assertContains(response, 'name="sort" value="-price"')
+
+    def test_dishes_group_by_type(self):
+        self.assertEqual(
+            self.dish_names({"sort": "type-group"}),
+            ["Carbonara", "Pesto", "Minestrone"]
+        )
+
+    def test_invalid_type_filter_is_ignored(self):
+        self.assertEqual(len(self.dish_names({"type": "pasta"})), 3)
+        self.assertEqual(len(self.dish_names({"type": "9" * 30})), 3)
+
+    def test_export_applies_type_filter(self):
+        response = self.client.get(
+            DISH_EXPORT_URL,
+            {"type": self.soup.pk, "format": "jsonl"}
+        )
+
+        content = b"".join(response.streaming_content).decode()
+        self.assertIn("Minestrone", content)
+        self.assertNotIn("Pesto", content)
+
+    def test_cooks_sort_by_experience(self):
+        response = self.client.get(COOK_LIST_URL, {"sort": "experience"})
+
+        self.assertEqual(
+            [cook.username for cook in response.context["cook_list"]],
+            ["chef", "test"]
+        )
+
+
+@skipUnless(connection.vendor == "sqlite", "Reads SQLite query plans.")
+class ListIndexTest(TestCase):
+    factory = RequestFactory()
+
+    def query_plan(self, view_class, params):
+        view = view_class()
+        view.setup(self.factory.get("/", params))
+        paginator = KeysetPaginator(view.get_queryset(), 10)
+        queryset = paginator.page_queryset(None)[0]
+        sql, sql_params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN QUERY PLAN {sql}", sql_params)
+            return [row[-1] for row in cursor.fetchall()]
+
+    def assertIndexScan(self, view_class, params, table):
+        plan = self.query_plan(view_class, params)
+        self.assertFalse(
+            [step for step in plan if "TEMP B-TREE" in step],
+            f"{params} sorts in memory: {plan}"
+        )
+        self.assertTrue(
+            [step for step in plan if step.startswith(f"SCAN {table} ")
+             or step.startswith(f"SEARCH {table} ")],
+            plan
+        )
+        self.assertNotIn(f"SCAN {table}", plan)
+
+    def test_every_dish_sort_and_filter_uses_an_index(self):
+        for sort in [None, *DishListView.sort_options]:
+            for dish_type in (None, "1"):
+                params = {"sort": sort, "type": dish_type}
+                params = {
+                    key: value for key, value in params.items() if value
+                }
+                with self.subTest(**params):
+                    self.assertIndexScan(DishListView, params, "kitchen_dish")
+
+    def test_every_cook_sort_uses_an_index(self):
+        for sort in [None, *CookListView.sort_options]:
+            params = {"sort": sort} if sort else {}
+            with self.subTest(**params):
+                self.assertIndexScan(CookListView, params, "kitchen_cook")
@@ -1,8 +1,27 @@
+import json
+from pathlib import Path
+from unittest import mock
+
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
-
-from kitchen.models import Cook, Dish, DishType, Ingredient
+from django.utils.autoreload import file_changed
+from django.utils.http import http_date
+
+from kitchen import similarity
+from kitchen.context_processors import fragment_version
+from kitchen.models import (
+    Cook,
+    Dish,
+    DishType,
+    Ingredient,
+    Order,
+    OrderItem,
+)
 
 COOK_LIST_URL = reverse("kitchen:cook-list")
 COOK_CREATE_URL = reverse("kitchen:cook-create")
@@ -26,6 +45,15 @@ DISH_DETAIL_URL = reverse("kitchen:dish-detail", kwargs={"pk": 1})
 DISH_UPDATE_URL = reverse("kitchen:dish-update", kwargs={"pk": 1})
 DISH_DELETE_URL = reverse("kitchen:dish-delete", kwargs={"pk": 1})
 
+DISH_EXPORT_URL = reverse("kitchen:dish-export")
+COOK_EXPORT_URL = reverse("kitchen:cook-export")
+
+INSTRUMENTATION_STATS_URL = reverse("kitchen:instrumentation-stats")
+INGREDIENT_AUTOCOMPLETE_URL = reverse(
+    "kitchen:autocomplete",
+    args=["ingredients"]
+)
+
 
 class PublicCookTest(TestCase):
     def test_login_required_cook_list(self):
@@ -370,3 +398,504 @@ class PrivateDishTest(TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertEqual(response.context["dish"], dish)
         self.assertTemplateUsed(response, "kitchen/dish_confirm_delete.html")
+
+    def test_dish_on_order_is_not_deleted(self):
+        dish = Dish.objects.get(id=1)
+        OrderItem.objects.create(order=Order.objects.create(), dish=dish)
+
+        for url in (
+            DISH_DELETE_URL,
+            reverse("kitchen:dish-type-delete", kwargs={"pk": dish.type_id}),
+        ):
+            response = self.client.post(url)
+
+            self.assertEqual(response.status_code, 200)
+            self.assertContains(response, "1 order tickets")
+            self.assertNotContains(response, "Yes, delete")
+        self.assertTrue(Dish.objects.filter(id=1).exists())
+
+        Order.objects.all().delete()
+        response = self.client.post(DISH_DELETE_URL)
+        self.assertRedirects(response, DISH_LIST_URL)
+
+
+class QueryBudgetTestMixin:
+    def assertWithinQueryBudget(self, response):
+        metrics = response.metrics
+        self.assertIsNotNone(
+            metrics.query_budget,
+            f"{metrics.view_name} declares no query budget"
+        )
+        self.assertLessEqual(
+            metrics.queries,
+            metrics.query_budget,
+            f"{metrics.view_name} ran {metrics.queries} queries, "
+            f"budget is {metrics.query_budget}"
+        )
+
+
+class QueryBudgetTest(QueryBudgetTestMixin, TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(
+            username="test",
+            password="test1234",
+        )
+        self.client.force_login(self.user)
+
+        dish_type = DishType.objects.create(name="test_dish_type")
+        ingredients = [
+            Ingredient.objects.create(name=f"Ingredient_{index}")
+            for index in range(5)
+        ]
+        for index in range(15):
+            dish = Dish.objects.create(
+                name=f"Dish_{index}",
+                description="test_description",
+                price=10 + index,
+                type=dish_type,
+            )
+            dish.ingredients.set(ingredients)
+            dish.cooks.set([self.user])
+        self.dish = dish
+        # Built ahead, as build_dish_similarity does on deploy.
+        similarity.rebuild()
+
+    def test_read_views_stay_within_query_budget(self):
+        urls = [
+            reverse("kitchen:index"),
+            COOK_LIST_URL,
+            reverse("kitchen:cook-detail", kwargs={"pk": self.user.pk}),
+            DISH_TYPE_LIST_URL,
+            INGREDIENT_LIST_URL,
+            DISH_LIST_URL,
+            reverse("kitchen:dish-detail", kwargs={"pk": self.dish.pk}),
+        ]
+        for url in urls:
+            with self.subTest(url=url):
+                response = self.client.get(url)
+
+                self.assertEqual(response.status_code, 200)
+                self.assertWithinQueryBudget(response)
+
+    def test_server_timing_header(self):
+        response = self.client.get(DISH_LIST_URL)
+
+        self.assertIn("db;dur=", response["Server-Timing"])
+        self.assertIn("tpl;dur=", response["Server-Timing"])
+        self.assertEqual(response.metrics.view_name, "kitchen:dish-list")
+
+    def test_render_function_views_report_template_time(self):
+        response = self.client.get(reverse("kitchen:index"))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertGreater(response.metrics.template_time, 0)
+        self.assertLess(
+            response.metrics.template_time,
+            response.metrics.total_time,
+        )
+
+
+class InstrumentationStatsTest(TestCase):
+    def test_stats_page_is_staff_only(self):
+        user = get_user_model().objects.create_user(
+            username="test",
+            password="test1234",
+        )
+        self.client.force_login(user)
+
+        response = self.client.get(INSTRUMENTATION_STATS_URL)
+        self.assertNotEqual(response.status_code, 200)
+
+        user.is_staff = True
+        user.save()
+        self.client.get(DISH_LIST_URL)
+        response = self.client.get(INSTRUMENTATION_STATS_URL)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(
+            "kitchen:dish-list",
+            [stats.view_name for stats in response.context["view_stats"]]
+        )
+
+
+class DishQueryCountTest(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            username="test",
+            password="test1234",
+        )
+        self.client.force_login(self.user)
+        dish_type = DishType.objects.create(name="test_dish_type")
+        self.dish = Dish.objects.create(
+            name="Dish_1",
+            description="test_description_1",
+            price=13,
+            type=dish_type,
+        )
+
+    def add_relations(self, first, last):
+        with self.captureOnCommitCallbacks(execute=True):
+            for index in range(first, last):
+                ingredient = Ingredient.objects.create(
+                    name=f"Ingredient_{index}"
+                )
+                cook = get_user_model().objects.create_user(
+                    username=f"Cook_{index}",
+                    password="test1234",
+                )
+                self.dish.ingredients.add(ingredient)
+                self.dish.cooks.add(cook)
+
+    def test_dish_detail_query_count_is_constant(self):
+        url = reverse("kitchen:dish-detail", kwargs={"pk": self.dish.pk})
+        for first, last in ((0, 1), (1, 10)):
+            self.add_relations(first, last)
+            # session, user, dish joined with type, ingredients, cooks,
+            # similar dishes
+            with self.assertNumQueries(6):
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+
+    def test_dish_with_related_loads_everything_up_front(self):
+        self.add_relations(0, 3)
+
+        with self.assertNumQueries(3):
+            dish = Dish.objects.with_related().get(pk=self.dish.pk)
+        with self.assertNumQueries(0):
+            str(dish)
+            [str(ingredient) for ingredient in dish.ingredients.all()]
+            [str(cook) for cook in dish.cooks.all()]
+
+
+class AutocompleteTest(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            username="test",
+            password="test1234",
+        )
+        for index in range(25):
+            Ingredient.objects.create(name=f"Ingredient_{index:02d}")
+        Ingredient.objects.create(name="Basil")
+
+    def test_login_required(self):
+        response = self.client.get(INGREDIENT_AUTOCOMPLETE_URL)
+
+        self.assertNotEqual(response.status_code, 200)
+
+    def test_search_results_are_paged_by_cursor(self):
+        self.client.force_login(self.user)
+
+        first = self.client.get(
+            INGREDIENT_AUTOCOMPLETE_URL,
+            {"q": "ingredient"}
+        ).json()
+        second = self.client.get(
+            INGREDIENT_AUTOCOMPLETE_URL,
+            {"q": "ingredient", "cursor": first["next"]}
+        ).json()
+
+        self.assertEqual(len(first["results"]), 20)
+        self.assertEqual(len(second["results"]), 5)
+        self.assertIsNone(second["next"])
+        self.assertNotIn(
+            "Basil",
+            [item["text"] for item in first["results"] + second["results"]]
+        )
+
+    def test_unknown_source(self):
+        self.client.force_login(self.user)
+
+        response = self.client.get(
+            reverse("kitchen:autocomplete", args=["dishes"])
+        )
+
+        self.assertEqual(response.status_code, 404)
+
+
+class CatalogExportViewTest(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            username="test",
+            password="test1234",
+        )
+        dish_type = DishType.objects.create(name="Pasta")
+        basil = Ingredient.objects.create(name="Basil")
+        for name in ("Pesto", "Carbonara", "Lasagna"):
+            dish = Dish.objects.create(
+                name=name,
+                description="test_description",
+                price=10,
+                type=dish_type,
+            )
+            dish.ingredients.add(basil)
+            dish.cooks.add(self.user)
+
+    def test_login_required(self):
+        response = self.client.get(DISH_EXPORT_URL)
+
+        self.assertNotEqual(response.status_code, 200)
+
+    def test_dish_csv_export_streams_every_row(self):
+        self.client.force_login(self.user)
+
+        response = self.client.get(DISH_EXPORT_URL)
+        lines = b"".join(response.streaming_content).decode().splitlines()
+
+        self.assertTrue(response.streaming)
+        self.assertEqual(response["Content-Type"], "text/csv")
+        self.assertIn('filename="dishes.csv"', response["Content-Disposition"])
+        self.assertEqual(
+            lines[0],
+            "name,description,price,type,cooks,ingredients"
+        )
+        self.assertEqual(
+            lines[1],
+            "Pesto,test_description,10.00,Pasta,test,Basil"
+        )
+        self.assertEqual(len(lines), 4)
+
+    def test_export_respects_search_filter(self):
+        self.client.force_login(self.user)
+
+        response = self.client.get(
+            DISH_EXPORT_URL,
+            {"name": "carbo", "format": "jsonl"}
+        )
+        rows = [
+            json.loads(line)
+            for line in b"".join(response.streaming_content).splitlines()
+        ]
+
+        self.assertEqual([row["name"] for row in rows], ["Carbonara"])
+        self.assertEqual(rows[0]["ingredients"], ["Basil"])
+
+    def test_export_query_count_does_not_grow_with_rows(self):
+        self.client.force_login(self.user)
+
+        # session, user, cooks
+        with self.assertNumQueries(3):
+            response = self.client.get(COOK_EXPORT_URL)
+            b"".join(response.streaming_content)
+        # session, user, dishes joined with type, cooks, ingredients
+        with self.assertNumQueries(5):
+            response = self.client.get(DISH_EXPORT_URL)
+            b"".join(response.streaming_content)
+
+    def test_unknown_format(self):
+        self.client.force_login(self.user)
+
+        response = self.client.get(DISH_EXPORT_URL, {"format": "xml"})
+
+        self.assertEqual(response.status_code, 404)
+
+
+class ConditionalViewTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(
+            username="test",
+            password="test1234",
+        )
+        self.client.force_login(self.user)
+        self.dish_type = DishType.objects.create(name="Pasta")
+        self.basil = Ingredient.objects.create(name="Basil")
+        self.dish = Dish.objects.create(
+            name="Pesto",
+            description="test_description",
+            price=10,
+            type=self.dish_type,
+        )
+        self.dish.ingredients.add(self.basil)
+        self.detail_url = reverse(
+            "kitchen:dish-detail",
+            kwargs={"pk": self.dish.pk}
+        )
+
+    def revalidate(self, url, response):
+        return self.client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+
+    def test_unchanged_page_is_not_modified_without_rendering(self):
+        for url in (DISH_LIST_URL, self.detail_url, COOK_LIST_URL):
+            response = self.client.get(url)
+            self.assertIn("ETag", response)
+
+            # session, user; the validators are read from the cache
+            with self.assertNumQueries(2):
+                revalidated = self.revalidate(url, response)
+            self.assertEqual(revalidated.status_code, 304)
+            self.assertEqual(revalidated.metrics.template_time, 0)
+
+    def test_second_write_within_a_second_changes_the_page(self):
+        with mock.patch("kitchen.versions.time.time", return_value=1000.2):
+            with self.captureOnCommitCallbacks(execute=True):
+                self.dish.save()
+        response = self.client.get(DISH_LIST_URL)
+        self.assertNotIn("Last-Modified", response)
+
+        self.dish.name = "Pesto genovese"
+        with mock.patch("kitchen.versions.time.time", return_value=1000.7):
+            with self.captureOnCommitCallbacks(execute=True):
+                self.dish.save()
+
+        # Whole seconds on or after both writes.
+        for since in (1000, 1001):
+            revalidated = self.client.get(
+                DISH_LIST_URL,
+                HTTP_IF_MODIFIED_SINCE=http_date(since),
+            )
+            self.assertEqual(revalidated.status_code, 200)
+            self.assertContains(revalidated, "Pesto genovese")
+        self.assertEqual(
+            self.revalidate(DISH_LIST_URL, response).status_code,
+            200,
+        )
+
+    def test_related_rename_changes_detail_etag(self):
+        response = self.client.get(self.detail_url)
+
+        self.basil.name = "Thai basil"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.basil.save()
+
+        self.assertEqual(
+            self.revalidate(self.detail_url, response).status_code,
+            200
+        )
+
+    def test_related_delete_changes_detail_etag(self):
+        response = self.client.get(self.detail_url)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.basil.delete()
+
+        self.assertEqual(
+            self.revalidate(self.detail_url, response).status_code,
+            200
+        )
+
+    def test_validators_do_not_query_the_table(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(DISH_LIST_URL)
+            self.client.get(DISH_LIST_URL)
+
+        self.assertFalse(any(
+            "MAX(" in query["sql"] or "COUNT(" in query["sql"]
+            for query in queries.captured_queries
+        ))
+
+    def test_unrelated_write_keeps_the_etag(self):
+        response = self.client.get(DISH_LIST_URL)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Ingredient.objects.create(name="Garlic")
+
+        self.assertEqual(
+            self.revalidate(DISH_LIST_URL, response).status_code,
+            304
+        )
+
+    def test_search_is_part_of_the_validators(self):
+        response = self.client.get(DISH_LIST_URL, {"name": "pesto"})
+        other = self.client.get(DISH_LIST_URL, {"name": "lasagna"})
+
+        self.assertNotEqual(response["ETag"], other["ETag"])
+
+    def test_other_user_gets_a_fresh_page(self):
+        response = self.client.get(DISH_LIST_URL)
+        self.client.force_login(
+            get_user_model().objects.create_user(
+                username="other",
+                password="test1234",
+            )
+        )
+
+        self.assertEqual(
+            self.revalidate(DISH_LIST_URL, response).status_code,
+            200
+        )
+
+
+class UpdatedAtTest(TestCase):
+    def setUp(self):
+        dish_type = DishType.objects.create(name="Pasta")
+        self.dish = Dish.objects.create(
+            name="Pesto",
+            description="test_description",
+            price=10,
+            type=dish_type,
+        )
+        self.cook = get_user_model().objects.create_user(
+            username="test",
+            password="test1234",
+        )
+        self.epoch = Dish._meta.get_field("updated_at").to_python(
+            "2000-01-01T00:00:00Z"
+        )
+
+    def reset(self):
+        Dish.objects.update(updated_at=self.epoch)
+        get_user_model().objects.update(updated_at=self.epoch)
+
+    def assert_touched(self):
+        self.dish.refresh_from_db()
+        self.cook.refresh_from_db()
+        self.assertGreater(self.dish.updated_at, self.epoch)
+        self.assertGreater(self.cook.updated_at, self.epoch)
+
+    def test_m2m_add_and_remove_touch_both_sides(self):
+        self.reset()
+        self.dish.cooks.add(self.cook)
+        self.assert_touched()
+
+        self.reset()
+        self.cook.dishes.remove(self.dish)
+        self.assert_touched()
+
+    def test_m2m_clear_touches_unlinked_rows(self):
+        self.dish.cooks.add(self.cook)
+        self.reset()
+
+        self.dish.cooks.clear()
+
+        self.assert_touched()
+
+
+class TemplateFragmentTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(
+            username="test",
+            password="test1234",
+        )
+        self.client.force_login(self.user)
+
+    def navigation_key(self):
+        return make_template_fragment_key(
+            "kitchen_navigation",
+            [self.user.pk, fragment_version()],
+        )
+
+    def test_navigation_is_cached_per_user_and_version(self):
+        response = self.client.get(DISH_TYPE_LIST_URL)
+
+        fragment = cache.get(self.navigation_key())
+        self.assertIsNotNone(fragment)
+        self.assertIn("navbar-brand", fragment)
+        # The logout form carries the CSRF token and stays outside.
+        self.assertNotIn("csrfmiddlewaretoken", fragment)
+        self.assertContains(response, "csrfmiddlewaretoken")
+
+    def test_cached_navigation_is_rendered(self):
+        cache.set(self.navigation_key(), "<nav>cached</nav>")
+
+        response = self.client.get(DISH_TYPE_LIST_URL)
+
+        self.assertContains(response, "<nav>cached</nav>")
+
+    def test_template_edits_reset_version(self):
+        fragment_version()
+
+        file_changed.send(sender=None, file_path=Path("navigation.html"))
+
+        self.assertEqual(fragment_version.cache_info().currsize, 0)
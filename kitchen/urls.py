@@ -1,8 +1,19 @@
+from django.conf import settings
 from django.urls import path
+
+from .api import resource_detail, resource_list
+from .async_views import use_async_views
 from .views import (
     index,
+    autocomplete,
+    instrumentation_stats,
+    live_events,
     CookListView,
+    CookExportView,
     DishListView,
+    DishExportView,
+    DishBulkEditView,
+    DishIngredientSearchView,
     DishTypeListView,
     IngredientListView,
     CookDetailView,
@@ -25,7 +36,25 @@ app_name = "kitchen"
 
 urlpatterns = [
     path("", index, name="index"),
+    path(
+        "autocomplete/<str:kind>/",
+        autocomplete,
+        name="autocomplete"
+    ),
+    path("api/<str:resource>/", resource_list, name="api-list"),
+    path(
+        "api/<str:resource>/<int:pk>/",
+        resource_detail,
+        name="api-detail"
+    ),
+    path("events/", live_events, name="live-events"),
+    path(
+        "stats/",
+        instrumentation_stats,
+        name="instrumentation-stats"
+    ),
     path("cooks/", CookListView.as_view(), name="cook-list"),
+    path("cooks/export/", CookExportView.as_view(), name="cook-export"),
     path("cooks/<int:pk>/", CookDetailView.as_view(), name="cook-detail"),
     path("cooks/create/", CookCreateView.as_view(), name="cook-create"),
     path(
@@ -43,6 +72,21 @@ urlpatterns = [
         DishListView.as_view(),
         name="dish-list"
     ),
+    path(
+        "dishes/export/",
+        DishExportView.as_view(),
+        name="dish-export"
+    ),
+    path(
+        "dishes/bulk-edit/",
+        DishBulkEditView.as_view(),
+        name="dish-bulk-edit"
+    ),
+    path(
+        "dishes/by-ingredients/",
+        DishIngredientSearchView.as_view(),
+        name="dish-ingredient-search"
+    ),
     path(
         "dishes/<int:pk>/",
         DishDetailView.as_view(),
@@ -104,3 +148,6 @@ urlpatterns = [
         name="ingredient-delete"
     ),
 ]
+
+if getattr(settings, "KITCHEN_ASYNC_VIEWS", False):
+    urlpatterns = use_async_views(urlpatterns)
@@ -0,0 +1,57 @@
+"""
+Per-model version stamps kept in the cache.
+
+A stamp is the time of the last committed write to a model. Readers combine
+the stamps of everything a response depends on into validators (ETags,
+Last-Modified), so a changed stamp is all it takes to invalidate them. A
+stamp missing from the cache is re-created as "now", which only costs
+clients one extra full response.
+"""
+import time
+
+from django.core.cache import cache
+
+from kitchen.models import Cook, Dish, DishType, Ingredient
+
+VERSIONED_MODELS = (Cook, Dish, DishType, Ingredient)
+
+
+def cache_key(model):
+    return f"kitchen:version:{model._meta.label_lower}"
+
+
+def get_versions(models):
+    """Returns ``{model: stamp}``, creating missing stamps."""
+    keys = {cache_key(model): model for model in models}
+    found = cache.get_many(keys)
+    missing = [key for key in keys if key not in found]
+    if missing:
+        now = time.time()
+        for key in missing:
+            cache.add(key, now, timeout=None)
+        found.update(cache.get_many(missing))
+        found = {**dict.fromkeys(missing, now), **found}
+    return {model: found[key] for key, model in keys.items()}
+
+
+async def aget_versions(models):
+    keys = {cache_key(model): model for model in models}
+    found = await cache.aget_many(keys)
+    missing = [key for key in keys if key not in found]
+    if missing:
+        now = time.time()
+        for key in missing:
+            await cache.aadd(key, now, timeout=None)
+        found.update(await cache.aget_many(missing))
+        found = {**dict.fromkeys(missing, now), **found}
+    return {model: found[key] for key, model in keys.items()}
+
+
+def bump(model):
+    cache.set(cache_key(model), time.time(), timeout=None)
+
+
+def written_within(seconds):
+    """Whether any versioned model was written in the last ``seconds``."""
+    stamps = get_versions(VERSIONED_MODELS).values()
+    return time.time() - max(stamps) < seconds
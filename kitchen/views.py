@@ -1,39 +1,189 @@
+from functools import partial
+
+from django.contrib.admin.views.decorators import staff_member_required
+from django.contrib.auth.decorators import login_required
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.shortcuts import render
-from django.urls import reverse_lazy
+from django.db.models import ProtectedError
+from django.http import (
+    Http404,
+    HttpResponse,
+    JsonResponse,
+    StreamingHttpResponse,
+)
+from django.shortcuts import redirect, render
+from django.urls import reverse, reverse_lazy
 from django.views import generic
 
+from kitchen import counters, events, similarity
+from kitchen.catalog import (
+    CONTENT_TYPES,
+    CookCatalog,
+    DishCatalog,
+    stream_rows,
+)
+from kitchen.conditional import ConditionalViewMixin
 from kitchen.forms import (
+    DishBulkCookForm,
+    DishBulkIngredientForm,
+    DishBulkPriceForm,
     DishForm,
+    DishIngredientQueryForm,
     CookCreationForm,
     CookExperienceUpdateForm,
     DishTypeSearchForm,
     CookSearchForm,
     DishSearchForm, IngredientSearchForm,
 )
+from kitchen.instrumentation import registry
 from kitchen.models import Cook, Dish, DishType, Ingredient
+from kitchen.page_cache import PageCacheMixin
+from kitchen.pagination import (
+    InvalidCursor,
+    KeysetPaginationMixin,
+    KeysetPaginator,
+)
+from kitchen.search import get_search_backend
+from kitchen.sorting import FilterableListMixin, SortableListMixin
+
+AUTOCOMPLETE_QUERYSETS = {
+    "cooks": lambda: Cook.objects.only("username", "first_name", "last_name"),
+    "ingredients": lambda: Ingredient.objects.only("name"),
+}
+
+AUTOCOMPLETE_PAGE_SIZE = 20
 
 
 def index(request):
     """View function for the home page of site."""
-    num_cooks = Cook.objects.count()
-    num_dishes = Dish.objects.count()
-    num_dish_types = DishType.objects.count()
-    num_ingredients = Ingredient.objects.count()
+    counts = counters.get_counts()
     context = {
-        "num_cooks": num_cooks,
-        "num_dishes": num_dishes,
-        "num_dish_types": num_dish_types,
-        "num_ingredients": num_ingredients
+        "num_cooks": counts["cooks"],
+        "num_dishes": counts["dishes"],
+        "num_dish_types": counts["dish_types"],
+        "num_ingredients": counts["ingredients"]
     }
     return render(request, "kitchen/index.html", context=context)
 
 
-class DishTypeListView(LoginRequiredMixin, generic.ListView):
+@staff_member_required
+def instrumentation_stats(request):
+    """Per-view query and latency statistics of this worker process."""
+    context = {"view_stats": registry.snapshot()}
+    return render(
+        request,
+        "kitchen/instrumentation_stats.html",
+        context=context
+    )
+
+
+@login_required
+def autocomplete(request, kind):
+    """JSON search results for the autocomplete pickers, one page at a time."""
+    if kind not in AUTOCOMPLETE_QUERYSETS:
+        raise Http404(f"Unknown autocomplete source: {kind}")
+    queryset = get_search_backend().search(
+        AUTOCOMPLETE_QUERYSETS[kind](),
+        request.GET.get("q", "")
+    )
+    paginator = KeysetPaginator(queryset, AUTOCOMPLETE_PAGE_SIZE)
+    try:
+        page = paginator.page(request.GET.get("cursor"))
+    except InvalidCursor as e:
+        raise Http404(f"Invalid cursor: {e}")
+    return JsonResponse({
+        "results": [{"id": obj.pk, "text": str(obj)} for obj in page],
+        "next": page.next_cursor,
+    })
+
+
+def event_stream_options(request):
+    """The requested topics and the id of the last event the screen saw."""
+    topics = [
+        topic for topic in request.GET.getlist("topic")
+        if topic in events.TOPICS
+    ] or events.TOPICS
+    last_id = request.headers.get("Last-Event-ID") or request.GET.get(
+        "last_event_id"
+    )
+    return topics, last_id
+
+
+def event_stream_response(content):
+    if isinstance(content, str):
+        response = HttpResponse(content, content_type="text/event-stream")
+    else:
+        response = StreamingHttpResponse(
+            content,
+            content_type="text/event-stream",
+        )
+    response["Cache-Control"] = "no-cache"
+    # Stops nginx from buffering the stream.
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
+@login_required
+def live_events(request):
+    """
+    Server-Sent Events of dish and cook changes. Sync servers cannot hold
+    the stream open: this sends what the screen missed and lets it
+    reconnect, the ASGI deployment streams live (``async_views``).
+    """
+    topics, last_id = event_stream_options(request)
+    return event_stream_response(events.broker.replay(topics, last_id))
+
+
+class CatalogExportView(
+    LoginRequiredMixin,
+    FilterableListMixin,
+    generic.View
+):
+    """
+    Streams every row matching the list view search and filters as CSV or
+    JSON Lines.
+    Rows are read through a server-side cursor in ``chunk_size`` chunks,
+    so memory stays flat however large the catalog is.
+    """
+    catalog_class = None
+    search_form_class = None
+    filename = None
+    chunk_size = 2000
+
+    def get(self, request, *args, **kwargs):
+        fmt = request.GET.get("format", "csv")
+        if fmt not in CONTENT_TYPES:
+            raise Http404(f"Unknown export format: {fmt}")
+        catalog = self.catalog_class()
+        queryset = self.search_form_class(request.GET).search(
+            self.filter_queryset(catalog.queryset())
+        )
+        response = StreamingHttpResponse(
+            stream_rows(catalog, fmt, queryset, self.chunk_size),
+            content_type=CONTENT_TYPES[fmt],
+        )
+        response["Content-Disposition"] = (
+            f'attachment; filename="{self.filename}.{fmt}"'
+        )
+        return response
+
+
+class DishTypeListView(
+    LoginRequiredMixin,
+    SortableListMixin,
+    ConditionalViewMixin,
+    PageCacheMixin,
+    KeysetPaginationMixin,
+    generic.ListView
+):
     model = DishType
     context_object_name = "dish_type_list"
     template_name = "kitchen/dish_type_list.html"
     paginate_by = 10
+    query_budget = 3
+    cache_tags = ("dishtype:list", )
+    # The dish counts shift with dish writes.
+    validator_models = (Dish, )
+    sort_options = {"dishes": ("-dish_count", "name", "id")}
 
     def get_context_data(self, *, object_list=None, **kwargs):
         context = super(DishTypeListView, self).get_context_data(**kwargs)
@@ -43,11 +193,8 @@ class DishTypeListView(LoginRequiredMixin, generic.ListView):
 
     def get_queryset(self):
         queryset = DishType.objects.all()
-        form = DishTypeSearchForm(self.request.GET)
-
-        if form.is_valid():
-            return queryset.filter(name__icontains=form.cleaned_data["name"])
-        return queryset
+        queryset = DishTypeSearchForm(self.request.GET).search(queryset)
+        return self.sort_queryset(queryset)
 
 
 class DishTypeCreateView(LoginRequiredMixin, generic.CreateView):
@@ -66,16 +213,65 @@ class DishTypeUpdateView(LoginRequiredMixin, generic.UpdateView):
     context_object_name = "dish_type"
 
 
-class DishTypeDeleteView(LoginRequiredMixin, generic.DeleteView):
+class ProtectedDeleteMixin:
+    """
+    DeleteView mixin showing a ``ProtectedError``, raised while order
+    tickets still reference the dishes, as an error on the confirmation
+    page instead of a server error.
+    """
+    protected_message = (
+        "It is on {count} order tickets, so it cannot be deleted."
+    )
+
+    def form_valid(self, form):
+        try:
+            return super().form_valid(form)
+        except ProtectedError as e:
+            form.add_error(None, self.protected_message.format(
+                count=len(e.protected_objects)
+            ))
+            return self.form_invalid(form)
+
+
+class DishTypeDeleteView(
+    LoginRequiredMixin,
+    ProtectedDeleteMixin,
+    generic.DeleteView
+):
     model = DishType
     template_name = "kitchen/dish_type_confirm_delete.html"
     success_url = reverse_lazy("kitchen:dish-type-list")
     context_object_name = "dish_type"
-
-
-class DishListView(LoginRequiredMixin, generic.ListView):
+    protected_message = (
+        "Its dishes are on {count} order tickets, so it cannot be deleted."
+    )
+
+
+class DishListView(
+    LoginRequiredMixin,
+    SortableListMixin,
+    FilterableListMixin,
+    ConditionalViewMixin,
+    PageCacheMixin,
+    KeysetPaginationMixin,
+    generic.ListView
+):
     model = Dish
     paginate_by = 10
+    query_budget = 3
+    cache_tags = ("dish:list", "dishtype:list")
+    validator_models = (DishType, )
+    # Each option, alone or after the type filter, is served by an index
+    # of Dish.Meta. Sorting by type name would need a join the index cannot
+    # order, so the dishes are grouped by type instead.
+    sort_options = {
+        "price": ("price", "id"),
+        "-price": ("-price", "-id"),
+        "type-group": ("type_id", "name", "id"),
+        "cooks": ("-cook_count", "name", "id"),
+        "ingredients": ("-ingredient_count", "name", "id"),
+    }
+    filter_options = {"type": "type"}
 
     def get_context_data(self, *, object_list=None, **kwargs):
         context = super(DishListView, self).get_context_data(**kwargs)
@@ -84,16 +280,129 @@ class DishListView(LoginRequiredMixin, generic.ListView):
         return context
 
     def get_queryset(self):
-        queryset = Dish.objects.select_related("type")
-        form = DishSearchForm(self.request.GET)
+        queryset = self.filter_queryset(Dish.objects.select_related("type"))
+        queryset = DishSearchForm(self.request.GET).search(queryset)
+        return self.sort_queryset(queryset)
+
+
+class DishExportView(CatalogExportView):
+    catalog_class = DishCatalog
+    search_form_class = DishSearchForm
+    filter_options = DishListView.filter_options
+    filename = "dishes"
+
+
+class DishBulkEditView(
+    LoginRequiredMixin,
+    FilterableListMixin,
+    generic.TemplateView
+):
+    """
+    Reprices, or changes the cooks or ingredients of, every dish matching
+    the dish list search and filters in one set-based write.
+    """
+    model = Dish
+    template_name = "kitchen/dish_bulk_edit.html"
+    filter_options = DishListView.filter_options
+    form_classes = {
+        "price": DishBulkPriceForm,
+        "ingredients": DishBulkIngredientForm,
+        "cooks": DishBulkCookForm,
+    }
 
-        if form.is_valid():
-            return queryset.filter(name__icontains=form.cleaned_data["name"])
-        return queryset
+    def get_dishes(self):
+        return DishSearchForm(self.request.GET).search(
+            self.filter_queryset(Dish.objects.all())
+        )
 
+    def get_forms(self, bound=None):
+        return {
+            operation: form_class(
+                self.request.POST if operation == bound else None,
+                prefix=operation,
+            )
+            for operation, form_class in self.form_classes.items()
+        }
+
+    def get_success_url(self):
+        url = reverse("kitchen:dish-list")
+        query = self.request.GET.urlencode()
+        return f"{url}?{query}" if query else url
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context.setdefault("forms", self.get_forms())
+        context["dish_count"] = self.get_dishes().count()
+        context["search_name"] = self.request.GET.get("name", "")
+        return context
 
-class DishDetailView(LoginRequiredMixin, generic.DetailView):
+    def post(self, request, *args, **kwargs):
+        operation = request.POST.get("operation")
+        if operation not in self.form_classes:
+            return self.get(request, *args, **kwargs)
+        forms = self.get_forms(bound=operation)
+        form = forms[operation]
+        if not form.is_valid():
+            return self.render_to_response(
+                self.get_context_data(forms=forms)
+            )
+        form.apply(self.get_dishes())
+        return redirect(self.get_success_url())
+
+
+class DishIngredientSearchView(LoginRequiredMixin, generic.ListView):
+    """
+    Dishes with all, any or none of the picked ingredients. The ids come
+    from the in-process ingredient index; only the shown page is loaded.
+    """
+    template_name = "kitchen/dish_ingredient_search.html"
+    context_object_name = "dish_list"
+    paginate_by = 10
+    # session, user, each picker validated and rendered, the page
+    query_budget = 9
+
+    def get_queryset(self):
+        self.form = DishIngredientQueryForm(self.request.GET)
+        return self.form.search()
+
+    def paginate_queryset(self, queryset, page_size):
+        paginator, page, pks, is_paginated = super().paginate_queryset(
+            queryset,
+            page_size,
+        )
+        dishes = Dish.objects.select_related("type").in_bulk(pks)
+        page.object_list = [dishes[pk] for pk in pks if pk in dishes]
+        return paginator, page, page.object_list, is_paginated
+
+    def get_context_data(self, *, object_list=None, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["form"] = self.form
+        return context
+
+
+class DishDetailView(
+    LoginRequiredMixin,
+    ConditionalViewMixin,
+    PageCacheMixin,
+    generic.DetailView
+):
     model = Dish
+    queryset = Dish.objects.with_related()
+    # session, user, dish, ingredients, cooks, similar dishes
+    query_budget = 6
+    # kitchen.similarity invalidates the page when its stored similar
+    # dishes change.
+    cache_tags = ("dish:{pk}", )
+    validator_models = (DishType, Ingredient, Cook)
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        # Called by the template, so async views load it off the loop too.
+        context["similar_dishes"] = partial(
+            similarity.similar_dishes,
+            self.object.pk,
+        )
+        return context
 
 
 class DishCreateView(LoginRequiredMixin, generic.CreateView):
@@ -104,18 +413,36 @@ class DishCreateView(LoginRequiredMixin, generic.CreateView):
 
 class DishUpdateView(LoginRequiredMixin, generic.UpdateView):
     model = Dish
+    queryset = Dish.objects.with_related()
     form_class = DishForm
     success_url = reverse_lazy("kitchen:dish-list")
 
 
-class DishDeleteView(LoginRequiredMixin, generic.DeleteView):
+class DishDeleteView(
+    LoginRequiredMixin,
+    ProtectedDeleteMixin,
+    generic.DeleteView
+):
     model = Dish
+    queryset = Dish.objects.with_related(m2m=False)
     success_url = reverse_lazy("kitchen:dish-list")
 
 
-class CookListView(LoginRequiredMixin, generic.ListView):
+class CookListView(
+    LoginRequiredMixin,
+    SortableListMixin,
+    ConditionalViewMixin,
+    KeysetPaginationMixin,
+    generic.ListView
+):
     model = Cook
     paginate_by = 10
+    query_budget = 3
+    validator_models = (Dish, )
+    sort_options = {
+        "experience": ("-years_of_experience", "username", "id"),
+        "dishes": ("-dish_count", "username", "id"),
+    }
 
     def get_context_data(self, *, object_list=None, **kwargs):
         context = super(CookListView, self).get_context_data(**kwargs)
@@ -125,18 +452,27 @@ class CookListView(LoginRequiredMixin, generic.ListView):
 
     def get_queryset(self):
         queryset = Cook.objects.all()
-        form = CookSearchForm(self.request.GET)
+        queryset = CookSearchForm(self.request.GET).search(queryset)
+        return self.sort_queryset(queryset)
 
-        if form.is_valid():
-            return queryset.filter(
-                username__icontains=form.cleaned_data["username"]
-            )
-        return queryset
+
+class CookExportView(CatalogExportView):
+    catalog_class = CookCatalog
+    search_form_class = CookSearchForm
+    filename = "cooks"
 
 
-class CookDetailView(LoginRequiredMixin, generic.DetailView):
+class CookDetailView(
+    LoginRequiredMixin,
+    ConditionalViewMixin,
+    PageCacheMixin,
+    generic.DetailView
+):
     model = Cook
     queryset = Cook.objects.prefetch_related("dishes__type")
+    query_budget = 5
+    cache_tags = ("cook:{pk}", )
+    validator_models = (Dish, DishType)
 
 
 class CookCreateView(LoginRequiredMixin, generic.CreateView):
@@ -157,10 +493,21 @@ class CookDeleteView(LoginRequiredMixin, generic.DeleteView):
     success_url = reverse_lazy("kitchen:cook-list")
 
 
-class IngredientListView(LoginRequiredMixin, generic.ListView):
+class IngredientListView(
+    LoginRequiredMixin,
+    SortableListMixin,
+    ConditionalViewMixin,
+    PageCacheMixin,
+    KeysetPaginationMixin,
+    generic.ListView
+):
     model = Ingredient
     template_name = "kitchen/ingredient_list.html"
     paginate_by = 10
+    query_budget = 3
+    cache_tags = ("ingredient:list", )
+    validator_models = (Dish, )
+    sort_options = {"dishes": ("-dish_count", "name", "id")}
 
     def get_context_data(self, *, object_list=None, **kwargs):
         context = super(IngredientListView, self).get_context_data(**kwargs)
@@ -170,10 +517,8 @@ class IngredientListView(LoginRequiredMixin, generic.ListView):
 
     def get_queryset(self):
         queryset = Ingredient.objects.all()
-        form = IngredientSearchForm(self.request.GET)
-        if form.is_valid():
-            return queryset.filter(name__icontains=form.cleaned_data["name"])
-        return queryset
+        queryset = IngredientSearchForm(self.request.GET).search(queryset)
+        return self.sort_queryset(queryset)
 
 
 class IngredientCreateView(LoginRequiredMixin, generic.CreateView):
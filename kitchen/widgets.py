@@ -0,0 +1,51 @@
+from django import forms
+from django.core.exceptions import ValidationError
+
+
+class AutocompleteSelectMultiple(forms.SelectMultiple):
+    """
+    Multi-select rendering only the currently selected options; further
+    options are searched through a JSON autocomplete endpoint as the user
+    types, so the page never iterates the whole related table.
+    """
+
+    def __init__(self, url, attrs=None, placeholder="Search..."):
+        super().__init__(attrs)
+        self.url = url
+        self.placeholder = placeholder
+
+    class Media:
+        js = ("assets/js/kitchen-autocomplete.js", )
+
+    def build_attrs(self, base_attrs, extra_attrs=None):
+        attrs = super().build_attrs(base_attrs, extra_attrs)
+        attrs["data-autocomplete-url"] = str(self.url)
+        attrs["data-placeholder"] = self.placeholder
+        return attrs
+
+    def selected_objects(self, value):
+        queryset = self.choices.queryset
+        keys = [key for key in value if key not in (None, "")]
+        if not keys:
+            return queryset.none()
+        field = self.choices.field
+        try:
+            return queryset.filter(**{
+                f"{field.to_field_name or 'pk'}__in": keys
+            })
+        except (ValueError, TypeError, ValidationError):
+            return queryset.none()
+
+    def optgroups(self, name, value, attrs=None):
+        options = []
+        for index, obj in enumerate(self.selected_objects(value)):
+            option_value, label = self.choices.choice(obj)
+            options.append(self.create_option(
+                name,
+                option_value,
+                label,
+                True,
+                index,
+                attrs=attrs,
+            ))
+        return [(None, options, 0)]
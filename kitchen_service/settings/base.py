@@ -49,6 +49,8 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",
+    "kitchen.middleware.QueryInstrumentationMiddleware",
+    "kitchen.middleware.PrimaryPinningMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -61,7 +63,7 @@ ROOT_URLCONF = "kitchen_service.urls"
 
 TEMPLATES = [
     {
-        "BACKEND": "django.template.backends.django.DjangoTemplates",
+        "BACKEND": "kitchen.instrumentation.InstrumentedDjangoTemplates",
         "DIRS": [BASE_DIR / "templates"],
         "APP_DIRS": True,
         "OPTIONS": {
@@ -70,6 +72,7 @@ TEMPLATES = [
                 "django.contrib.auth.context_processors.auth",
                 "django.contrib.messages.context_processors.messages",
                 "kitchen.context_processors.cfg_assets_root",
+                "kitchen.context_processors.template_fragments",
             ],
         },
     },
@@ -78,6 +81,67 @@ TEMPLATES = [
 WSGI_APPLICATION = "kitchen_service.wsgi.application"
 
 
+# Database routing
+# Kitchen reads go to KITCHEN_REPLICA_DATABASE when it is set; requests
+# right after a write stay on the primary for KITCHEN_REPLICA_LAG seconds.
+
+DATABASE_ROUTERS = ["kitchen.routers.PrimaryReplicaRouter"]
+
+KITCHEN_REPLICA_DATABASE = None
+
+KITCHEN_REPLICA_LAG = 5
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# Use a shared backend (database, memcached, redis) with several workers,
+# otherwise each process keeps its own cached pages and derived state;
+# ``check --deploy`` fails on a process-local one (kitchen/checks.py).
+
+CACHES = {
+    "default": {
+        "BACKEND": os.environ.get(
+            "CACHE_BACKEND",
+            "django.core.cache.backends.locmem.LocMemCache"
+        ),
+        "LOCATION": os.environ.get("CACHE_LOCATION", "kitchen-service"),
+    }
+}
+
+KITCHEN_COUNTER_TIMEOUT = 60 * 60 * 24
+
+# Rendered list/detail pages; writes invalidate them through cache tags.
+KITCHEN_PAGE_CACHE_TIMEOUT = 60 * 60 * 24
+
+# {% cache %} fragments of the page chrome; keys carry a digest of the
+# fragment templates, so deploys never serve stale markup.
+KITCHEN_FRAGMENT_CACHE_TIMEOUT = 60 * 60 * 24
+
+# Async views
+# kitchen_service/asgi.py serves the list, detail and home pages with their
+# async variants from kitchen.async_views.
+
+KITCHEN_ASYNC_VIEWS = os.environ.get("KITCHEN_ASYNC_VIEWS") == "1"
+
+# Dish similarity matrix (kitchen/similarity.py), saved here so starting
+# workers load it instead of recomputing it; unset keeps it in memory only.
+
+KITCHEN_SIMILARITY_PATH = os.environ.get("KITCHEN_SIMILARITY_PATH")
+
+
+# Instrumentation
+# Per-view query budgets keyed by URL name, overriding the ``query_budget``
+# attribute declared on the views.
+
+KITCHEN_SERVER_TIMING = True
+
+KITCHEN_QUERY_BUDGETS = {
+    "kitchen:index": 3,
+    "kitchen:api-list": 5,
+    "kitchen:api-detail": 5,
+}
+
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
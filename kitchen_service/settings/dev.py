@@ -15,3 +15,5 @@ DATABASES = {
         "NAME": BASE_DIR / "db.sqlite3",
     }
 }
+
+KITCHEN_SEARCH_BACKEND = "kitchen.search.SQLiteFTSBackend"
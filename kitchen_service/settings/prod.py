@@ -11,14 +11,83 @@ if RENDER_EXTERNAL_HOSTNAME:
 
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
+# Connections persist for POSTGRES_CONN_MAX_AGE seconds (0 closes them after
+# every request) and are health-checked before reuse. POSTGRES_POOL=1
+# switches to Django's connection pool instead (psycopg 3 with psycopg-pool,
+# both in requirements.txt). Set POSTGRES_PGBOUNCER=1 behind PgBouncer in
+# transaction mode, where server-side cursors do not survive.
 
-DATABASES = {
-    "default": {
+
+def env_flag(name, default=False):
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    return value.lower() in ("1", "true", "yes", "on")
+
+
+def postgres_database(host, port):
+    database = {
         "ENGINE": "django.db.backends.postgresql",
         "NAME": os.environ["POSTGRES_DB"],
         "USER": os.environ["POSTGRES_USER"],
         "PASSWORD": os.environ["POSTGRES_PASSWORD"],
-        "HOST": os.environ["POSTGRES_HOST"],
-        "PORT": int(os.environ["POSTGRES_DB_PORT"]),
+        "HOST": host,
+        "PORT": int(port),
+        "CONN_MAX_AGE": int(os.environ.get("POSTGRES_CONN_MAX_AGE", 60)),
+        "CONN_HEALTH_CHECKS": env_flag("POSTGRES_CONN_HEALTH_CHECKS", True),
+        "DISABLE_SERVER_SIDE_CURSORS": env_flag("POSTGRES_PGBOUNCER"),
     }
+    if env_flag("POSTGRES_POOL"):
+        # Pooled connections are returned to the pool instead of persisting.
+        # Django checks them on checkout when CONN_HEALTH_CHECKS is set.
+        database["CONN_MAX_AGE"] = 0
+        database["OPTIONS"] = {
+            "pool": {
+                "min_size": int(os.environ.get("POSTGRES_POOL_MIN_SIZE", 2)),
+                "max_size": int(os.environ.get("POSTGRES_POOL_MAX_SIZE", 10)),
+                "timeout": float(os.environ.get("POSTGRES_POOL_TIMEOUT", 10)),
+                "max_lifetime": float(
+                    os.environ.get("POSTGRES_POOL_MAX_LIFETIME", 60 * 60)
+                ),
+            },
+        }
+    return database
+
+
+DATABASES = {
+    "default": postgres_database(
+        os.environ["POSTGRES_HOST"],
+        os.environ["POSTGRES_DB_PORT"],
+    ),
 }
+
+# Optional streaming replica for the kitchen list/detail reads.
+if os.environ.get("POSTGRES_REPLICA_HOST"):
+    DATABASES["replica"] = {
+        **postgres_database(
+            os.environ["POSTGRES_REPLICA_HOST"],
+            os.environ.get(
+                "POSTGRES_REPLICA_PORT",
+                os.environ["POSTGRES_DB_PORT"]
+            ),
+        ),
+        "TEST": {"MIRROR": "default"},
+    }
+    KITCHEN_REPLICA_DATABASE = "replica"
+    KITCHEN_REPLICA_LAG = int(os.environ.get("POSTGRES_REPLICA_LAG", 5))
+
+KITCHEN_SEARCH_BACKEND = "kitchen.search.PostgresSearchBackend"
+
+# Templates
+# Compiled templates are kept in memory for the life of the process.
+
+TEMPLATES[0]["APP_DIRS"] = False
+TEMPLATES[0]["OPTIONS"]["loaders"] = [
+    (
+        "django.template.loaders.cached.Loader",
+        [
+            "django.template.loaders.filesystem.Loader",
+            "django.template.loaders.app_directories.Loader",
+        ],
+    ),
+]
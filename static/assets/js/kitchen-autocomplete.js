@@ -0,0 +1,114 @@
+/*
+ * Lazy multi-select for select[data-autocomplete-url] widgets.
+ * The select only carries the chosen options; candidates are fetched page by
+ * page from the autocomplete endpoint ({results: [{id, text}], next}).
+ */
+(function () {
+  "use strict";
+
+  var DEBOUNCE_MS = 250;
+
+  function el(tag, className, text) {
+    var node = document.createElement(tag);
+    if (className) {
+      node.className = className;
+    }
+    if (text) {
+      node.textContent = text;
+    }
+    return node;
+  }
+
+  function init(select) {
+    var url = select.dataset.autocompleteUrl;
+    var wrapper = el("div", "kitchen-autocomplete mb-3");
+    var chips = el("div", "kitchen-autocomplete-selected mb-2");
+    var input = el("input", "form-control");
+    var results = el("div", "list-group kitchen-autocomplete-results");
+    var more = el("button", "btn btn-sm btn-outline-secondary mt-1 d-none", "More");
+    var timer = null;
+    var nextCursor = null;
+
+    input.type = "search";
+    input.placeholder = select.dataset.placeholder || "Search...";
+    more.type = "button";
+    select.style.display = "none";
+    select.parentNode.insertBefore(wrapper, select.nextSibling);
+    wrapper.appendChild(chips);
+    wrapper.appendChild(input);
+    wrapper.appendChild(results);
+    wrapper.appendChild(more);
+
+    function renderChips() {
+      chips.innerHTML = "";
+      Array.prototype.forEach.call(select.options, function (option) {
+        if (!option.selected) {
+          return;
+        }
+        var chip = el("span", "badge bg-gradient-dark me-1 mb-1", option.text + " ×");
+        chip.style.cursor = "pointer";
+        chip.addEventListener("click", function () {
+          select.removeChild(option);
+          renderChips();
+        });
+        chips.appendChild(chip);
+      });
+    }
+
+    function choose(item) {
+      var exists = Array.prototype.some.call(select.options, function (option) {
+        return option.value === String(item.id);
+      });
+      if (!exists) {
+        select.appendChild(new Option(item.text, item.id, true, true));
+      }
+      renderChips();
+    }
+
+    function load(append) {
+      var params = new URLSearchParams({q: input.value});
+      if (append && nextCursor) {
+        params.set("cursor", nextCursor);
+      }
+      fetch(url + "?" + params.toString(), {credentials: "same-origin"})
+        .then(function (response) {
+          return response.json();
+        })
+        .then(function (data) {
+          if (!append) {
+            results.innerHTML = "";
+          }
+          data.results.forEach(function (item) {
+            var row = el("button", "list-group-item list-group-item-action", item.text);
+            row.type = "button";
+            row.addEventListener("click", function () {
+              choose(item);
+            });
+            results.appendChild(row);
+          });
+          nextCursor = data.next;
+          more.classList.toggle("d-none", !nextCursor);
+        });
+    }
+
+    input.addEventListener("input", function () {
+      clearTimeout(timer);
+      timer = setTimeout(function () {
+        load(false);
+      }, DEBOUNCE_MS);
+    });
+    input.addEventListener("focus", function () {
+      if (!results.children.length) {
+        load(false);
+      }
+    });
+    more.addEventListener("click", function () {
+      load(true);
+    });
+    renderChips();
+  }
+
+  document.addEventListener("DOMContentLoaded", function () {
+    document.querySelectorAll("select[data-autocomplete-url]").forEach(init);
+  });
+})();
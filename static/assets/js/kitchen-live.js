@@ -0,0 +1,84 @@
+/*
+ * Live updates for kitchen screens from the Server-Sent Events endpoint.
+ * The script tag carries data-events-url and, in data-live-new, the topics
+ * whose objects missing from the page should prompt a reload. Elements marked
+ * data-live="<topic>:<pk>:<field>" get the new value of saved objects;
+ * rows marked data-live-row="<topic>:<pk>" are struck out when deleted.
+ * Changes the page cannot patch in place show a reload notice instead.
+ * EventSource resends the last event id when it reconnects, so the
+ * server replays only what the screen missed.
+ */
+(function () {
+  "use strict";
+
+  var script = document.currentScript;
+  var watchNew = ((script && script.dataset.liveNew) || "").split(" ");
+
+  function onPage(topic, pk) {
+    return document.querySelector(
+      '[data-live-row="' + topic + ":" + pk + '"], ' +
+      '[data-live^="' + topic + ":" + pk + ':"]'
+    ) !== null;
+  }
+
+  function showNotice() {
+    if (document.getElementById("kitchen-live-notice")) {
+      return;
+    }
+    var notice = document.createElement("div");
+    var link = document.createElement("a");
+    notice.id = "kitchen-live-notice";
+    notice.className = "alert alert-info text-white position-fixed bottom-0 end-0 m-3";
+    notice.style.zIndex = 1050;
+    notice.textContent = "This page has changed. ";
+    link.href = window.location.href;
+    link.className = "text-white text-decoration-underline";
+    link.textContent = "Reload";
+    notice.appendChild(link);
+    document.body.appendChild(notice);
+  }
+
+  function apply(topic, data) {
+    if (data.action === "saved") {
+      if (!onPage(topic, data.pk)) {
+        if (watchNew.indexOf(topic) !== -1) {
+          showNotice();
+        }
+        return;
+      }
+      Object.keys(data).forEach(function (field) {
+        document.querySelectorAll(
+          '[data-live="' + topic + ":" + data.pk + ":" + field + '"]'
+        ).forEach(function (node) {
+          node.textContent = data[field];
+        });
+      });
+    } else if (data.action === "deleted") {
+      document.querySelectorAll(
+        '[data-live-row="' + topic + ":" + data.pk + '"]'
+      ).forEach(function (row) {
+        row.style.textDecoration = "line-through";
+        row.style.opacity = 0.5;
+      });
+    } else if (data.action === "changed") {
+      if (data.pks.some(function (pk) { return onPage(topic, pk); })) {
+        showNotice();
+      }
+    } else {
+      showNotice();
+    }
+  }
+
+  document.addEventListener("DOMContentLoaded", function () {
+    if (!script || !window.EventSource) {
+      return;
+    }
+    var source = new EventSource(script.dataset.eventsUrl);
+    ["dish", "cook"].forEach(function (topic) {
+      source.addEventListener(topic, function (event) {
+        apply(topic, JSON.parse(event.data));
+      });
+    });
+    source.addEventListener("reset", showNotice);
+  });
+})();